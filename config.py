@@ -1,4 +1,4 @@
-from web3 import Web3
+from sarakt_provider import get_web3
 
 # RPC URL for your blockchain node
 RPC_URL = "http://151.237.142.106:9650/ext/bc/C/rpc"
@@ -13,8 +13,13 @@ CHAIN_ID = 1337
 # Contract address (filled after deploy)
 TOKEN_ADDRESS = "0xBBfCE55AD100b5bEd880083fCE366120347Af872"
 
-# Web3 instance
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+# HTTP connection pool (keep-alive connections, timeouts in seconds)
+HTTP_POOL_SIZE = 10
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 30.0
+
+# Web3 instance (shared per RPC URL across the process)
+w3 = get_web3(RPC_URL, HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
 
 # Wallet from private key
 account = w3.eth.account.from_key(PRIVATE_KEY)
@@ -6,6 +6,11 @@ RPC_URL = "https://your-avalanche-subnet-rpc"  # change
 CHAIN_ID = 43114  # example Avalanche mainnet chain id; change if using custom subnet
 PRIVATE_KEY = "0x..."  # admin private key (use an env var in production)
 
+# HTTP connection pool shared by all panels (keep-alive connections, timeouts in seconds)
+HTTP_POOL_SIZE = 10
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 30.0
+
 # Deployed contract addresses (fill after deployment)
 CONTRACTS = {
     "xBGL": "0xYourExistingxBGLAddress",
@@ -15,6 +20,9 @@ CONTRACTS = {
     "OwnershipDocs": "0xOwnershipDocsAddress"
 }
 
+# compiled contract JSON (raw abi or full artifact)
+ARTIFACTS_DIR = "../artifacts"
+
 # local data paths
 DATA_DIR = "../data"
 PLOTS_FILE = DATA_DIR + "/plots.json"
@@ -5,6 +5,9 @@ from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from eth_account import Account
 from . import config
+import sarakt_provider
+from sarakt_view_cache import ViewCallCache
+from sarakt_gas import GasOracle
 
 def load_json(path):
     if not os.path.exists(path):
@@ -19,10 +22,48 @@ def save_json(path, data):
 
 # web3 helpers
 def get_web3():
-    w3 = Web3(Web3.HTTPProvider(config.RPC_URL))
-    # if subnet uses PoA style
-    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-    return w3
+    # one pooled provider per process - every panel shares the same keep-alive connections
+    return sarakt_provider.get_web3(
+        config.RPC_URL,
+        pool_size=config.HTTP_POOL_SIZE,
+        connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+        read_timeout=config.HTTP_READ_TIMEOUT,
+        # if subnet uses PoA style
+        middleware=[geth_poa_middleware]
+    )
+
+_view_cache = None
+
+def get_view_cache():
+    # shared so that a write in one panel invalidates reads in all of them
+    global _view_cache
+    if _view_cache is None:
+        _view_cache = ViewCallCache(get_web3())
+    return _view_cache
+
+_gas_oracle = None
+
+def get_gas_oracle():
+    # gas limits learned from receipts and fees cached per block, shared by all panels
+    global _gas_oracle
+    if _gas_oracle is None:
+        _gas_oracle = GasOracle(get_web3(), account_from_key().address)
+    return _gas_oracle
+
+def abi_path(name):
+    return os.path.join(config.ARTIFACTS_DIR, f"{name}.json")
+
+def load_abi(name):
+    # parsed once per process
+    try:
+        return sarakt_provider.load_abi(abi_path(name))
+    except FileNotFoundError:
+        raise Exception(f"ABI for {name} not found at {abi_path(name)}. Add compiled contract JSON to artifacts/")
+
+def get_contract(name):
+    # contract handles for config.CONTRACTS are built once per process
+    load_abi(name)
+    return sarakt_provider.get_contract(get_web3(), config.CONTRACTS[name], abi_path(name))
 
 def account_from_key():
     return Account.from_key(config.PRIVATE_KEY)
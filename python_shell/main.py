@@ -3,9 +3,13 @@ import sys
 from .admin_panel import AdminPanel
 from .city_panel import CityPanel
 from .sarakt_panel import SaraktPanel
+from .helpers import get_web3
+import sarakt_provider
 
 def main():
     print("Octavia Phase1 Admin Shell")
+    # single pooled connection; the panels below reuse it and its contract handles
+    get_web3()
     admin = AdminPanel()
     city = CityPanel()
     sarakt = SaraktPanel()
@@ -44,6 +48,7 @@ def main():
             sarakt.withdraw_sarakt(to, amt)
         elif choice == "7":
             print("bye")
+            sarakt_provider.close_all()
             sys.exit(0)
         else:
             print("invalid")
@@ -0,0 +1,486 @@
+"""
+SARAKT BENCHMARKS - Python
+Бенчмаркове на горещите пътища на universe engine-а с резултати в JSON
+
+Покрива създаване на планети, SaraktUniverse._initialize, simulate_multiple_cycles
+(1k/100k/1M NPCs), City.develop_plot + _update_city_stats (10k/1M парцела) и
+търсенията по ID/име/собственик/зона. Всеки резултат съдържа времето на едно
+извикване и на единица работа (NPC-цикъл, парцел, търсене), както и времето
+за подготовка (и паметта ѝ с --trace-memory) - за сравнение между версии и
+оразмеряване на хардуер.
+
+    python sarakt_benchmark.py                          # всички размери
+    python sarakt_benchmark.py --quick                  # само най-малките
+    python sarakt_benchmark.py --filter simulate --npcs 1000,100000
+    python sarakt_benchmark.py --compare benchmarks/old.json
+    python sarakt_benchmark.py --filter simulate --trace-memory
+"""
+
+import argparse
+import contextlib
+import functools
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sarakt_universe_engine import (
+    City, GENERATOR_V1, GENERATOR_V2, NPCCohortSpec, Planet, PlanetSpec, PlanetType,
+    SaraktUniverse, StructureType, np
+)
+
+
+RESULTS_VERSION = 1
+DEFAULT_NPCS = (1000, 100000, 1000000)
+DEFAULT_PLOTS = (10000, 1000000)
+# Над този брой NPCs обектният (list[NPC]) режим не се мери - паметта е прекомерна
+MAX_OBJECT_NPCS = 100000
+SIMULATE_CYCLES = 10
+DEVELOP_BATCH = 1000
+LOOKUP_BATCH = 1000
+DEVELOP_TYPES = (StructureType.HUT, StructureType.WOODEN_HOUSE,
+                 StructureType.WORKSHOP, StructureType.COMMERCIAL)
+
+
+@dataclass
+class Benchmark:
+    """
+    Един бенчмарк: setup() се вика веднъж, run(state) - многократно.
+    items е единиците работа в едно извикване (напр. NPCs * цикли);
+    calibrate=False за run с натрупващ ефект, който не бива да се повтаря
+    повече от нужното (развиване на парцели, симулация). Бенчмарковете с
+    еднакъв fixture споделят скъпите данни (популации, градове), така че
+    времето и паметта за подготовка се отчитат при първия от тях.
+    """
+    name: str
+    params: Dict
+    setup: Callable[[], object]
+    run: Callable[[object], object]
+    items: int = 1
+    calibrate: bool = True
+    fixture: Optional[Tuple] = None
+
+
+# ============================================
+# ПОМОЩНИ
+# ============================================
+
+def _measured(factory: Callable[[], object], trace_memory: bool = False) -> Tuple[object, Dict]:
+    """
+    Изпълнява factory и връща резултата с времето ѝ и, с trace_memory, заделената
+    (и все още жива) памет по tracemalloc - включително numpy масивите. Трасирането
+    забавя създаването на обекти около 2.5 пъти, затова е по избор.
+    """
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = factory()
+        elapsed = time.perf_counter() - start
+        allocated = tracemalloc.get_traced_memory()[0] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return result, {'setup_seconds': elapsed, 'setup_bytes': allocated}
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Скрива принтовете на engine-а по време на мерене"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@functools.lru_cache(maxsize=None)
+def _population(count: int, vectorized: bool):
+    """
+    NPCs за симулацията и търсенията - споделени между бенчмарковете с
+    еднакъв размер (1M NPCs се създават за десетки секунди)
+    """
+    return NPCCohortSpec(1, 1, 50000, count, GENERATOR_V1, vectorized).create()
+
+
+def _universe_with_npcs(count: int, vectorized: bool) -> SaraktUniverse:
+    universe = SaraktUniverse(vectorized_npcs=vectorized, initialize=False)
+    universe.add_city(City(1, 'Octavia Capital City', 1, 10000))
+    universe.npcs = _population(count, vectorized)
+    return universe
+
+
+@functools.lru_cache(maxsize=None)
+def _developed_city(total_plots: int, compact: bool) -> City:
+    """Град с ~1% развити парцели на 100 собственика"""
+    city = City(1, 'Benchmark City', 1, total_plots, compact=compact)
+    step = 100
+    for index, plot_id in enumerate(range(1, total_plots + 1, step)):
+        city.develop_plot(plot_id, DEVELOP_TYPES[index % len(DEVELOP_TYPES)], f'owner-{index % 100}')
+    return city
+
+
+def _release_fixtures():
+    """Освобождава споделените данни, за да не се смесват с паметта на следващите"""
+    _population.cache_clear()
+    _developed_city.cache_clear()
+    gc.collect()
+
+
+def _npc_modes(count: int) -> List[Tuple[str, bool]]:
+    modes = []
+    if count <= MAX_OBJECT_NPCS:
+        modes.append(('objects', False))
+    if np is not None:
+        modes.append(('vectorized', True))
+    return modes
+
+
+def _plot_modes() -> List[Tuple[str, bool]]:
+    modes = [('objects', False)]
+    if np is not None:
+        modes.append(('compact', True))
+    return modes
+
+
+# ============================================
+# БЕНЧМАРКОВЕ
+# ============================================
+
+def planet_benchmarks() -> List[Benchmark]:
+    """Създаване на планета (мързеливо) и пълна генерация на секциите ѝ"""
+    benchmarks = []
+    specs = (
+        ('habitable_primary', PlanetSpec(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True)),
+        ('mining_standard', PlanetSpec(3, 'Mining Planet 1', 100001, PlanetType.MINING_STANDARD, False))
+    )
+    for label, spec in specs:
+        for version in (GENERATOR_V1, GENERATOR_V2):
+            params = {'planet_type': label, 'generator_version': version}
+            args = (spec.planet_id, spec.name, spec.seed, spec.planet_type, spec.is_habitable, version)
+            benchmarks.append(Benchmark('planet_construct', params, lambda args=args: args,
+                                        lambda args: Planet(*args)))
+            benchmarks.append(Benchmark('planet_materialize', params, lambda args=args: args,
+                                        lambda args: Planet(*args).materialize()))
+    return benchmarks
+
+
+def initialize_benchmarks() -> List[Benchmark]:
+    """SaraktUniverse._initialize (22 планети, Octavia City, 100 NPCs)"""
+    benchmarks = []
+    for vectorized in ([False, True] if np is not None else [False]):
+        params = {'vectorized_npcs': vectorized, 'compact_plots': vectorized}
+        benchmarks.append(Benchmark(
+            'universe_initialize', params, lambda: None,
+            lambda _, vectorized=vectorized: SaraktUniverse(vectorized_npcs=vectorized,
+                                                            compact_plots=vectorized)
+        ))
+    return benchmarks
+
+
+def simulate_benchmarks(npc_counts) -> List[Benchmark]:
+    """simulate_multiple_cycles; items = NPCs * цикли"""
+    benchmarks = []
+    for count in npc_counts:
+        for mode, vectorized in _npc_modes(count):
+            benchmarks.append(Benchmark(
+                'simulate_multiple_cycles', {'npcs': count, 'mode': mode, 'cycles': SIMULATE_CYCLES},
+                lambda count=count, vectorized=vectorized: _universe_with_npcs(count, vectorized),
+                lambda universe: universe.simulate_multiple_cycles(SIMULATE_CYCLES),
+                items=count * SIMULATE_CYCLES, calibrate=False, fixture=('npcs', count, mode)
+            ))
+            benchmarks.append(Benchmark(
+                'get_npc', {'npcs': count, 'mode': mode},
+                lambda count=count, vectorized=vectorized: _npc_lookup_state(count, vectorized),
+                _run_npc_lookups, items=LOOKUP_BATCH, fixture=('npcs', count, mode)
+            ))
+    return benchmarks
+
+
+def _npc_lookup_state(count: int, vectorized: bool):
+    universe = _universe_with_npcs(count, vectorized)
+    stride = max(count // LOOKUP_BATCH, 1)
+    ids = [1 + (i * stride) % count for i in range(LOOKUP_BATCH)]
+    return universe, ids
+
+
+def _run_npc_lookups(state):
+    universe, ids = state
+    for npc_id in ids:
+        universe.get_npc(npc_id)
+
+
+def develop_benchmarks(plot_counts) -> List[Benchmark]:
+    """City.develop_plot (с _update_city_stats) на партиди от свободни парцели"""
+    benchmarks = []
+    for count in plot_counts:
+        for mode, compact in _plot_modes():
+            benchmarks.append(Benchmark(
+                'develop_plot', {'plots': count, 'mode': mode},
+                lambda count=count, compact=compact: _develop_state(count, compact),
+                _run_develop, items=DEVELOP_BATCH, calibrate=False
+            ))
+    return benchmarks
+
+
+def _develop_state(total_plots: int, compact: bool) -> Dict:
+    return {'city': City(1, 'Benchmark City', 1, total_plots, compact=compact), 'next_plot': 1}
+
+
+def _run_develop(state: Dict):
+    city = state['city']
+    start = state['next_plot']
+    if start + DEVELOP_BATCH - 1 > city.total_plots:
+        raise ValueError('Няма достатъчно свободни парцели за още една партида')
+    for offset in range(DEVELOP_BATCH):
+        city.develop_plot(start + offset, DEVELOP_TYPES[offset % len(DEVELOP_TYPES)], 'benchmark')
+    state['next_plot'] = start + DEVELOP_BATCH
+
+
+def lookup_benchmarks(plot_counts) -> List[Benchmark]:
+    """Търсения на вселената (планета/град) и на града (парцели)"""
+    benchmarks = []
+
+    def universe_state():
+        return SaraktUniverse()
+
+    def planets_by_id(universe):
+        for i in range(LOOKUP_BATCH):
+            universe.get_planet(1 + i % 22)
+
+    def planets_by_name(universe):
+        for i in range(LOOKUP_BATCH):
+            universe.get_planet('Sarakt' if i % 2 else 'Zythera')
+
+    def cities_by_name(universe):
+        for _ in range(LOOKUP_BATCH):
+            universe.get_city('Octavia Capital City')
+
+    benchmarks.append(Benchmark('get_planet', {'by': 'id'}, universe_state, planets_by_id,
+                                items=LOOKUP_BATCH))
+    benchmarks.append(Benchmark('get_planet', {'by': 'name'}, universe_state, planets_by_name,
+                                items=LOOKUP_BATCH))
+    benchmarks.append(Benchmark('get_city', {'by': 'name'}, universe_state, cities_by_name,
+                                items=LOOKUP_BATCH))
+
+    for count in plot_counts:
+        for mode, compact in _plot_modes():
+            params = {'plots': count, 'mode': mode}
+            setup = functools.partial(_developed_city, count, compact)
+            stride = max(count // LOOKUP_BATCH, 1)
+
+            def plots_by_id(city, stride=stride):
+                for i in range(LOOKUP_BATCH):
+                    city.get_plot(1 + (i * stride) % city.total_plots)
+
+            city_lookups = (
+                ('get_plot', plots_by_id, LOOKUP_BATCH),
+                ('get_plots_by_owner', lambda city: city.get_plots_by_owner('owner-7'), 1),
+                ('get_plots_by_zone', lambda city: city.get_plots_by_zone('commercial'), 1),
+                ('get_plots_by_structure',
+                 lambda city: city.get_plots_by_structure(StructureType.WORKSHOP), 1),
+                ('get_free_plots', lambda city: city.get_free_plots('industrial'), 1),
+                ('get_city_stats', lambda city: city.get_city_stats(), 1)
+            )
+            for name, run, items in city_lookups:
+                benchmarks.append(Benchmark(name, params, setup, run, items=items,
+                                            fixture=('city', count, mode)))
+    return benchmarks
+
+
+def all_benchmarks(npc_counts=DEFAULT_NPCS, plot_counts=DEFAULT_PLOTS) -> List[Benchmark]:
+    return (planet_benchmarks() + initialize_benchmarks() + simulate_benchmarks(npc_counts) +
+            develop_benchmarks(plot_counts) + lookup_benchmarks(plot_counts))
+
+
+# ============================================
+# ИЗПЪЛНЕНИЕ
+# ============================================
+
+def _timed(run: Callable, state, number: int) -> float:
+    # Като timeit - без събиране на боклука по време на измерването
+    gc.collect()
+    gc.disable()
+    try:
+        with _quiet():
+            start = time.perf_counter()
+            for _ in range(number):
+                run(state)
+            return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _calibrated_number(benchmark: Benchmark, state, min_time: float) -> int:
+    """Брой извиквания на измерване, така че то да трае поне min_time (като timeit)"""
+    number = 1
+    while True:
+        if _timed(benchmark.run, state, number) >= min_time or number >= 1 << 20:
+            return number
+        number *= 2
+
+
+def run_benchmark(benchmark: Benchmark, repeat: int = 5, min_time: float = 0.2,
+                  trace_memory: bool = False) -> Dict:
+    """Мери един бенчмарк; времената са в секунди за едно извикване на run"""
+    with _quiet():
+        state, info = _measured(benchmark.setup, trace_memory)
+
+    if benchmark.calibrate:
+        number = _calibrated_number(benchmark, state, min_time)
+    else:
+        number = 1
+        _timed(benchmark.run, state, 1)  # загряване
+
+    samples = [_timed(benchmark.run, state, number) / number for _ in range(repeat)]
+    median = statistics.median(samples)
+    return {
+        'name': benchmark.name,
+        'params': benchmark.params,
+        'unit': 'seconds',
+        'number': number,
+        'repeat': repeat,
+        'items': benchmark.items,
+        'min': min(samples),
+        'median': median,
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'max': max(samples),
+        'per_item': median / benchmark.items,
+        'setup_seconds': info['setup_seconds'],
+        'setup_bytes': info['setup_bytes']
+    }
+
+
+def machine_info() -> Dict:
+    """Описание на машината и версията на кода към резултатите"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__ if np is not None else None,
+        'commit': commit
+    }
+
+
+def run_all(benchmarks: List[Benchmark], repeat: int = 5, min_time: float = 0.2,
+            trace_memory: bool = False) -> Dict:
+    results = []
+    fixture = None
+    for benchmark in benchmarks:
+        if benchmark.fixture is None or benchmark.fixture != fixture:
+            _release_fixtures()
+        fixture = benchmark.fixture
+        params = ', '.join(f'{key}={value}' for key, value in benchmark.params.items())
+        print(f'⏱️  {benchmark.name} ({params})...', end=' ', flush=True)
+        result = run_benchmark(benchmark, repeat, min_time, trace_memory)
+        results.append(result)
+        print(f'{_format_seconds(result["median"])} '
+              f'({_format_seconds(result["per_item"])} на единица)')
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(),
+        'machine': machine_info(),
+        'config': {'repeat': repeat, 'min_time': min_time, 'trace_memory': trace_memory},
+        'results': results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Сравнява най-добрите времена (min - с най-малко шум) с предишни резултати;
+    регресия е забавяне над threshold (0.2 = 20%). Бенчмаркове без
+    съответствие в baseline се пропускат.
+    """
+    previous = {result['name'] + json.dumps(result['params'], sort_keys=True): result
+                for result in baseline.get('results', [])}
+    rows = []
+    for result in current['results']:
+        old = previous.get(result['name'] + json.dumps(result['params'], sort_keys=True))
+        if old is None or not old['min']:
+            continue
+        ratio = result['min'] / old['min']
+        rows.append({'name': result['name'], 'params': result['params'], 'ratio': ratio,
+                     'regression': ratio > 1 + threshold})
+    return rows
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds / 1e-9:.0f} ns'
+
+
+def _counts(value: str) -> List[int]:
+    return [int(part) for part in value.split(',') if part.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Бенчмаркове на Sarakt universe engine')
+    parser.add_argument('--npcs', type=_counts, default=list(DEFAULT_NPCS),
+                        help='Брой NPCs за симулацията, през запетая')
+    parser.add_argument('--plots', type=_counts, default=list(DEFAULT_PLOTS),
+                        help='Брой парцели на града, през запетая')
+    parser.add_argument('--quick', action='store_true', help='Само най-малките размери')
+    parser.add_argument('--filter', default=None, help='Само бенчмаркове, чието име съдържа това')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Минимално време на едно измерване (s) за бързите бенчмаркове')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Мери паметта на подготовката с tracemalloc (по-бавна подготовка)')
+    parser.add_argument('--output', default=None,
+                        help='JSON файл за резултатите (по подразбиране benchmarks/<време>.json)')
+    parser.add_argument('--compare', default=None, help='JSON с предишни резултати за сравнение')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Допустимо забавяне спрямо --compare (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    npc_counts = args.npcs[:1] if args.quick else args.npcs
+    plot_counts = args.plots[:1] if args.quick else args.plots
+    benchmarks = all_benchmarks(npc_counts, plot_counts)
+    if args.filter:
+        benchmarks = [b for b in benchmarks if args.filter in b.name]
+    if not benchmarks:
+        print('❌ Няма бенчмаркове за изпълнение')
+        return 1
+
+    report = run_all(benchmarks, args.repeat, args.min_time, args.trace_memory)
+
+    output = args.output or os.path.join('benchmarks', datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f'\n💾 Резултати записани в {output}')
+
+    if not args.compare:
+        return 0
+    with open(args.compare, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.threshold)
+    print(f'\n📊 Сравнение с {args.compare}:')
+    for row in rows:
+        params = ', '.join(f'{key}={value}' for key, value in row['params'].items())
+        mark = '❌' if row['regression'] else '✅'
+        print(f'  {mark} {row["name"]} ({params}): x{row["ratio"]:.2f}')
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,18 +4,317 @@ SARAKT BLOCKCHAIN INTEGRATION - Python
 """
 
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from eth_account import Account
 from typing import Dict, Optional, List, Tuple
+import asyncio
 import json
+import math
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Импорт на Universe Engine
 from sarakt_universe_engine import SaraktUniverse, NPC, StructureType
+from sarakt_view_cache import ViewCallCache
+from sarakt_gas import GasOracle, AsyncGasOracle
+from sarakt_journal import TxJournal, INTENT, BROADCAST, CONFIRMED
+from sarakt_provider import (
+    get_web3, get_async_web3, close_async_web3,
+    DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+)
 
 load_dotenv()
 
 
+# ============================================
+# NONCE MANAGER
+# ============================================
+
+# Грешки от node-а, след които локалният nonce трябва да се синхронизира
+NONCE_ERRORS = (
+    'nonce too low',
+    'replacement transaction underpriced',
+    'transaction underpriced',
+    'invalid nonce'
+)
+
+
+class NonceManager:
+    """
+    Разпределя nonce-и локално, за да могат транзакциите да се подписват и
+    изпращат една след друга без get_transaction_count при всяка.
+    """
+    
+    def __init__(self, w3: Web3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce: Optional[int] = None
+    
+    def allocate(self) -> int:
+        """Връща следващия свободен nonce"""
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._fetch()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+    
+    def resync(self) -> int:
+        """Синхронизира с веригата (вкл. транзакциите в mempool-а)"""
+        with self._lock:
+            self._next_nonce = self._fetch()
+            return self._next_nonce
+    
+    def _fetch(self) -> int:
+        return self.w3.eth.get_transaction_count(self.address, 'pending')
+
+
+# ============================================
+# RECEIPT TRACKER
+# ============================================
+
+def _tx_key(tx_hash) -> str:
+    """Нормализиран hex ключ на транзакция (HexBytes или низ)"""
+    if isinstance(tx_hash, str):
+        return tx_hash.lower() if tx_hash.startswith('0x') else '0x' + tx_hash.lower()
+    return Web3.to_hex(tx_hash)
+
+
+class ReceiptTracker:
+    """
+    Фоново следене на receipt-и: транзакциите се регистрират с track() и
+    получават Future, който се разрешава при потвърждение. Нишката проверява
+    чакащите само при нов блок, на порции от batch_size.
+    """
+    
+    def __init__(self, w3: Web3, poll_interval: float = 0.5, batch_size: int = 100,
+                 on_new_block=None, on_receipt=None):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        # Извиква се с номера на блока при всеки нов видян блок
+        self.on_new_block = on_new_block
+        # Извиква се с (tx hash, receipt) за всеки получен receipt
+        self.on_receipt = on_receipt
+        
+        # tx hash (hex) -> (Future, callback, време на изпращане)
+        self._pending: 'OrderedDict[str, Tuple[Future, Optional[callable], float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_block: Optional[int] = None
+        self._unchecked: set = set()
+    
+    def track(self, tx_hash, callback=None) -> Future:
+        """
+        Регистрира транзакция. Future-ът получава callback(receipt), ако е
+        подаден callback, иначе самия receipt.
+        """
+        key = _tx_key(tx_hash)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key][0]
+            future = Future()
+            self._pending[key] = (future, callback, time.time())
+            self._unchecked.add(key)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='receipt-tracker', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return future
+    
+    def pending(self) -> Dict[str, float]:
+        """Чакащите транзакции (hex hash -> време на изпращане)"""
+        with self._lock:
+            return {key: submitted for key, (_, _, submitted) in self._pending.items()}
+    
+    def is_pending(self, tx_hash) -> bool:
+        with self._lock:
+            return _tx_key(tx_hash) in self._pending
+    
+    def poll(self) -> int:
+        """Една проверка; връща броя потвърдени транзакции"""
+        block = self.w3.eth.block_number
+        with self._lock:
+            new_block = block != self._last_block
+            if new_block:
+                # Нов блок - всяка чакаща транзакция може да е включена
+                self._unchecked = set(self._pending)
+                self._last_block = block
+            keys = [key for key in self._pending if key in self._unchecked][:self.batch_size]
+            self._unchecked.difference_update(keys)
+        
+        # Преди да се разрешат future-ите - четенията след потвърждение да са пресни
+        if new_block and self.on_new_block:
+            self.on_new_block(block)
+        
+        resolved = 0
+        for key in keys:
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(key)
+            except TransactionNotFound:
+                continue
+            self._resolve(key, receipt)
+            resolved += 1
+        return resolved
+    
+    def _resolve(self, key: str, receipt):
+        with self._lock:
+            future, callback, _ = self._pending.pop(key)
+        if self.on_receipt:
+            try:
+                self.on_receipt(key, receipt)
+            except Exception as e:
+                print(f"⚠️  Грешка при обработка на receipt {key}: {str(e)}")
+        try:
+            future.set_result(callback(receipt) if callback else receipt)
+        except Exception as e:
+            future.set_exception(e)
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️  Грешка при проверка на receipt-и: {str(e)}")
+            # Непроверените от предишната порция се обработват веднага
+            if not self._unchecked:
+                self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+
+# ============================================
+# ДЕКОДИРАНЕ НА СЪБИТИЯ
+# ============================================
+
+ZERO_ADDRESS = '0x' + '00' * 20
+
+# Събития, с които се създават нови активи: име -> аргумент(и) с ID-тата.
+# ERC1155 минтване е трансфер от нулевия адрес.
+ASSET_CREATION_EVENTS = {
+    'TransferSingle': 'id',
+    'TransferBatch': 'ids',
+    'PlotMinted': 'plotId'
+}
+
+
+def _as_bytes(value) -> bytes:
+    """Topic/data от receipt-а като bytes (HexBytes или hex низ)"""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return Web3.to_bytes(hexstr=value)
+
+
+class _EventLayout:
+    """Предварително изчислено разпределение на аргументите на едно събитие"""
+    
+    def __init__(self, event_abi: Dict):
+        self.name = event_abi['name']
+        self.topic = bytes(Web3.keccak(
+            text=f"{self.name}({','.join(arg['type'] for arg in event_abi['inputs'])})"
+        ))
+        self.indexed = [(arg['name'], arg['type']) for arg in event_abi['inputs'] if arg['indexed']]
+        self.data_names = [arg['name'] for arg in event_abi['inputs'] if not arg['indexed']]
+        self.data_types = [arg['type'] for arg in event_abi['inputs'] if not arg['indexed']]
+        self.names = [arg['name'] for arg in event_abi['inputs']]
+
+
+class ReceiptDecoder:
+    """
+    ABI-базирано декодиране на логовете в receipt: таблицата topic0 ->
+    разпределение на аргументите се построява веднъж от ABI-тата на
+    подадените contract-и, а всеки лог се декодира с едно търсене в нея.
+    Логове от други адреси или с непознат topic0 се пропускат.
+    """
+    
+    def __init__(self, w3: Web3, contracts: List):
+        self.codec = w3.codec
+        self._layouts: Dict[bytes, _EventLayout] = {}
+        self._addresses = set()
+        for contract in contracts:
+            self._addresses.add(contract.address.lower())
+            for entry in contract.abi:
+                if entry.get('type') == 'event' and not entry.get('anonymous'):
+                    layout = _EventLayout(entry)
+                    self._layouts[layout.topic] = layout
+    
+    def decode_log(self, log) -> Optional[Dict]:
+        """Декодира един лог; None ако не е от наш contract или е непознат"""
+        if not log['topics'] or log['address'].lower() not in self._addresses:
+            return None
+        topics = log['topics']
+        layout = self._layouts.get(_as_bytes(topics[0]))
+        if layout is None or len(topics) != len(layout.indexed) + 1:
+            return None
+        
+        args = {}
+        for (name, arg_type), topic in zip(layout.indexed, topics[1:]):
+            if arg_type in ('string', 'bytes') or arg_type.endswith(']'):
+                # Динамичните indexed аргументи се пазят само като keccak hash
+                args[name] = _as_bytes(topic)
+            else:
+                args[name] = self.codec.decode([arg_type], _as_bytes(topic))[0]
+        if layout.data_types:
+            args.update(zip(layout.data_names, self.codec.decode(layout.data_types, _as_bytes(log['data']))))
+        for name, value in args.items():
+            if isinstance(value, str) and value.startswith('0x') and len(value) == 42:
+                args[name] = Web3.to_checksum_address(value)
+        
+        return {
+            'event': layout.name,
+            'address': Web3.to_checksum_address(log['address']),
+            'log_index': log.get('logIndex'),
+            'args': {name: args[name] for name in layout.names}
+        }
+    
+    def decode_receipt(self, receipt) -> List[Dict]:
+        """Всички разпознати събития в receipt-а, в реда на логовете"""
+        events = []
+        for log in receipt['logs']:
+            event = self.decode_log(log)
+            if event is not None:
+                events.append(event)
+        return events
+    
+    def created_assets(self, receipt) -> List[Dict]:
+        """
+        Създадените активи в receipt-а с едно минаване: {'id', 'owner',
+        'address', 'event'} за всяко ID, без повторения по (contract, ID).
+        ERC1155 минтванията идват от основния contract, PlotMinted - от LandRegistry.
+        """
+        assets = []
+        seen = set()
+        for event in self.decode_receipt(receipt):
+            field = ASSET_CREATION_EVENTS.get(event['event'])
+            if field is None:
+                continue
+            args = event['args']
+            if 'from' in args and args['from'] != ZERO_ADDRESS:
+                continue
+            ids = args[field] if isinstance(args[field], (list, tuple)) else [args[field]]
+            for asset_id in ids:
+                key = (event['address'], asset_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+                assets.append({
+                    'id': asset_id,
+                    'owner': args['to'],
+                    'address': event['address'],
+                    'event': event['event']
+                })
+        return assets
+
+
 # ============================================
 # BLOCKCHAIN CONNECTOR
 # ============================================
@@ -28,8 +327,13 @@ class BlockchainConnector:
         self.contract_address = config['contract_address']
         self.private_key = config['private_key']
         
-        # Инициализира Web3
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+        # Споделена Web3 връзка с pool от keep-alive HTTP връзки
+        self.w3 = get_web3(
+            self.rpc_url,
+            pool_size=config.get('http_pool_size', DEFAULT_POOL_SIZE),
+            connect_timeout=config.get('http_connect_timeout', DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=config.get('http_read_timeout', DEFAULT_READ_TIMEOUT)
+        )
         
         # Проверява връзката
         if not self.w3.is_connected():
@@ -46,9 +350,36 @@ class BlockchainConnector:
             abi=self.contract_abi
         )
         
-        self.pending_transactions = []
+        # LandRegistry (по избор) - за партидно минтване на парцели с mintPlots
+        self.land_registry = None
+        if config.get('land_registry_address'):
+            self.land_registry = self.w3.eth.contract(
+                address=Web3.to_checksum_address(config['land_registry_address']),
+                abi=self._get_land_registry_abi()
+            )
+        
         self.minted_assets = {}
         
+        # Декодиране на събитията в receipt-ите по topic0
+        self.events = ReceiptDecoder(
+            self.w3, [self.contract] + ([self.land_registry] if self.land_registry else [])
+        )
+        
+        # Кеш за view извиквания (инвалидира се при нов блок)
+        self.view_cache = ViewCallCache(self.w3)
+        
+        # Газ лимити от статистиката на receipt-ите и такси, кеширани за блок
+        self.gas = GasOracle(self.w3, self.address)
+        # tx hash -> (функция, единици) за обучение на gas oracle-а
+        self._gas_keys: Dict[str, Tuple[str, int]] = {}
+        
+        # Фоново следене на receipt-и
+        self.receipts = ReceiptTracker(self.w3, on_new_block=self._on_new_block,
+                                       on_receipt=self._learn_gas)
+        
+        # Локални nonce-и за конвейерно изпращане
+        self.nonces = NonceManager(self.w3, self.address)
+        
         print(f"✅ Blockchain свързан: {self.address}")
     
     def _get_contract_abi(self) -> List:
@@ -130,11 +461,98 @@ class BlockchainConnector:
                 "outputs": [{"name": "", "type": "uint256"}],
                 "stateMutability": "view",
                 "type": "function"
+            },
+            {
+                "inputs": [
+                    {"name": "accounts", "type": "address[]"},
+                    {"name": "ids", "type": "uint256[]"}
+                ],
+                "name": "balanceOfBatch",
+                "outputs": [{"name": "", "type": "uint256[]"}],
+                "stateMutability": "view",
+                "type": "function"
+            },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": True, "name": "operator", "type": "address"},
+                    {"indexed": True, "name": "from", "type": "address"},
+                    {"indexed": True, "name": "to", "type": "address"},
+                    {"indexed": False, "name": "id", "type": "uint256"},
+                    {"indexed": False, "name": "value", "type": "uint256"}
+                ],
+                "name": "TransferSingle",
+                "type": "event"
+            },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": True, "name": "operator", "type": "address"},
+                    {"indexed": True, "name": "from", "type": "address"},
+                    {"indexed": True, "name": "to", "type": "address"},
+                    {"indexed": False, "name": "ids", "type": "uint256[]"},
+                    {"indexed": False, "name": "values", "type": "uint256[]"}
+                ],
+                "name": "TransferBatch",
+                "type": "event"
+            }
+        ]
+    
+    @property
+    def pending_transactions(self) -> List[str]:
+        """Изпратени, но още непотвърдени транзакции"""
+        return list(self.receipts.pending())
+    
+    def _get_land_registry_abi(self) -> List:
+        """Връща ABI на LandRegistry - партидното минтване, getPlot и събитието PlotMinted (не е ERC1155)"""
+        return [
+            {
+                "inputs": [
+                    {"name": "startId", "type": "uint256"},
+                    {"name": "count", "type": "uint256"},
+                    {"name": "areaM2", "type": "uint256"},
+                    {"name": "to", "type": "address"}
+                ],
+                "name": "mintPlots",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function"
+            },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": True, "name": "plotId", "type": "uint256"},
+                    {"indexed": False, "name": "areaM2", "type": "uint256"},
+                    {"indexed": True, "name": "to", "type": "address"}
+                ],
+                "name": "PlotMinted",
+                "type": "event"
+            },
+            {
+                "inputs": [{"name": "id", "type": "uint256"}],
+                "name": "getPlot",
+                "outputs": [
+                    {"name": "plotId", "type": "uint256"},
+                    {"name": "areaM2", "type": "uint256"},
+                    {"name": "owner", "type": "address"},
+                    {"name": "netValue", "type": "uint256"},
+                    {"name": "activated", "type": "bool"},
+                    {"name": "forSale", "type": "bool"},
+                    {"name": "salePrice", "type": "uint256"},
+                    {"name": "lien", "type": "bool"}
+                ],
+                "stateMutability": "view",
+                "type": "function"
             }
         ]
     
-    def mint_plot_nft(self, player_id: str, plot_number: int, zone: str) -> Dict:
-        """Минтва парцел като NFT"""
+    def mint_plot_nft(self, player_id: str, plot_number: int, zone: str, wait: bool = True,
+                      on_signed=None) -> Dict:
+        """
+        Минтва парцел като NFT. При wait=False връща веднага tx_hash и future,
+        който се разрешава с резултата след потвърждение. on_signed(tx_hash,
+        nonce, raw) се извиква преди изпращане (напр. за запис в журнал).
+        """
         try:
             print(f"⛓️  Минтване на парцел #{plot_number} ({zone}) за {player_id}...")
             
@@ -145,33 +563,37 @@ class BlockchainConnector:
                 zone
             )
             
-            # Изпраща транзакцията
-            tx_hash = self._send_transaction(function)
-            
-            # Чака за потвърждение
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            # Извлича token ID от receipt
-            token_id = self._extract_token_id_from_receipt(receipt)
-            
-            self.minted_assets[f'plot_{plot_number}'] = {
-                'token_id': token_id,
-                'owner': player_id,
-                'type': 'LAND_PLOT',
-                'tx_hash': receipt['transactionHash'].hex()
-            }
-            
-            print(f"✅ Парцел минтнат! Token ID: {token_id}")
-            return {
-                'token_id': token_id,
-                'tx_hash': receipt['transactionHash'].hex()
-            }
+            # Изпраща транзакцията и регистрира обработката на receipt-а
+            return self._submit(function, lambda receipt: self._record_plot_mint(
+                player_id, plot_number, receipt
+            ), wait, on_signed)
             
         except Exception as e:
             print(f"❌ Грешка при минтване: {str(e)}")
             raise
     
-    def build_structure_on_chain(self, plot_token_id: int, structure_type: StructureType) -> Dict:
+    def _record_plot_mint(self, player_id: str, plot_number: int, receipt) -> Dict:
+        if receipt['status'] != 1:
+            raise ValueError(f"Минтването е отхвърлено (revert): {receipt['transactionHash'].hex()}")
+        
+        # Извлича token ID от receipt
+        token_id = self._extract_token_id_from_receipt(receipt)
+        
+        self.minted_assets[f'plot_{plot_number}'] = {
+            'token_id': token_id,
+            'owner': player_id,
+            'type': 'LAND_PLOT',
+            'tx_hash': receipt['transactionHash'].hex()
+        }
+        
+        print(f"✅ Парцел минтнат! Token ID: {token_id}")
+        return {
+            'token_id': token_id,
+            'tx_hash': receipt['transactionHash'].hex()
+        }
+    
+    def build_structure_on_chain(self, plot_token_id: int, structure_type: StructureType,
+                                 wait: bool = True) -> Dict:
         """Строи структура на парцел (on-chain)"""
         try:
             print(f"🏗️  Строене на {structure_type.name} на парцел token {plot_token_id}...")
@@ -181,17 +603,17 @@ class BlockchainConnector:
                 structure_type.value
             )
             
-            tx_hash = self._send_transaction(function)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            def on_receipt(receipt):
+                print(f"✅ Структура построена! TX: {receipt['transactionHash'].hex()}")
+                return {'tx_hash': receipt['transactionHash'].hex()}
             
-            print(f"✅ Структура построена! TX: {receipt['transactionHash'].hex()}")
-            return {'tx_hash': receipt['transactionHash'].hex()}
+            return self._submit(function, on_receipt, wait)
             
         except Exception as e:
             print(f"❌ Грешка при строене: {str(e)}")
             raise
     
-    def mint_npc_nft(self, npc: NPC, initial_owner: str) -> Dict:
+    def mint_npc_nft(self, npc: NPC, initial_owner: str, wait: bool = True, on_signed=None) -> Dict:
         """Минтва NPC като NFT"""
         try:
             print(f"👤 Минтване на NPC: {npc.get_name()} (ID: {npc.id})...")
@@ -202,28 +624,34 @@ class BlockchainConnector:
                 Web3.to_checksum_address(initial_owner)
             )
             
-            tx_hash = self._send_transaction(function)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            token_id = self._extract_token_id_from_receipt(receipt)
-            
-            self.minted_assets[f'npc_{npc.id}'] = {
-                'token_id': token_id,
-                'owner': initial_owner,
-                'type': 'NPC',
-                'npc_data': npc.get_status(),
-                'tx_hash': receipt['transactionHash'].hex()
-            }
-            
-            print(f"✅ NPC минтнат! Token ID: {token_id}")
-            return {
-                'token_id': token_id,
-                'tx_hash': receipt['transactionHash'].hex()
-            }
+            return self._submit(function, lambda receipt: self._record_npc_mint(
+                npc, initial_owner, receipt
+            ), wait, on_signed)
             
         except Exception as e:
             print(f"❌ Грешка при минтване на NPC: {str(e)}")
             raise
     
+    def _record_npc_mint(self, npc: NPC, initial_owner: str, receipt) -> Dict:
+        if receipt['status'] != 1:
+            raise ValueError(f"Минтването е отхвърлено (revert): {receipt['transactionHash'].hex()}")
+        
+        token_id = self._extract_token_id_from_receipt(receipt)
+        
+        self.minted_assets[f'npc_{npc.id}'] = {
+            'token_id': token_id,
+            'owner': initial_owner,
+            'type': 'NPC',
+            'npc_data': npc.get_status(),
+            'tx_hash': receipt['transactionHash'].hex()
+        }
+        
+        print(f"✅ NPC минтнат! Token ID: {token_id}")
+        return {
+            'token_id': token_id,
+            'tx_hash': receipt['transactionHash'].hex()
+        }
+    
     def sync_npc_loyalty(self, npc_token_id: int, player_id: str, 
                         current_loyalty: float, previous_loyalty: float) -> Dict:
         """Синхронизира лоялност на NPC on-chain"""
@@ -244,7 +672,7 @@ class BlockchainConnector:
             )
             
             tx_hash = self._send_transaction(function)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.wait_for_receipts([tx_hash])[0]
             
             print(f"✅ Лоялност синхронизирана! TX: {receipt['transactionHash'].hex()}")
             return {'tx_hash': receipt['transactionHash'].hex()}
@@ -264,7 +692,7 @@ class BlockchainConnector:
             )
             
             tx_hash = self._send_transaction(function)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.wait_for_receipts([tx_hash])[0]
             faction_id = self._extract_token_id_from_receipt(receipt)
             
             print(f"✅ Faction създаден! ID: {faction_id}")
@@ -291,7 +719,7 @@ class BlockchainConnector:
             )
             
             tx_hash = self._send_transaction(function)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.wait_for_receipts([tx_hash])[0]
             
             print(f"✅ Ресурс извлечен! TX: {receipt['transactionHash'].hex()}")
             return {'tx_hash': receipt['transactionHash'].hex()}
@@ -300,47 +728,327 @@ class BlockchainConnector:
             print(f"❌ Грешка при извличане на ресурс: {str(e)}")
             raise
     
+    def mint_plot_nfts(self, claims: List[Tuple[str, int, str]]) -> List[Dict]:
+        """
+        Минтва много парцели наведнъж: claims е списък (player_id, plot_number, zone).
+        Транзакциите се подписват и изпращат една след друга, след което
+        receipt-ите се чакат заедно. Отхвърлените (revert) минтвания се
+        пропускат - резултатите носят plot_number на успешните.
+        """
+        print(f"⛓️  Минтване на {len(claims)} парцела...")
+        
+        functions = [
+            self.contract.functions.mintOctaviaPlot(
+                Web3.to_checksum_address(player_id), plot_number, zone
+            )
+            for player_id, plot_number, zone in claims
+        ]
+        receipts = self.wait_for_receipts(self.submit_transactions(functions))
+        
+        results = []
+        for (player_id, plot_number, zone), receipt in zip(claims, receipts):
+            if receipt['status'] != 1:
+                print(f"❌ Минтването на парцел {plot_number} е отхвърлено (revert): "
+                      f"{receipt['transactionHash'].hex()}")
+                continue
+            # Всеки receipt носи само своето минтване - ID-то е от неговите събития
+            token_id = self._extract_token_id_from_receipt(receipt)
+            self.minted_assets[f'plot_{plot_number}'] = {
+                'token_id': token_id,
+                'owner': player_id,
+                'type': 'LAND_PLOT',
+                'tx_hash': receipt['transactionHash'].hex()
+            }
+            results.append({
+                'plot_number': plot_number,
+                'token_id': token_id,
+                'tx_hash': receipt['transactionHash'].hex()
+            })
+        
+        print(f"✅ {len(results)}/{len(claims)} парцела минтнати")
+        return results
+    
+    # Газ за mintPlots преди gas oracle-а да има данни: фиксирана част + запис и събитие на парцел
+    MINT_BATCH_BASE_GAS = 60000
+    MINT_PLOT_GAS = 140000
+    # Част от лимита на блока, която една партида може да заеме
+    BLOCK_GAS_FILL = 0.8
+    
+    def max_plots_per_batch(self) -> int:
+        """Колко парцела събира една mintPlots транзакция в лимита на блока"""
+        gas_limit = self.w3.eth.get_block('latest')['gasLimit']
+        budget = int(gas_limit * self.BLOCK_GAS_FILL)
+        if self.gas.predict('mintPlots') is None:
+            return max(1, (budget - self.MINT_BATCH_BASE_GAS) // self.MINT_PLOT_GAS)
+        
+        # Научената оценка расте с броя парцели - двоично търсене на най-големия, който се
+        # събира (горна граница: никоя транзакция не струва под 21000 газ на парцел)
+        low, high = 1, max(1, budget // 21000)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.gas.predict('mintPlots', middle) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+    
+    def mint_plot_batches(self, batches: List[Tuple[int, int, str]], area_m2: int,
+                          on_signed: Optional[List] = None,
+                          on_sent: Optional[List] = None) -> Dict[int, Dict]:
+        """
+        Минтва парцели партидно през LandRegistry.mintPlots. batches е списък
+        (start_id, count, owner); връща plot ID -> {'owner', 'tx_hash'} според
+        декодираните събития за минтване в receipt-ите. on_signed и on_sent са
+        по избор callback-и за всяка партида (виж _send_transaction).
+        """
+        if self.land_registry is None:
+            raise ValueError('LandRegistry адресът не е конфигуриран (land_registry_address)')
+        
+        print(f"⛓️  Минтване на {sum(count for _, count, _ in batches)} парцела в {len(batches)} транзакции...")
+        
+        functions = [
+            self.land_registry.functions.mintPlots(
+                start_id, count, area_m2, Web3.to_checksum_address(owner)
+            )
+            for start_id, count, owner in batches
+        ]
+        units = [count for _, count, _ in batches]
+        receipts = self.wait_for_receipts(
+            self.submit_transactions(functions, units=units, on_signed=on_signed, on_sent=on_sent)
+        )
+        
+        minted = {}
+        for receipt in receipts:
+            minted.update(self._record_plot_batch(receipt))
+        
+        print(f"✅ {len(minted)} парцела минтнати")
+        return minted
+    
+    def _record_plot_batch(self, receipt) -> Dict[int, Dict]:
+        """Минтнатите от една mintPlots транзакция парцели (празно при revert)"""
+        if receipt['status'] != 1:
+            return {}
+        minted = {}
+        registry = self.land_registry.address
+        # Едно минаване по логовете - всяко ID с получателя от събитието си
+        for asset in self.events.created_assets(receipt):
+            if asset['address'] == registry:
+                minted[asset['id']] = {
+                    'owner': asset['owner'],
+                    'tx_hash': receipt['transactionHash'].hex()
+                }
+        return minted
+    
     def check_ownership(self, address: str, token_id: int) -> bool:
         """Проверява собственост върху NFT"""
         try:
-            balance = self.contract.functions.balanceOf(
+            balance = self.view_cache.call(self.contract.functions.balanceOf(
                 Web3.to_checksum_address(address),
                 token_id
-            ).call()
+            ))
             return balance > 0
         except Exception as e:
             print(f"❌ Грешка при проверка на собственост: {str(e)}")
             return False
     
-    def _send_transaction(self, function) -> str:
-        """Изпраща транзакция"""
-        # Построява транзакция
-        tx = function.build_transaction({
-            'from': self.address,
-            'nonce': self.w3.eth.get_transaction_count(self.address),
-            'gas': 2000000,
-            'gasPrice': self.w3.eth.gas_price
-        })
+    # Брой повторни опити след грешка с nonce
+    MAX_NONCE_RETRIES = 3
+    # Максимално чакане на потвърждение при блокиращи извиквания (секунди)
+    RECEIPT_TIMEOUT = 120
+    
+    def _submit(self, function, on_receipt, wait: bool = True, on_signed=None) -> Dict:
+        """
+        Изпраща транзакция и регистрира on_receipt в тракера. При wait=True
+        връща резултата на on_receipt, иначе {'tx_hash', 'future'} веднага.
+        """
+        tx_hash = self._send_transaction(function, on_signed=on_signed)
+        future = self.receipts.track(tx_hash, on_receipt)
+        if wait:
+            return future.result(timeout=self.RECEIPT_TIMEOUT)
+        return {'tx_hash': _tx_key(tx_hash), 'future': future}
+    
+    def get_plot_on_chain(self, plot_id: int) -> Optional[Dict]:
+        """Парцел от LandRegistry.getPlot (през кеша); None ако не е минтнат"""
+        if self.land_registry is None:
+            raise ValueError('LandRegistry адресът не е конфигуриран (land_registry_address)')
         
-        # Подписва транзакцията
-        signed_tx = self.account.sign_transaction(tx)
+        plot_id, area_m2, owner, net_value, activated, for_sale, sale_price, lien = \
+            self.view_cache.call(self.land_registry.functions.getPlot(plot_id))
+        if plot_id == 0:
+            return None
+        return {
+            'id': plot_id,
+            'area_m2': area_m2,
+            'owner': owner,
+            'net_value': net_value,
+            'activated': activated,
+            'for_sale': for_sale,
+            'sale_price': sale_price,
+            'lien': lien
+        }
+    
+    # Размер на една balanceOfBatch заявка и брой паралелни заявки
+    BALANCE_BATCH_SIZE = 500
+    BALANCE_BATCH_WORKERS = 4
+    
+    def get_balances(self, holdings: List[Tuple[str, int]], batch_size: Optional[int] = None,
+                     max_workers: Optional[int] = None) -> Dict[Tuple[str, int], int]:
+        """
+        Баланси за много (адрес, token ID) двойки наведнъж чрез ERC1155
+        balanceOfBatch - на порции от batch_size, до max_workers паралелно.
+        """
+        batch_size = batch_size or self.BALANCE_BATCH_SIZE
+        max_workers = max_workers or self.BALANCE_BATCH_WORKERS
         
-        # Изпраща транзакцията
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        # Без повторения - всяка двойка се пита веднъж
+        keys = list(dict.fromkeys((address, token_id) for address, token_id in holdings))
+        chunks = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
         
-        return tx_hash
+        balances = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for chunk, values in zip(chunks, executor.map(self._balance_chunk, chunks)):
+                balances.update(zip(chunk, values))
+        return balances
+    
+    def _balance_chunk(self, chunk: List[Tuple[str, int]]) -> List[int]:
+        accounts = [Web3.to_checksum_address(address) for address, _ in chunk]
+        ids = [token_id for _, token_id in chunk]
+        try:
+            return self.contract.functions.balanceOfBatch(accounts, ids).call()
+        except Exception as e:
+            # Contract без balanceOfBatch (или твърде голяма порция) - поединично
+            print(f"⚠️  balanceOfBatch неуспешен ({str(e)}), поединични заявки...")
+            return [self.contract.functions.balanceOf(account, token_id).call()
+                    for account, token_id in zip(accounts, ids)]
+    
+    def check_ownership_bulk(self, holdings: List[Tuple[str, int]], batch_size: Optional[int] = None,
+                             max_workers: Optional[int] = None) -> Dict[Tuple[str, int], bool]:
+        """Проверява собственост за много (адрес, token ID) двойки наведнъж"""
+        balances = self.get_balances(holdings, batch_size, max_workers)
+        return {key: balance > 0 for key, balance in balances.items()}
+    
+    def _send_transaction(self, function, fees: Optional[Dict] = None,
+                          gas: Optional[int] = None, units: int = 1, on_signed=None,
+                          on_sent=None) -> str:
+        """
+        Изпраща транзакция с локално разпределен nonce. Газ лимитът и таксите
+        идват от gas oracle-а, освен ако не са подадени; units е броят
+        единици работа (напр. парцели в mintPlots) за статистиката на газа.
+        on_signed(tx_hash, nonce, raw) се извиква след подписване, преди изпращане,
+        а on_sent(tx_hash) - едва след като node-ът е приел транзакцията.
+        """
+        if fees is None:
+            fees = self.gas.fees()
+        if gas is None:
+            gas = self.gas.gas_limit(function, units)
+        
+        for attempt in range(self.MAX_NONCE_RETRIES + 1):
+            signed_tx = None
+            try:
+                # Построява транзакция
+                tx = function.build_transaction({
+                    'from': self.address,
+                    'nonce': self.nonces.allocate(),
+                    'gas': gas,
+                    **fees
+                })
+                
+                # Подписва транзакцията
+                signed_tx = self.account.sign_transaction(tx)
+                if on_signed:
+                    on_signed(_tx_key(signed_tx.hash), tx['nonce'], signed_tx.raw_transaction)
+                
+                # Изпраща транзакцията
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                # Разпределеният nonce не е използван - без синхронизация би останала дупка
+                self.nonces.resync()
+                message = str(e).lower()
+                if 'already known' in message and signed_tx is not None:
+                    # Същата подписана транзакция вече е в mempool-а
+                    tx_hash = signed_tx.hash
+                elif attempt < self.MAX_NONCE_RETRIES and any(err in message for err in NONCE_ERRORS):
+                    print(f"⚠️  Nonce конфликт ({e}), повторен опит...")
+                    continue
+                else:
+                    raise
+            
+            self._gas_keys[_tx_key(tx_hash)] = (function.fn_name, units)
+            if on_sent:
+                on_sent(_tx_key(tx_hash))
+            return tx_hash
+    
+    def submit_transactions(self, functions: List, gas_limits: Optional[List[int]] = None,
+                            units: Optional[List[int]] = None,
+                            on_signed: Optional[List] = None,
+                            on_sent: Optional[List] = None) -> List[str]:
+        """
+        Подписва и изпраща транзакции една след друга, без да чака receipt-и.
+        on_signed и on_sent са по избор списъци с по един callback за транзакция.
+        """
+        fees = self.gas.fees()
+        gas_limits = gas_limits or [None] * len(functions)
+        units = units or [1] * len(functions)
+        on_signed = on_signed or [None] * len(functions)
+        on_sent = on_sent or [None] * len(functions)
+        return [self._send_transaction(function, fees, gas, count, signed, sent)
+                for function, gas, count, signed, sent
+                in zip(functions, gas_limits, units, on_signed, on_sent)]
+    
+    def wait_for_receipts(self, tx_hashes: List[str], timeout: float = RECEIPT_TIMEOUT) -> List:
+        """Чака receipt-ите на няколко транзакции наведнъж (в реда на tx_hashes)"""
+        futures = [self.receipts.track(tx_hash) for tx_hash in tx_hashes]
+        deadline = time.monotonic() + timeout
+        return [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+    
+    def rebroadcast(self, raw) -> str:
+        """
+        Изпраща отново вече подписана транзакция (напр. от журнала след
+        рестарт). Връща 'sent', 'known' (вече е в mempool-а) или 'stale'
+        (nonce-ът е използван от друга транзакция).
+        """
+        try:
+            self.w3.eth.send_raw_transaction(raw)
+            return 'sent'
+        except Exception as e:
+            message = str(e).lower()
+            if 'already known' in message:
+                return 'known'
+            if any(err in message for err in NONCE_ERRORS):
+                return 'stale'
+            raise
+    
+    def _on_new_block(self, block_number: int):
+        self.view_cache.note_block(block_number)
+        self.gas.note_block(block_number)
+    
+    def _learn_gas(self, tx_hash: str, receipt):
+        """Записва изразходвания газ на собствена транзакция в gas oracle-а"""
+        entry = self._gas_keys.pop(tx_hash, None)
+        if entry is not None:
+            self.gas.record(entry[0], receipt, entry[1])
+    
+    def _extract_token_ids_from_receipt(self, receipt) -> List[int]:
+        """Всички създадени token ID-та в receipt-а (по декодираните събития)"""
+        return [asset['id'] for asset in self.events.created_assets(receipt)]
     
     def _extract_token_id_from_receipt(self, receipt) -> int:
-        """Извлича token ID от transaction receipt"""
-        # Търси в logs за AssetCreated event
-        for log in receipt['logs']:
-            if len(log['topics']) > 1:
-                # Token ID обикновено е във втория topic
-                return int(log['topics'][1].hex(), 16)
-        return 0
+        """Token ID на единствения създаден актив в receipt-а; 0 ако няма"""
+        token_ids = self._extract_token_ids_from_receipt(receipt)
+        if len(token_ids) > 1:
+            print(f"⚠️  Receipt с {len(token_ids)} създадени актива - използва се първият")
+        return token_ids[0] if token_ids else 0
     
-    def get_transaction_status(self, tx_hash: str) -> Dict:
-        """Проверява статус на транзакция"""
+    def get_transaction_status(self, tx_hash: Optional[str] = None) -> Dict:
+        """
+        Проверява статус на транзакция. Без tx_hash връща всички чакащи
+        транзакции (hash -> секунди от изпращането).
+        """
+        if tx_hash is None:
+            now = time.time()
+            return {'pending': {key: now - submitted for key, submitted in self.receipts.pending().items()}}
+        if self.receipts.is_pending(tx_hash):
+            return {'status': 'pending'}
         try:
             receipt = self.w3.eth.get_transaction_receipt(tx_hash)
             return {
@@ -352,6 +1060,503 @@ class BlockchainConnector:
             return {'status': 'pending'}
 
 
+# ============================================
+# ASYNC BLOCKCHAIN CONNECTOR
+# ============================================
+
+class AsyncNonceManager:
+    """NonceManager за asyncio - разпределя nonce-и под asyncio.Lock"""
+    
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._lock = asyncio.Lock()
+        self._next_nonce: Optional[int] = None
+    
+    async def allocate(self) -> int:
+        """Връща следващия свободен nonce"""
+        async with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = await self._fetch()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+    
+    async def resync(self) -> int:
+        """Синхронизира с веригата (вкл. транзакциите в mempool-а)"""
+        async with self._lock:
+            self._next_nonce = await self._fetch()
+            return self._next_nonce
+    
+    async def _fetch(self) -> int:
+        return await self.w3.eth.get_transaction_count(self.address, 'pending')
+
+
+class AsyncReceiptTracker:
+    """
+    ReceiptTracker за asyncio: една задача в event loop-а проверява чакащите
+    транзакции само при нов блок, на порции от batch_size паралелни заявки.
+    """
+    
+    def __init__(self, w3, poll_interval: float = 0.5, batch_size: int = 100,
+                 on_new_block=None, on_receipt=None):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.on_new_block = on_new_block
+        self.on_receipt = on_receipt
+        
+        # tx hash (hex) -> (Future, callback, време на изпращане)
+        self._pending: 'OrderedDict[str, Tuple[asyncio.Future, Optional[callable], float]]' = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._last_block: Optional[int] = None
+        self._unchecked: set = set()
+    
+    def track(self, tx_hash, callback=None) -> asyncio.Future:
+        """
+        Регистрира транзакция. Future-ът получава callback(receipt), ако е
+        подаден callback, иначе самия receipt.
+        """
+        key = _tx_key(tx_hash)
+        if key in self._pending:
+            return self._pending[key][0]
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = (future, callback, time.time())
+        self._unchecked.add(key)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return future
+    
+    def pending(self) -> Dict[str, float]:
+        """Чакащите транзакции (hex hash -> време на изпращане)"""
+        return {key: submitted for key, (_, _, submitted) in self._pending.items()}
+    
+    async def poll(self) -> int:
+        """Една проверка; връща броя потвърдени транзакции"""
+        block = await self.w3.eth.block_number
+        if block != self._last_block:
+            self._unchecked = set(self._pending)
+            self._last_block = block
+            if self.on_new_block:
+                self.on_new_block(block)
+        keys = [key for key in self._pending if key in self._unchecked][:self.batch_size]
+        self._unchecked.difference_update(keys)
+        
+        receipts = await asyncio.gather(
+            *(self.w3.eth.get_transaction_receipt(key) for key in keys),
+            return_exceptions=True
+        )
+        resolved = 0
+        for key, receipt in zip(keys, receipts):
+            if isinstance(receipt, TransactionNotFound):
+                continue
+            if isinstance(receipt, Exception):
+                # Мрежова грешка - проверява се пак при следващия блок
+                print(f"⚠️  Грешка при проверка на receipt {key}: {str(receipt)}")
+                continue
+            self._resolve(key, receipt)
+            resolved += 1
+        return resolved
+    
+    def _resolve(self, key: str, receipt):
+        future, callback, _ = self._pending.pop(key)
+        if self.on_receipt:
+            try:
+                self.on_receipt(key, receipt)
+            except Exception as e:
+                print(f"⚠️  Грешка при обработка на receipt {key}: {str(e)}")
+        if future.done():
+            return
+        try:
+            future.set_result(callback(receipt) if callback else receipt)
+        except Exception as e:
+            future.set_exception(e)
+    
+    async def _run(self):
+        while self._pending:
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"⚠️  Грешка при проверка на receipt-и: {str(e)}")
+            # Непроверените от предишната порция се обработват веднага
+            if not self._unchecked:
+                await asyncio.sleep(self.poll_interval)
+
+
+class AsyncBlockchainConnector:
+    """
+    Asyncio вариант на BlockchainConnector върху AsyncWeb3 - един event loop
+    обслужва много едновременни заявки без отделна блокираща нишка за всяка.
+    Създава се с `await AsyncBlockchainConnector.connect(config)`.
+    """
+    
+    # ABI-тата и обработката на receipt-и са общи със синхронния connector
+    _get_contract_abi = BlockchainConnector._get_contract_abi
+    _get_land_registry_abi = BlockchainConnector._get_land_registry_abi
+    _record_plot_mint = BlockchainConnector._record_plot_mint
+    _record_npc_mint = BlockchainConnector._record_npc_mint
+    _extract_token_ids_from_receipt = BlockchainConnector._extract_token_ids_from_receipt
+    _extract_token_id_from_receipt = BlockchainConnector._extract_token_id_from_receipt
+    _learn_gas = BlockchainConnector._learn_gas
+    
+    MAX_NONCE_RETRIES = BlockchainConnector.MAX_NONCE_RETRIES
+    RECEIPT_TIMEOUT = BlockchainConnector.RECEIPT_TIMEOUT
+    # Максимален брой едновременни заявки в bulk методите
+    BULK_CONCURRENCY = 50
+    
+    def __init__(self, config: Dict, w3):
+        self.rpc_url = config['rpc_url']
+        self.contract_address = config['contract_address']
+        self.private_key = config['private_key']
+        self.w3 = w3
+        
+        # Настройва акаунт
+        self.account = Account.from_key(self.private_key)
+        self.address = self.account.address
+        
+        # Зарежда ABI и създава contract instance
+        self.contract_abi = self._get_contract_abi()
+        self.contract = self.w3.eth.contract(
+            address=Web3.to_checksum_address(self.contract_address),
+            abi=self.contract_abi
+        )
+        
+        self.land_registry = None
+        if config.get('land_registry_address'):
+            self.land_registry = self.w3.eth.contract(
+                address=Web3.to_checksum_address(config['land_registry_address']),
+                abi=self._get_land_registry_abi()
+            )
+        
+        self.minted_assets = {}
+        self.events = ReceiptDecoder(
+            self.w3, [self.contract] + ([self.land_registry] if self.land_registry else [])
+        )
+        
+        self.gas = AsyncGasOracle(self.w3, self.address)
+        self._gas_keys: Dict[str, Tuple[str, int]] = {}
+        self.receipts = AsyncReceiptTracker(self.w3, on_new_block=self.gas.note_block,
+                                            on_receipt=self._learn_gas)
+        self.nonces = AsyncNonceManager(self.w3, self.address)
+    
+    @classmethod
+    async def connect(cls, config: Dict) -> 'AsyncBlockchainConnector':
+        """Създава AsyncWeb3 връзка (с pool от връзки) и проверява node-а"""
+        w3 = await get_async_web3(
+            config['rpc_url'],
+            pool_size=config.get('http_pool_size', DEFAULT_POOL_SIZE),
+            connect_timeout=config.get('http_connect_timeout', DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=config.get('http_read_timeout', DEFAULT_READ_TIMEOUT)
+        )
+        if not await w3.is_connected():
+            await close_async_web3(w3)
+            raise ConnectionError(f"Не може да се свърже с {config['rpc_url']}")
+        
+        connector = cls(config, w3)
+        print(f"✅ Blockchain свързан (async): {connector.address}")
+        return connector
+    
+    async def close(self):
+        """Затваря HTTP сесията"""
+        await close_async_web3(self.w3)
+    
+    @property
+    def pending_transactions(self) -> List[str]:
+        """Изпратени, но още непотвърдени транзакции"""
+        return list(self.receipts.pending())
+    
+    async def mint_plot_nft(self, player_id: str, plot_number: int, zone: str, wait: bool = True) -> Dict:
+        """
+        Минтва парцел като NFT. При wait=False връща веднага tx_hash и future,
+        който се разрешава с резултата след потвърждение.
+        """
+        try:
+            print(f"⛓️  Минтване на парцел #{plot_number} ({zone}) за {player_id}...")
+            
+            function = self.contract.functions.mintOctaviaPlot(
+                Web3.to_checksum_address(player_id),
+                plot_number,
+                zone
+            )
+            
+            return await self._submit(function, lambda receipt: self._record_plot_mint(
+                player_id, plot_number, receipt
+            ), wait)
+            
+        except Exception as e:
+            print(f"❌ Грешка при минтване: {str(e)}")
+            raise
+    
+    async def build_structure_on_chain(self, plot_token_id: int, structure_type: StructureType,
+                                       wait: bool = True) -> Dict:
+        """Строи структура на парцел (on-chain)"""
+        try:
+            print(f"🏗️  Строене на {structure_type.name} на парцел token {plot_token_id}...")
+            
+            function = self.contract.functions.buildStructure(
+                plot_token_id,
+                structure_type.value
+            )
+            
+            def on_receipt(receipt):
+                print(f"✅ Структура построена! TX: {receipt['transactionHash'].hex()}")
+                return {'tx_hash': receipt['transactionHash'].hex()}
+            
+            return await self._submit(function, on_receipt, wait)
+            
+        except Exception as e:
+            print(f"❌ Грешка при строене: {str(e)}")
+            raise
+    
+    async def mint_npc_nft(self, npc: NPC, initial_owner: str, wait: bool = True) -> Dict:
+        """Минтва NPC като NFT"""
+        try:
+            print(f"👤 Минтване на NPC: {npc.get_name()} (ID: {npc.id})...")
+            
+            function = self.contract.functions.spawnNPC(
+                npc.planet_id,
+                npc.get_name(),
+                Web3.to_checksum_address(initial_owner)
+            )
+            
+            return await self._submit(function, lambda receipt: self._record_npc_mint(
+                npc, initial_owner, receipt
+            ), wait)
+            
+        except Exception as e:
+            print(f"❌ Грешка при минтване на NPC: {str(e)}")
+            raise
+    
+    async def sync_npc_loyalty(self, npc_token_id: int, player_id: str,
+                               current_loyalty: float, previous_loyalty: float,
+                               wait: bool = True) -> Dict:
+        """Синхронизира лоялност на NPC on-chain"""
+        try:
+            is_increase = current_loyalty > previous_loyalty
+            loyalty_change = abs(current_loyalty - previous_loyalty)
+            
+            if loyalty_change == 0:
+                return {}
+            
+            print(f"💝 Актуализиране на NPC {npc_token_id} лоялност: {previous_loyalty:.1f} → {current_loyalty:.1f}")
+            
+            function = self.contract.functions.updateNPCLoyalty(
+                npc_token_id,
+                Web3.to_checksum_address(player_id),
+                int(loyalty_change),
+                is_increase
+            )
+            
+            def on_receipt(receipt):
+                print(f"✅ Лоялност синхронизирана! TX: {receipt['transactionHash'].hex()}")
+                return {'tx_hash': receipt['transactionHash'].hex()}
+            
+            return await self._submit(function, on_receipt, wait)
+            
+        except Exception as e:
+            print(f"❌ Грешка при синхронизация на лоялност: {str(e)}")
+            raise
+    
+    async def extract_and_sync_resource(self, planet_id: int, resource_type: str,
+                                        amount: int, extractor_address: str,
+                                        wait: bool = True) -> Dict:
+        """Извлича ресурс и синхронизира on-chain"""
+        try:
+            print(f"⛏️  Извличане на {amount} {resource_type} от планета {planet_id}...")
+            
+            function = self.contract.functions.extractPlanetaryResource(
+                planet_id,
+                resource_type,
+                amount,
+                Web3.to_checksum_address(extractor_address)
+            )
+            
+            def on_receipt(receipt):
+                print(f"✅ Ресурс извлечен! TX: {receipt['transactionHash'].hex()}")
+                return {'tx_hash': receipt['transactionHash'].hex()}
+            
+            return await self._submit(function, on_receipt, wait)
+            
+        except Exception as e:
+            print(f"❌ Грешка при извличане на ресурс: {str(e)}")
+            raise
+    
+    async def check_ownership(self, address: str, token_id: int) -> bool:
+        """Проверява собственост върху NFT"""
+        try:
+            balance = await self.contract.functions.balanceOf(
+                Web3.to_checksum_address(address),
+                token_id
+            ).call()
+            return balance > 0
+        except Exception as e:
+            print(f"❌ Грешка при проверка на собственост: {str(e)}")
+            return False
+    
+    # --- bulk ---
+    
+    async def gather_limited(self, awaitables: List, limit: Optional[int] = None) -> List:
+        """
+        asyncio.gather с най-много limit едновременно изпълнявани awaitables.
+        Резултатите са в реда на входа; грешките се връщат като exception
+        обекти, без да спират останалите.
+        """
+        semaphore = asyncio.Semaphore(limit or self.BULK_CONCURRENCY)
+        
+        async def run(awaitable):
+            async with semaphore:
+                return await awaitable
+        
+        return await asyncio.gather(*(run(awaitable) for awaitable in awaitables),
+                                    return_exceptions=True)
+    
+    async def mint_plot_nfts(self, claims: List[Tuple[str, int, str]],
+                             limit: Optional[int] = None) -> List:
+        """
+        Минтва много парцели едновременно: claims е списък (player_id,
+        plot_number, zone). Връща резултат или exception за всеки claim.
+        """
+        return await self.gather_limited(
+            [self.mint_plot_nft(player_id, plot_number, zone)
+             for player_id, plot_number, zone in claims],
+            limit
+        )
+    
+    async def check_ownership_bulk(self, holdings: List[Tuple[str, int]],
+                                   limit: Optional[int] = None) -> Dict[Tuple[str, int], bool]:
+        """Проверява собственост за много (адрес, token ID) двойки едновременно"""
+        keys = list(dict.fromkeys(holdings))
+        results = await self.gather_limited(
+            [self.check_ownership(address, token_id) for address, token_id in keys],
+            limit
+        )
+        return dict(zip(keys, results))
+    
+    # --- транзакции ---
+    
+    async def _submit(self, function, on_receipt, wait: bool = True) -> Dict:
+        """
+        Изпраща транзакция и регистрира on_receipt в тракера. При wait=True
+        връща резултата на on_receipt, иначе {'tx_hash', 'future'} веднага.
+        """
+        tx_hash = await self._send_transaction(function)
+        future = self.receipts.track(tx_hash, on_receipt)
+        if wait:
+            return await asyncio.wait_for(asyncio.shield(future), self.RECEIPT_TIMEOUT)
+        return {'tx_hash': _tx_key(tx_hash), 'future': future}
+    
+    async def _send_transaction(self, function, fees: Optional[Dict] = None,
+                                gas: Optional[int] = None, units: int = 1) -> str:
+        """Изпраща транзакция с локално разпределен nonce; газът и таксите - от gas oracle-а"""
+        if fees is None:
+            fees = await self.gas.fees()
+        if gas is None:
+            gas = await self.gas.gas_limit(function, units)
+        
+        for attempt in range(self.MAX_NONCE_RETRIES + 1):
+            signed_tx = None
+            try:
+                tx = await function.build_transaction({
+                    'from': self.address,
+                    'nonce': await self.nonces.allocate(),
+                    'gas': gas,
+                    **fees
+                })
+                signed_tx = self.account.sign_transaction(tx)
+                tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                await self.nonces.resync()
+                message = str(e).lower()
+                if 'already known' in message and signed_tx is not None:
+                    tx_hash = signed_tx.hash
+                elif attempt < self.MAX_NONCE_RETRIES and any(err in message for err in NONCE_ERRORS):
+                    print(f"⚠️  Nonce конфликт ({e}), повторен опит...")
+                    continue
+                else:
+                    raise
+            
+            self._gas_keys[_tx_key(tx_hash)] = (function.fn_name, units)
+            return tx_hash
+
+
+# ============================================
+# WRITE-BEHIND SYNC QUEUE
+# ============================================
+
+class SyncQueue:
+    """
+    Write-behind опашка за on-chain синхронизация. Повтарящите се промени се
+    сливат: лоялността по (NPC token, играч) до една нетна делта, извличанията
+    по (планета, ресурс, извличащ) до едно общо количество. Дробният остатък
+    на изпратена делта се пренася към следващата промяна на същата двойка.
+    """
+    
+    def __init__(self, max_pending: int = 100, max_delay: float = 30.0):
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        
+        self._loyalty: Dict[Tuple[int, str], float] = {}
+        self._extractions: Dict[Tuple[int, str, str], int] = {}
+        # Неизпратени дробни остатъци - не броят като чакащи промени
+        self._remainders: Dict[Tuple[int, str], float] = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def add_loyalty(self, npc_token_id: int, player_id: str, delta: float):
+        """Добавя промяна на лоялност към нетната делта за (NPC, играч)"""
+        with self._lock:
+            key = (npc_token_id, player_id)
+            # Остатъкът се взима само за нова двойка - иначе чака следващото изпразване
+            if key not in self._loyalty:
+                self._loyalty[key] = self._remainders.pop(key, 0)
+            self._loyalty[key] += delta
+            self._touch()
+    
+    def add_extraction(self, planet_id: int, resource_type: str, extractor: str, amount: int):
+        """Добавя извличане към общото количество за (планета, ресурс, извличащ)"""
+        with self._lock:
+            key = (planet_id, resource_type, extractor)
+            self._extractions[key] = self._extractions.get(key, 0) + amount
+            self._touch()
+    
+    def _touch(self):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+    
+    def should_flush(self) -> bool:
+        """Достигнат ли е прагът по брой записи или по възраст на най-стария"""
+        with self._lock:
+            if self._oldest is None:
+                return False
+            return (len(self._loyalty) + len(self._extractions) >= self.max_pending
+                    or time.monotonic() - self._oldest >= self.max_delay)
+    
+    def drain(self) -> Tuple[Dict[Tuple[int, str], float], Dict[Tuple[int, str, str], int]]:
+        """Изпразва опашката и връща слетите промени"""
+        with self._lock:
+            loyalty, extractions = self._loyalty, self._extractions
+            self._loyalty, self._extractions = {}, {}
+            self._oldest = None
+            return loyalty, extractions
+    
+    def requeue(self, loyalty: Dict, extractions: Dict):
+        """Връща неизпратени промени обратно (слети с новите)"""
+        for (npc_token_id, player_id), delta in loyalty.items():
+            self.add_loyalty(npc_token_id, player_id, delta)
+        for (planet_id, resource_type, extractor), amount in extractions.items():
+            self.add_extraction(planet_id, resource_type, extractor, amount)
+    
+    def carry(self, remainders: Dict[Tuple[int, str], float]):
+        """Пази дробните остатъци до следващата промяна на лоялността за (NPC, играч)"""
+        with self._lock:
+            for key, remainder in remainders.items():
+                self._remainders[key] = self._remainders.get(key, 0) + remainder
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._loyalty) + len(self._extractions)
+
+
 # ============================================
 # UNIVERSE-BLOCKCHAIN BRIDGE
 # ============================================
@@ -359,11 +1564,17 @@ class BlockchainConnector:
 class SaraktBridge:
     """Мост между Universe Engine и Blockchain"""
     
-    def __init__(self, universe: SaraktUniverse, blockchain: BlockchainConnector):
+    def __init__(self, universe: SaraktUniverse, blockchain: BlockchainConnector,
+                 journal: Optional[TxJournal] = None):
         self.universe = universe
         self.blockchain = blockchain
-        self.sync_queue = []
+        # Журнал на минтванията - за възстановяване след срив (recover())
+        self.journal = journal
+        # Промените се натрупват и изпращат слети при праг по брой или време
+        self.sync_queue = SyncQueue()
         self.auto_sync = True
+        self._flush_timer: Optional[threading.Timer] = None
+        self._flush_lock = threading.Lock()
         
         # Проследява синхронизирани активи
         self.synced_assets = {
@@ -373,11 +1584,14 @@ class SaraktBridge:
             'resources': set()
         }
     
-    def claim_plot(self, player_id: str, plot_number: int) -> Dict:
-        """Играч претендира парцел"""
+    def claim_plot(self, player_id: str, plot_number: int, wait: bool = True) -> Dict:
+        """
+        Играч претендира парцел. При wait=False връща веднага, а token ID-то
+        се свързва с парцела след потвърждение (при неуспех претенцията се отменя).
+        """
         try:
             city = self.universe.get_city('Octavia Capital City')
-            plot = next((p for p in city.plots if p.id == plot_number), None)
+            plot = city.get_plot(plot_number)
             
             if not plot:
                 raise ValueError('Парцел не е намерен')
@@ -386,45 +1600,175 @@ class SaraktBridge:
             
             # 1. Актуализира universe state
             plot.owner = player_id
+            intent_id = self._journal_intent('claim_plot', player_id=player_id, plot_number=plot_number)
             
             # 2. Минтва NFT на blockchain
-            result = self.blockchain.mint_plot_nft(player_id, plot_number, plot.zone)
+            try:
+                result = self.blockchain.mint_plot_nft(player_id, plot_number, plot.zone, wait,
+                                                       self._journal_broadcast(intent_id))
+            except Exception as e:
+                if self._journal_abort(intent_id, e):
+                    plot.owner = None
+                raise
             
             # 3. Свързва NFT с game asset
-            plot.token_id = result['token_id']
-            self.synced_assets['plots'].add(plot_number)
+            link = lambda minted: self._link_plot(intent_id, plot, minted)
             
-            print(f"✅ Парцел {plot_number} претендиран от {player_id}")
+            if wait:
+                link(result)
+            else:
+                result['future'].add_done_callback(lambda future: self._on_confirmed(
+                    future, link, lambda e: self._unclaim_plot(intent_id, plot, e)
+                ))
             return {'plot': plot, 'nft': result}
             
         except Exception as e:
             print(f"❌ Неуспешно претендиране: {str(e)}")
             raise
     
+    def claim_plots(self, claims: List[Tuple[str, int]], area_m2: int) -> Dict:
+        """
+        Масово претендиране на парцели: claims е списък (player_id, plot_number).
+        Последователните парцели на един играч се минтват заедно с
+        LandRegistry.mintPlots, на партиди според лимита на газ в блока.
+        Всяка партида е отделно намерение в журнала (claim_plots_batch).
+        Ако минтването прекъсне след изпращане на някоя партида, връща кои
+        парцели са претендирани, неуспешни и чакащи (pending). Партида, чието
+        изпращане е отказано, се отменя.
+        """
+        try:
+            city = self.universe.get_city('Octavia Capital City')
+            
+            plots = {}
+            for player_id, plot_number in claims:
+                plot = city.get_plot(plot_number)
+                if not plot:
+                    raise ValueError(f'Парцел {plot_number} не е намерен')
+                if plot.owner or plot_number in plots:
+                    raise ValueError(f'Парцел {plot_number} вече е зает')
+                plots[plot_number] = (player_id, plot)
+            
+            # 1. Актуализира universe state
+            for player_id, plot in plots.values():
+                plot.owner = player_id
+            
+            # 2. Групира в непрекъснати поредици по играч, разделени по лимита на партида
+            max_count = self.blockchain.max_plots_per_batch()
+            batches = []
+            for player_id, plot_number in sorted(claims):
+                if batches:
+                    start_id, count, owner = batches[-1]
+                    if owner == player_id and start_id + count == plot_number and count < max_count:
+                        batches[-1] = (start_id, count + 1, owner)
+                        continue
+                batches.append((plot_number, 1, player_id))
+            
+            # 3. Всяка партида е отделно намерение в журнала
+            batch_plots = [[plots[plot_number][1] for plot_number in range(start_id, start_id + count)]
+                           for start_id, count, _ in batches]
+            intents = [self._journal_intent('claim_plots_batch', start_id=start_id, count=count,
+                                            player_id=player_id, area_m2=area_m2)
+                       for start_id, count, player_id in batches]
+            
+            # Изпратените партиди (индекс -> tx_hash) - приети от node-а
+            sent = {}
+            
+            def on_sent(index: int):
+                def record(tx_hash):
+                    sent[index] = tx_hash
+                return record
+            
+            # 4. Минтва и свързва по PlotMinted събитията
+            try:
+                minted = self.blockchain.mint_plot_batches(
+                    batches, area_m2,
+                    [self._journal_broadcast(intent_id) for intent_id in intents],
+                    [on_sent(index) for index in range(len(batches))]
+                )
+            except Exception as e:
+                if not sent:
+                    for intent_id, batch in zip(intents, batch_plots):
+                        self._unclaim_plots(intent_id, batch, e)
+                    raise
+                return self._settle_plot_batches(intents, batch_plots, sent, e)
+            
+            claimed, failed = [], []
+            for intent_id, batch in zip(intents, batch_plots):
+                batch_claimed, batch_failed = self._link_plot_batch(intent_id, batch, minted)
+                claimed.extend(batch_claimed)
+                failed.extend(batch_failed)
+            
+            print(f"✅ {len(claimed)} парцела претендирани с {len(batches)} транзакции")
+            return {'plots': claimed, 'failed': failed, 'pending': [], 'transactions': len(batches)}
+            
+        except Exception as e:
+            print(f"❌ Неуспешно масово претендиране: {str(e)}")
+            raise
+    
+    def _settle_plot_batches(self, intents: List, batch_plots: List, sent: Dict, error) -> Dict:
+        """
+        Разрешава партидите след грешка по средата на claim_plots. Неизпратените
+        (и тези, чието изпращане е отказано) се отменят; за изпратените решава
+        receipt-ът, а без receipt партидата остава чакаща и се свързва фоново
+        при потвърждение.
+        """
+        claimed, failed, pending = [], [], []
+        for index, (intent_id, batch) in enumerate(zip(intents, batch_plots)):
+            if index not in sent:
+                self._unclaim_plots(intent_id, batch, error)
+                failed.extend(plot.id for plot in batch)
+                continue
+            try:
+                receipt = self._fetch_receipt(sent[index])
+            except Exception:
+                receipt = None
+            if receipt is None:
+                self._track_plot_batch(intent_id, batch, sent[index])
+                pending.extend(plot.id for plot in batch)
+            else:
+                batch_claimed, batch_failed = self._link_plot_batch(
+                    intent_id, batch, self.blockchain._record_plot_batch(receipt)
+                )
+                claimed.extend(batch_claimed)
+                failed.extend(batch_failed)
+        
+        print(f"⚠️  Масовото претендиране е прекъснато ({error}): {len(claimed)} претендирани, "
+              f"{len(failed)} неуспешни, {len(pending)} чакат потвърждение")
+        return {'plots': claimed, 'failed': failed, 'pending': pending, 'transactions': len(sent)}
+    
     def build_on_plot(self, player_id: str, plot_number: int, 
                      structure_type: StructureType) -> Dict:
         """Играч строи на парцел"""
         try:
             city = self.universe.get_city('Octavia Capital City')
-            plot = next((p for p in city.plots if p.id == plot_number), None)
+            plot = city.get_plot(plot_number)
             
             if not plot:
                 raise ValueError('Парцел не е намерен')
             if plot.owner != player_id:
                 raise ValueError('Не сте собственик на парцела')
-            if not plot.token_id:
-                raise ValueError('Парцел не е минтнат като NFT')
             
             # 1. Проверява on-chain собственост
-            is_owner = self.blockchain.check_ownership(player_id, plot.token_id)
+            if plot.token_id:
+                is_owner = self.blockchain.check_ownership(player_id, plot.token_id)
+            elif plot.registry_id:
+                # Масово претендиран парцел - собственикът е в LandRegistry
+                on_chain = self.blockchain.get_plot_on_chain(plot.registry_id)
+                is_owner = (on_chain is not None and
+                            on_chain['owner'] == Web3.to_checksum_address(player_id))
+            else:
+                raise ValueError('Парцел не е минтнат като NFT')
             if not is_owner:
                 raise ValueError('Blockchain собствеността не съвпада')
             
             # 2. Строи в играта
             city.develop_plot(plot_number, structure_type, player_id)
             
-            # 3. Актуализира blockchain
-            receipt = self.blockchain.build_structure_on_chain(plot.token_id, structure_type)
+            # 3. Актуализира blockchain (LandRegistry няма buildStructure -
+            # строежът на масово претендиран парцел остава само в играта)
+            receipt = None
+            if plot.token_id:
+                receipt = self.blockchain.build_structure_on_chain(plot.token_id, structure_type)
             
             self.synced_assets['structures'].add(f"{plot_number}_{structure_type.name}")
             
@@ -435,28 +1779,299 @@ class SaraktBridge:
             print(f"❌ Строеж неуспешен: {str(e)}")
             raise
     
-    def spawn_and_mint_npc(self, planet_id: int, player_id: str) -> Dict:
-        """Създава NPC и минтва като NFT"""
+    def spawn_and_mint_npc(self, planet_id: int, player_id: str, wait: bool = True) -> Dict:
+        """Създава NPC и минтва като NFT (при wait=False потвърждава фоново)"""
         try:
             # 1. Създава в играта
             npc_id = len(self.universe.npcs) + 1
-            npc = NPC(npc_id, planet_id, 50000 + npc_id)
-            self.universe.npcs.append(npc)
+            npc = self.universe.add_npc(
+                NPC(npc_id, planet_id, 50000 + npc_id, self.universe.generator_version)
+            )
+            
+            intent_id = self._journal_intent('spawn_npc', npc_id=npc_id, planet_id=planet_id,
+                                             player_id=player_id,
+                                             generator_version=self.universe.generator_version)
             
             # 2. Минтва като NFT
-            result = self.blockchain.mint_npc_nft(npc, player_id)
+            try:
+                result = self.blockchain.mint_npc_nft(npc, player_id, wait,
+                                                      self._journal_broadcast(intent_id))
+            except Exception as e:
+                self._journal_abort(intent_id, e)
+                raise
             
             # 3. Свързва
-            npc.token_id = result['token_id']
-            self.synced_assets['npcs'].add(npc_id)
+            link = lambda minted: self._link_npc(intent_id, npc, minted)
             
-            print(f"✅ NPC {npc.get_name()} създаден и минтнат")
+            if wait:
+                link(result)
+            else:
+                result['future'].add_done_callback(lambda future: self._on_confirmed(
+                    future, link, lambda e: self._journal_fail(intent_id, e)
+                ))
             return {'npc': npc, 'nft': result}
             
         except Exception as e:
             print(f"❌ Създаване на NPC неуспешно: {str(e)}")
             raise
     
+    def _on_confirmed(self, future, on_success, on_failure=None):
+        """Обработва фоново потвърдена (или неуспешна) транзакция"""
+        try:
+            on_success(future.result())
+        except Exception as e:
+            print(f"❌ Транзакцията не е потвърдена: {str(e)}")
+            if on_failure:
+                on_failure(e)
+    
+    def _link_plot(self, intent_id: Optional[str], plot, minted: Dict):
+        plot.token_id = minted['token_id']
+        self.synced_assets['plots'].add(plot.id)
+        if self.journal and intent_id:
+            self.journal.confirm(intent_id, minted)
+        print(f"✅ Парцел {plot.id} претендиран от {plot.owner}")
+    
+    def _link_plot_batch(self, intent_id: Optional[str], plots: List, minted: Dict) -> Tuple[List, List[int]]:
+        """
+        Свързва минтнатите парцели на една партида, а неминтнатите освобождава.
+        Връща (претендирани парцели, номера на неуспешните).
+        """
+        claimed, failed = [], []
+        for plot in plots:
+            if plot.id in minted:
+                # ID-то в LandRegistry не е ERC1155 token - пази се в registry_id,
+                # а token_id остава празен
+                plot.registry_id = plot.id
+                self.synced_assets['plots'].add(plot.id)
+                claimed.append(plot)
+            else:
+                plot.owner = None
+                failed.append(plot.id)
+        if self.journal and intent_id:
+            if claimed:
+                self.journal.confirm(intent_id, {'plot_ids': [plot.id for plot in claimed],
+                                                 'tx_hash': minted[claimed[0].id]['tx_hash']})
+            else:
+                self.journal.fail(intent_id, 'партидата не е минтната')
+        return claimed, failed
+    
+    def _unclaim_plot(self, intent_id: Optional[str], plot, error):
+        plot.owner = None
+        self._journal_fail(intent_id, error)
+    
+    def _link_npc(self, intent_id: Optional[str], npc: NPC, minted: Dict):
+        npc.token_id = minted['token_id']
+        self.synced_assets['npcs'].add(npc.id)
+        if self.journal and intent_id:
+            self.journal.confirm(intent_id, minted)
+        print(f"✅ NPC {npc.get_name()} създаден и минтнат")
+    
+    # ============================================
+    # ЖУРНАЛ И ВЪЗСТАНОВЯВАНЕ
+    # ============================================
+    
+    def _journal_intent(self, kind: str, **args) -> Optional[str]:
+        return self.journal.intent(kind, **args) if self.journal else None
+    
+    def _journal_broadcast(self, intent_id: Optional[str]):
+        """on_signed за connector-а: траен запис на подписаната транзакция преди изпращане"""
+        if not self.journal or not intent_id:
+            return None
+        return lambda tx_hash, nonce, raw: self.journal.broadcast(intent_id, tx_hash, nonce, raw)
+    
+    def _journal_fail(self, intent_id: Optional[str], error):
+        if self.journal and intent_id:
+            self.journal.fail(intent_id, str(error))
+    
+    def _journal_abort(self, intent_id: Optional[str], error) -> bool:
+        """
+        Отказва намерението след грешка при минтване. Ако подписаната
+        транзакция вече е трайно в журнала, тя може да е включена - намерението
+        остава за recover(), освен ако receipt-ът ѝ не показва revert.
+        Връща True, ако намерението е отказано.
+        """
+        entry = self.journal.entries.get(intent_id) if self.journal and intent_id else None
+        if entry is not None and entry['status'] == BROADCAST:
+            try:
+                receipt = self._fetch_receipt(entry['tx_hash'])
+            except Exception:
+                receipt = None
+            if receipt is None or receipt['status'] == 1:
+                print(f"⚠️  Транзакцията {entry['tx_hash']} е изпратена - намерението остава за recover()")
+                return False
+        self._journal_fail(intent_id, error)
+        return True
+    
+    def recover(self) -> Dict:
+        """
+        Възстановява състоянието от журнала след рестарт. Потвърдените
+        минтвания се прилагат към вселената без заявки към веригата.
+        Изпратените, но непотвърдени транзакции се разпределят по nonce с две
+        заявки: под потвърдения nonce на акаунта са в блок (receipt-ът им се
+        чете), под pending nonce-а са в mempool-а (следят се фоново), а
+        останалите се изпращат отново със същите подписани байтове - без
+        ново минтване. Намерения без подписана транзакция се отказват.
+        """
+        if not self.journal:
+            raise ValueError('Мостът няма журнал')
+        
+        summary = {'confirmed': 0, 'mined': 0, 'in_mempool': 0, 'rebroadcast': 0,
+                   'failed': 0, 'abandoned': 0}
+        pending = []
+        for intent_id, entry in list(self.journal.entries.items()):
+            if entry['status'] == CONFIRMED:
+                self._restore_confirmed(entry)
+                summary['confirmed'] += 1
+            elif entry['status'] == INTENT:
+                self.journal.fail(intent_id, 'не е изпратена преди спиране')
+                summary['abandoned'] += 1
+            elif entry['status'] == BROADCAST:
+                pending.append((intent_id, entry))
+        
+        if pending:
+            w3 = self.blockchain.w3
+            address = self.blockchain.address
+            mined_nonce = w3.eth.get_transaction_count(address, 'latest')
+            pool_nonce = w3.eth.get_transaction_count(address, 'pending')
+            
+            mined = [(i, e) for i, e in pending if e['nonce'] < mined_nonce]
+            in_pool = [(i, e) for i, e in pending if mined_nonce <= e['nonce'] < pool_nonce]
+            unsent = sorted((item for item in pending if item[1]['nonce'] >= pool_nonce),
+                            key=lambda item: item[1]['nonce'])
+            
+            # Повторно изпращане в реда на nonce-ите - дупка би блокирала следващите
+            for intent_id, entry in unsent:
+                outcome = self.blockchain.rebroadcast(entry['raw'])
+                if outcome == 'stale':
+                    mined.append((intent_id, entry))
+                else:
+                    in_pool.append((intent_id, entry))
+                    summary['rebroadcast'] += 1
+            
+            for intent_id, entry in in_pool:
+                self._restore_pending(intent_id, entry)
+            summary['in_mempool'] = len(in_pool) - summary['rebroadcast']
+            
+            # Вече включените - receipt-ите се четат паралелно
+            with ThreadPoolExecutor(max_workers=BlockchainConnector.BALANCE_BATCH_WORKERS) as executor:
+                receipts = executor.map(self._fetch_receipt, [entry['tx_hash'] for _, entry in mined])
+                for (intent_id, entry), receipt in zip(mined, receipts):
+                    if receipt is None or receipt['status'] != 1:
+                        # Nonce-ът е използван от друга транзакция или минтването е отхвърлено
+                        self.journal.fail(intent_id, 'транзакцията не е включена успешно')
+                        summary['failed'] += 1
+                    else:
+                        self._restore_mined(intent_id, entry, receipt)
+                        summary['mined'] += 1
+            
+            self.blockchain.nonces.resync()
+        
+        self.journal.compact()
+        print(f"🔄 Журнал възстановен: {summary}")
+        return summary
+    
+    def _fetch_receipt(self, tx_hash: str):
+        try:
+            return self.blockchain.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+    
+    def _journal_asset(self, entry: Dict):
+        """
+        Парцелът, парцелите на партида или NPC-то на намерение от журнала
+        (NPC се пресъздава детерминистично)
+        """
+        args = entry['args']
+        if entry['kind'] == 'claim_plots_batch':
+            city = self.universe.get_city('Octavia Capital City')
+            plots = [city.get_plot(plot_number)
+                     for plot_number in range(args['start_id'], args['start_id'] + args['count'])]
+            for plot in plots:
+                plot.owner = args['player_id']
+            return plots
+        if entry['kind'] == 'claim_plot':
+            plot = self.universe.get_city('Octavia Capital City').get_plot(args['plot_number'])
+            plot.owner = args['player_id']
+            return plot
+        npc = self.universe.get_npc(args['npc_id'])
+        if npc is None:
+            npc = self.universe.add_npc(NPC(args['npc_id'], args['planet_id'], 50000 + args['npc_id'],
+                                            args['generator_version']))
+        return npc
+    
+    def _restore_confirmed(self, entry: Dict):
+        """Прилага потвърдено минтване от журнала към вселената (без заявки към веригата)"""
+        asset = self._journal_asset(entry)
+        result = entry['result']
+        if entry['kind'] == 'claim_plots_batch':
+            minted = set(result['plot_ids'])
+            for plot in asset:
+                if plot.id in minted:
+                    plot.registry_id = plot.id
+                    self.synced_assets['plots'].add(plot.id)
+                else:
+                    plot.owner = None
+            return
+        asset.token_id = result['token_id']
+        if entry['kind'] == 'claim_plot':
+            self.synced_assets['plots'].add(asset.id)
+            key, asset_type = f'plot_{asset.id}', 'LAND_PLOT'
+        else:
+            self.synced_assets['npcs'].add(asset.id)
+            key, asset_type = f'npc_{asset.id}', 'NPC'
+        self.blockchain.minted_assets[key] = {
+            'token_id': result['token_id'],
+            'owner': entry['args']['player_id'],
+            'type': asset_type,
+            'tx_hash': result['tx_hash']
+        }
+    
+    def _restore_mined(self, intent_id: str, entry: Dict, receipt):
+        """Свързва минтване, включено в блок докато процесът не е работил"""
+        asset = self._journal_asset(entry)
+        player_id = entry['args']['player_id']
+        if entry['kind'] == 'claim_plots_batch':
+            self._link_plot_batch(intent_id, asset, self.blockchain._record_plot_batch(receipt))
+        elif entry['kind'] == 'claim_plot':
+            self._link_plot(intent_id, asset, self.blockchain._record_plot_mint(player_id, asset.id, receipt))
+        else:
+            self._link_npc(intent_id, asset, self.blockchain._record_npc_mint(asset, player_id, receipt))
+    
+    def _restore_pending(self, intent_id: str, entry: Dict):
+        asset = self._journal_asset(entry)
+        args = entry['args']
+        if entry['kind'] == 'claim_plots_batch':
+            self._track_plot_batch(intent_id, asset, entry['tx_hash'])
+            return
+        if entry['kind'] == 'claim_plot':
+            on_receipt = lambda receipt: self.blockchain._record_plot_mint(
+                args['player_id'], args['plot_number'], receipt)
+            link = lambda minted: self._link_plot(intent_id, asset, minted)
+            on_failure = lambda e: self._unclaim_plot(intent_id, asset, e)
+        else:
+            on_receipt = lambda receipt: self.blockchain._record_npc_mint(asset, args['player_id'], receipt)
+            link = lambda minted: self._link_npc(intent_id, asset, minted)
+            on_failure = lambda e: self._journal_fail(intent_id, e)
+        
+        future = self.blockchain.receipts.track(entry['tx_hash'], on_receipt)
+        future.add_done_callback(lambda future: self._on_confirmed(future, link, on_failure))
+    
+    def _track_plot_batch(self, intent_id: Optional[str], plots: List, tx_hash: str):
+        """Свързва партидата фоново, когато receipt-ът ѝ пристигне"""
+        # Без callback - receipt-ът може вече да се чака от mint_plot_batches
+        future = self.blockchain.receipts.track(tx_hash)
+        future.add_done_callback(lambda future: self._on_confirmed(
+            future,
+            lambda receipt: self._link_plot_batch(intent_id, plots,
+                                                  self.blockchain._record_plot_batch(receipt)),
+            lambda e: self._unclaim_plots(intent_id, plots, e)
+        ))
+    
+    def _unclaim_plots(self, intent_id: Optional[str], plots: List, error):
+        for plot in plots:
+            plot.owner = None
+        self._journal_fail(intent_id, error)
+    
     def sync_npc_loyalty(self, npc_id: int, player_id: str):
         """Синхронизира лоялност на NPC към blockchain"""
         try:
@@ -492,9 +2107,9 @@ class SaraktBridge:
             # 1. Обработва взаимодействието в играта
             new_loyalty = npc.interact_with_player(player_id, interaction_type, quality)
             
-            # 2. Синхронизира към blockchain ако NPC е минтнат
+            # 2. Натрупва промяната за синхронизация ако NPC е минтнат
             if npc.token_id and self.auto_sync:
-                self.sync_npc_loyalty(npc_id, player_id)
+                self.queue_npc_loyalty(npc_id, player_id)
             
             # 3. Проверява дали NPC се е присъединил към сферата на влияние
             if new_loyalty >= 100:
@@ -508,7 +2123,10 @@ class SaraktBridge:
     
     def extract_resources(self, planet_id: int, resource_type: str,
                          amount: int, extractor_address: str) -> Dict:
-        """Извлича ресурси със синхронизация към blockchain"""
+        """
+        Извлича ресурси; on-chain синхронизацията се натрупва в sync_queue
+        и се изпраща слята с останалите извличания при следващия flush.
+        """
         try:
             planet = self.universe.get_planet(planet_id)
             if not planet:
@@ -517,9 +2135,148 @@ class SaraktBridge:
             # 1. Извлича в играта
             extracted = planet.extract_resource(resource_type, amount)
             
-            # 2. Синхронизира към blockchain
-            receipt = self.blockchain.extract_and_sync_resource(
-                planet_id, resource_type, amount, extractor_address
-            )
+            # 2. Натрупва за синхронизация към blockchain
+            self.sync_queue.add_extraction(planet_id, resource_type, extractor_address, amount)
+            self._schedule_flush()
             
-            self.synced_assets['resources'].add(f"{planet_id}_{resource_type}_{len(self
+            print(f"✅ Извлечени {extracted} {resource_type} (на опашка за синхронизация)")
+            return {'extracted': extracted, 'queued': len(self.sync_queue)}
+            
+        except Exception as e:
+            print(f"❌ Извличане неуспешно: {str(e)}")
+            raise
+    
+    # ============================================
+    # WRITE-BEHIND СИНХРОНИЗАЦИЯ
+    # ============================================
+    
+    def queue_npc_loyalty(self, npc_id: int, player_id: str):
+        """Натрупва промяната на лоялност на NPC вместо отделна транзакция"""
+        npc = self.universe.get_npc(npc_id)
+        if not npc:
+            raise ValueError('NPC не е намерен')
+        if not npc.token_id:
+            raise ValueError('NPC не е минтнат като NFT')
+        
+        current_loyalty = npc.loyalty.get(player_id, 0)
+        previous_loyalty = npc._previous_loyalty.get(player_id, 0)
+        
+        if current_loyalty != previous_loyalty:
+            self.sync_queue.add_loyalty(npc.token_id, player_id, current_loyalty - previous_loyalty)
+            npc._previous_loyalty[player_id] = current_loyalty
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """Изпраща опашката при достигнат праг, иначе я изпраща след max_delay"""
+        if self.sync_queue.should_flush():
+            self.flush_sync_queue()
+            return
+        with self._flush_lock:
+            if self._flush_timer is None and len(self.sync_queue):
+                self._flush_timer = threading.Timer(self.sync_queue.max_delay, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def _timed_flush(self):
+        with self._flush_lock:
+            self._flush_timer = None
+        try:
+            self.flush_sync_queue()
+        except Exception:
+            # Промените са върнати в опашката - нов опит при следващия праг
+            self._schedule_flush()
+    
+    def flush_sync_queue(self, wait: bool = False) -> List[str]:
+        """
+        Изпраща натрупаните промени - по една транзакция на ключ, конвейерно.
+        Връща tx hash-овете; при wait=True чака и потвърждението им.
+        """
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        
+        loyalty, extractions = self.sync_queue.drain()
+        
+        # On-chain лоялността е uint256 - изпраща се цялата част на делтата,
+        # а дробният остатък се пренася към следващото сливане
+        loyalty_updates, remainders = [], {}
+        for key, delta in loyalty.items():
+            whole = math.trunc(delta)
+            if whole:
+                loyalty_updates.append((key, whole))
+            if delta != whole:
+                remainders[key] = delta - whole
+        self.sync_queue.carry(remainders)
+        extraction_updates = [(key, amount) for key, amount in extractions.items() if amount]
+        if not loyalty_updates and not extraction_updates:
+            return []
+        
+        functions = [
+            self.blockchain.contract.functions.updateNPCLoyalty(
+                npc_token_id, Web3.to_checksum_address(player_id), int(abs(delta)), delta > 0
+            )
+            for (npc_token_id, player_id), delta in loyalty_updates
+        ] + [
+            self.blockchain.contract.functions.extractPlanetaryResource(
+                planet_id, resource_type, amount, Web3.to_checksum_address(extractor)
+            )
+            for (planet_id, resource_type, extractor), amount in extraction_updates
+        ]
+        
+        print(f"🔄 Синхронизиране на {len(functions)} слети промени...")
+        
+        tx_hashes = []
+        try:
+            for function in functions:
+                tx_hashes.append(self.blockchain._send_transaction(function))
+        except Exception as e:
+            # Неизпратените промени се връщат в опашката
+            sent = len(tx_hashes)
+            self.sync_queue.requeue(
+                dict(loyalty_updates[sent:]),
+                dict(extraction_updates[max(0, sent - len(loyalty_updates)):])
+            )
+            print(f"❌ Синхронизация прекъсната: {str(e)}")
+            raise
+        
+        for (planet_id, resource_type, _), amount in extraction_updates:
+            self.synced_assets['resources'].add(f"{planet_id}_{resource_type}_{len(self.synced_assets['resources'])}")
+        
+        if wait:
+            self.blockchain.wait_for_receipts(tx_hashes)
+        else:
+            for tx_hash in tx_hashes:
+                self.blockchain.receipts.track(tx_hash)
+        return tx_hashes
+    
+    def get_sync_status(self) -> Dict:
+        """Връща статус на синхронизацията"""
+        return {
+            'plots': len(self.synced_assets['plots']),
+            'npcs': len(self.synced_assets['npcs']),
+            'structures': len(self.synced_assets['structures']),
+            'resources': len(self.synced_assets['resources']),
+            'queued': len(self.sync_queue),
+            'auto_sync': self.auto_sync
+        }
+
+
+# ============================================
+# КОНФИГУРАЦИЯ
+# ============================================
+
+def get_config() -> Dict:
+    """Връща конфигурация за blockchain връзката от средата (.env)"""
+    return {
+        'rpc_url': os.getenv('RPC_URL', 'http://127.0.0.1:9650/ext/bc/C/rpc'),
+        'contract_address': os.getenv('CONTRACT_ADDRESS', ''),
+        'land_registry_address': os.getenv('LAND_REGISTRY_ADDRESS', ''),
+        'private_key': os.getenv('PRIVATE_KEY', ''),
+        'http_pool_size': int(os.getenv('RPC_POOL_SIZE', DEFAULT_POOL_SIZE)),
+        'http_connect_timeout': float(os.getenv('RPC_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
+        'http_read_timeout': float(os.getenv('RPC_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)),
+        'journal_path': os.getenv('TX_JOURNAL_PATH', 'data/tx_journal.jsonl'),
+        # SQLite база на EventIndexer за сверката на собствениците (празно - без индексатор)
+        'indexer_db_path': os.getenv('INDEXER_DB_PATH', '')
+    }
@@ -0,0 +1,752 @@
+"""
+SARAKT FAKE CHAIN - Python
+In-process верига за бенчмаркове и офлайн проверки на моста без node
+
+FakeChain изпълнява основния ERC1155 contract и LandRegistry със собствени
+интерфейси (независими от ABI-тата на connector-а, така че грешка в тях се
+вижда) и детерминистично състояние: token ID-тата са поредни, hash-овете на
+блоковете следват от съдържанието им, а транзакциите се включват в реда на
+пристигане. Блок се произвежда на всеки block_time секунди (0 - веднага при
+всяка транзакция), а всяка RPC заявка може да се забави с latency (+ jitter)
+секунди, за да се измерват конвейерите при реалистични закъснения.
+
+Свързване: rpc_url 'fake://<име>?block_time=2&latency=0.05&jitter=0.01' -
+sarakt_provider.get_web3 връща Web3 с FakeChainProvider към споделената за
+процеса верига с това име. Contract-ите са "деплойнати" от генезиса на
+CORE_ADDRESS и LAND_REGISTRY_ADDRESS (или на core=/land_registry= от URL-а),
+а собственик на LandRegistry е DEV_ADDRESS (или owner=) с total_plots парцела
+(10000 или total_plots=). eth_call чете
+последното състояние (без исторически блокове).
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from eth_account import Account
+from eth_account.typed_transactions import TypedTransaction
+from eth_account._utils.legacy_transactions import Transaction
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.providers.base import BaseProvider
+from web3.providers.async_base import AsyncBaseProvider
+
+from sarakt_provider import FAKE_CHAIN_SCHEME
+
+
+ZERO_ADDRESS = '0x' + '00' * 20
+GENESIS_TIMESTAMP = 1700000000
+
+# Газ: базов за транзакция, calldata и изпълнение на функция (+ на единица за партидните)
+TX_BASE_GAS = 21000
+CALLDATA_ZERO_GAS = 4
+CALLDATA_NONZERO_GAS = 16
+FUNCTION_GAS = {
+    'mintOctaviaPlot': 95000,
+    'spawnNPC': 120000,
+    'buildStructure': 45000,
+    'updateNPCLoyalty': 30000,
+    'createFaction': 80000,
+    'extractPlanetaryResource': 35000,
+    'mintPlots': 30000
+}
+FUNCTION_UNIT_GAS = {
+    'mintPlots': 48000
+}
+
+# Адресите на contract-ите и dev акаунтът по подразбиране - както при локален
+# node (anvil/hardhat): първите две деплойвания на първия dev акаунт
+DEV_PRIVATE_KEY = '0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80'
+DEV_ADDRESS = '0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266'
+CORE_ADDRESS = '0x5FbDB2315678afecb367f032d93F642f64180aa3'
+LAND_REGISTRY_ADDRESS = '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512'
+
+RPC_INVALID_PARAMS = -32602
+RPC_METHOD_NOT_FOUND = -32601
+RPC_SERVER_ERROR = -32000
+RPC_EXECUTION_REVERTED = 3
+
+
+class _RPCError(Exception):
+    def __init__(self, message: str, code: int = RPC_SERVER_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+class _Revert(Exception):
+    """Revert при изпълнение на функция на contract"""
+
+
+def _hex(value: int) -> str:
+    return hex(value)
+
+
+def _key(address: str) -> str:
+    return address.lower()
+
+
+# ============================================
+# ИНТЕРФЕЙСИ НА CONTRACT-ИТЕ
+# ============================================
+
+def _function(name: str, inputs: List[str], outputs: List[str] = (), view: bool = False) -> Dict:
+    return {
+        'type': 'function',
+        'name': name,
+        'inputs': [{'name': '', 'type': arg_type} for arg_type in inputs],
+        'outputs': [{'name': '', 'type': arg_type} for arg_type in outputs],
+        'stateMutability': 'view' if view else 'nonpayable'
+    }
+
+
+def _event(name: str, inputs: List[Tuple[str, bool]]) -> Dict:
+    return {
+        'type': 'event',
+        'name': name,
+        'anonymous': False,
+        'inputs': [{'name': '', 'type': arg_type, 'indexed': indexed} for arg_type, indexed in inputs]
+    }
+
+
+# Основният contract (ERC1155 - парцели, NPCs, фракции)
+CORE_ABI = [
+    _function('mintOctaviaPlot', ['address', 'uint256', 'string'], ['uint256']),
+    _function('buildStructure', ['uint256', 'uint8']),
+    _function('spawnNPC', ['uint256', 'string', 'address'], ['uint256']),
+    _function('updateNPCLoyalty', ['uint256', 'address', 'uint256', 'bool']),
+    _function('createFaction', ['string', 'address'], ['uint256']),
+    _function('extractPlanetaryResource', ['uint256', 'string', 'uint256', 'address']),
+    _function('balanceOf', ['address', 'uint256'], ['uint256'], view=True),
+    _function('balanceOfBatch', ['address[]', 'uint256[]'], ['uint256[]'], view=True),
+    _event('TransferSingle', [('address', True), ('address', True), ('address', True),
+                              ('uint256', False), ('uint256', False)]),
+    _event('TransferBatch', [('address', True), ('address', True), ('address', True),
+                             ('uint256[]', False), ('uint256[]', False)])
+]
+
+# LandRegistry (contracts/LandRegistry.sol) - не е ERC1155, минтването излъчва само PlotMinted
+LAND_REGISTRY_ABI = [
+    _function('mintPlots', ['uint256', 'uint256', 'uint256', 'address']),
+    _function('getPlot', ['uint256'],
+              ['uint256', 'uint256', 'address', 'uint256', 'bool', 'bool', 'uint256', 'bool'], view=True),
+    _function('owner', [], ['address'], view=True),
+    _function('totalPlots', [], ['uint256'], view=True),
+    _function('plotsMinted', [], ['uint256'], view=True),
+    _event('PlotMinted', [('uint256', True), ('uint256', False), ('address', True)])
+]
+
+
+# ============================================
+# ABI ТАБЛИЦИ
+# ============================================
+
+class _Deployed:
+    """Селекторите и събитията на един "деплойнат" contract"""
+
+    def __init__(self, address: str, abi: List[Dict]):
+        self.address = Web3.to_checksum_address(address)
+        # selector -> (име, входни типове, изходни типове, view)
+        self.functions: Dict[bytes, Tuple[str, List[str], List[str], bool]] = {}
+        # име -> (topic0, [(indexed, тип)])
+        self.events: Dict[str, Tuple[bytes, List[Tuple[bool, str]]]] = {}
+        for entry in abi:
+            types = [arg['type'] for arg in entry.get('inputs', [])]
+            signature = f"{entry.get('name')}({','.join(types)})"
+            if entry.get('type') == 'function':
+                selector = bytes(Web3.keccak(text=signature))[:4]
+                view = entry.get('stateMutability') in ('view', 'pure')
+                self.functions[selector] = (entry['name'], types,
+                                            [arg['type'] for arg in entry.get('outputs', [])], view)
+            elif entry.get('type') == 'event':
+                self.events[entry['name']] = (bytes(Web3.keccak(text=signature)),
+                                              [(arg['indexed'], arg['type']) for arg in entry['inputs']])
+
+
+class _Context:
+    """Едно изпълнение: изпращач, contract и дали промените се записват"""
+
+    def __init__(self, sender: str, contract: _Deployed, commit: bool):
+        self.sender = sender
+        self.contract = contract
+        self.commit = commit
+        self.logs: List[Tuple[_Deployed, str, List]] = []
+        self.units = 1
+
+    def emit(self, event: str, *args):
+        self.logs.append((self.contract, event, list(args)))
+
+
+# ============================================
+# ВЕРИГА
+# ============================================
+
+class FakeChain:
+    """
+    Детерминистична in-process верига с mempool, nonce-и, газ и блокове.
+
+    block_time - секунди между блоковете (0 - блок за всяка транзакция);
+    latency/jitter - забавяне на всяка RPC заявка (jitter е равномерен, от seed);
+    base_fee - baseFeePerGas (None - legacy мрежа само с gasPrice);
+    core/land_registry - адресите на contract-ите, owner - собственик на LandRegistry,
+    total_plots - лимитът на LandRegistry (конструкторът на contract-а).
+    """
+
+    def __init__(self, block_time: float = 1.0, latency: float = 0.0, jitter: float = 0.0,
+                 chain_id: int = 43112, base_fee: Optional[int] = 25 * 10 ** 9,
+                 priority_fee: int = 10 ** 9, block_gas_limit: int = 8000000, seed: int = 0,
+                 core: str = CORE_ADDRESS, land_registry: str = LAND_REGISTRY_ADDRESS,
+                 owner: str = DEV_ADDRESS, total_plots: int = 10000):
+        self.block_time = block_time
+        self.latency = latency
+        self.jitter = jitter
+        self.chain_id = chain_id
+        self.base_fee = base_fee
+        self.priority_fee = priority_fee
+        self.block_gas_limit = block_gas_limit
+
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._started = time.monotonic()
+        self._codec = Web3().codec
+
+        self.contracts: Dict[str, _Deployed] = {}
+
+        # Блокове, транзакции и receipt-и
+        self.blocks: List[Dict] = []
+        self._transactions: Dict[str, Dict] = {}
+        self._receipts: Dict[str, Dict] = {}
+        self._logs: List[Dict] = []
+        # Изпратени, още невключени: подател -> nonce -> tx hash
+        self._mempool: Dict[str, Dict[int, str]] = {}
+        # tx hash -> (подател, nonce, газ лимит) в реда на пристигане
+        self._arrivals: Dict[str, Tuple[str, int, int]] = {}
+        self._nonces: Dict[str, int] = {}
+
+        # Състояние на contract-ите
+        self.balances: Dict[Tuple[int, str], int] = {}
+        self.tokens: Dict[int, Dict] = {}
+        self._next_token_id = 1
+        self.plot_tokens: Dict[int, int] = {}
+        self.registry_plots: Dict[int, Dict] = {}
+        self.total_plots = total_plots
+        self.plots_minted = 0
+        self.loyalty: Dict[Tuple[int, str], int] = {}
+        self.resources: Dict[Tuple[int, str], int] = {}
+
+        self.requests: Dict[str, int] = {}
+        self.reverted = 0
+
+        self.core_address = Web3.to_checksum_address(core)
+        self.land_registry_address = Web3.to_checksum_address(land_registry)
+        self.registry_owner = _key(owner)
+        self.deploy(self.core_address, CORE_ABI)
+        self.deploy(self.land_registry_address, LAND_REGISTRY_ABI)
+
+        self._mine_block([])
+
+    @classmethod
+    def from_url(cls, rpc_url: str) -> 'FakeChain':
+        """Верига с параметрите от 'fake://<име>?block_time=..&latency=..&jitter=..&seed=..'"""
+        query = parse_qs(urlparse(rpc_url).query)
+        options = {name: float(values[-1]) for name, values in query.items()
+                   if name in ('block_time', 'latency', 'jitter')}
+        options.update((name, int(values[-1])) for name, values in query.items()
+                       if name in ('chain_id', 'seed', 'block_gas_limit', 'total_plots'))
+        options.update((name, values[-1]) for name, values in query.items()
+                       if name in ('core', 'land_registry', 'owner'))
+        return cls(**options)
+
+    def deploy(self, address: str, abi: List[Dict]):
+        """Регистрира интерфейс на адрес - функциите му се изпълняват от _fn_<име>"""
+        with self._lock:
+            self.contracts[_key(address)] = _Deployed(address, abi)
+
+    # --- RPC ---
+
+    def delay(self) -> float:
+        """Забавянето на една заявка (latency + jitter)"""
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def request(self, method: str, params) -> Dict:
+        """Обработва една JSON-RPC заявка (без забавяне) и връща отговора"""
+        handler = getattr(self, '_rpc_' + method, None)
+        with self._lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+            request_id = sum(self.requests.values())
+            if handler is None:
+                return {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': RPC_METHOD_NOT_FOUND, 'message': f'method {method} not found'}}
+            self._mine_due()
+            try:
+                return {'jsonrpc': '2.0', 'id': request_id, 'result': handler(*params)}
+            except _RPCError as e:
+                return {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': e.code, 'message': str(e)}}
+
+    def _rpc_web3_clientVersion(self):
+        return 'SaraktFakeChain/v1'
+
+    def _rpc_net_version(self):
+        return str(self.chain_id)
+
+    def _rpc_eth_chainId(self):
+        return _hex(self.chain_id)
+
+    def _rpc_eth_blockNumber(self):
+        return _hex(len(self.blocks) - 1)
+
+    def _rpc_eth_gasPrice(self):
+        return _hex((self.base_fee or 0) + self.priority_fee)
+
+    def _rpc_eth_maxPriorityFeePerGas(self):
+        return _hex(self.priority_fee)
+
+    def _rpc_eth_getBalance(self, address, block='latest'):
+        return _hex(10 ** 24)
+
+    def _rpc_eth_getCode(self, address, block='latest'):
+        return '0x00' if _key(address) in self.contracts else '0x'
+
+    def _rpc_eth_getBlockByNumber(self, block, full_transactions=False):
+        number = self._block_number(block)
+        if number is None or number >= len(self.blocks):
+            return None
+        header = dict(self.blocks[number])
+        if full_transactions:
+            header['transactions'] = [self._transactions[tx_hash] for tx_hash in header['transactions']]
+        return header
+
+    def _rpc_eth_getTransactionCount(self, address, block='latest'):
+        sender = _key(address)
+        nonce = self._nonces.get(sender, 0)
+        if block == 'pending':
+            queued = self._mempool.get(sender, {})
+            while nonce in queued:
+                nonce += 1
+        return _hex(nonce)
+
+    def _rpc_eth_getTransactionByHash(self, tx_hash):
+        return self._transactions.get(tx_hash.lower())
+
+    def _rpc_eth_getTransactionReceipt(self, tx_hash):
+        return self._receipts.get(tx_hash.lower())
+
+    def _rpc_eth_sendRawTransaction(self, raw):
+        raw = HexBytes(raw)
+        tx_hash = Web3.to_hex(Web3.keccak(raw))
+        try:
+            sender = _key(Account.recover_transaction(raw))
+            fields = (TypedTransaction.from_bytes(raw) if raw[0] <= 0x7f
+                      else Transaction.from_bytes(raw)).as_dict()
+        except Exception as e:
+            raise _RPCError(f'invalid transaction: {e}', RPC_INVALID_PARAMS)
+
+        if tx_hash in self._transactions:
+            raise _RPCError('already known')
+        nonce = fields['nonce']
+        if nonce < self._nonces.get(sender, 0):
+            raise _RPCError(f'nonce too low: next nonce {self._nonces.get(sender, 0)}, tx nonce {nonce}')
+        if nonce in self._mempool.get(sender, {}):
+            raise _RPCError('replacement transaction underpriced')
+        if fields.get('chainId', self.chain_id) != self.chain_id:
+            raise _RPCError('invalid chain id')
+        max_fee = fields.get('maxFeePerGas', fields.get('gasPrice', 0))
+        if self.base_fee is not None and max_fee < self.base_fee:
+            raise _RPCError(f'transaction underpriced: max fee {max_fee} < base fee {self.base_fee}')
+
+        self._transactions[tx_hash] = {
+            'hash': tx_hash,
+            'from': Web3.to_checksum_address(sender),
+            'to': Web3.to_checksum_address(fields['to']) if fields.get('to') else None,
+            'nonce': _hex(nonce),
+            'gas': _hex(fields['gas']),
+            'input': Web3.to_hex(fields.get('data', b'')),
+            'value': _hex(fields.get('value', 0)),
+            'type': _hex(fields.get('type', 0)),
+            'chainId': _hex(self.chain_id),
+            'maxFeePerGas': _hex(max_fee),
+            'maxPriorityFeePerGas': _hex(fields.get('maxPriorityFeePerGas', max_fee)),
+            'blockHash': None,
+            'blockNumber': None,
+            'transactionIndex': None
+        }
+        self._mempool.setdefault(sender, {})[nonce] = tx_hash
+        self._arrivals[tx_hash] = (sender, nonce, fields['gas'])
+
+        # Без block_time - всяка транзакция се включва веднага в собствен блок
+        if not self.block_time:
+            self._mine_block(self._ready_transactions())
+        return tx_hash
+
+    def _rpc_eth_call(self, call, block='latest'):
+        result, _ = self._execute(call, commit=False)
+        return result
+
+    def _rpc_eth_estimateGas(self, call, block='latest'):
+        _, gas = self._execute(call, commit=False)
+        return _hex(gas)
+
+    def _rpc_eth_getLogs(self, log_filter):
+        head = len(self.blocks) - 1
+        from_block = self._block_number(log_filter.get('fromBlock', 'latest'))
+        to_block = self._block_number(log_filter.get('toBlock', 'latest'))
+        from_block = head if from_block is None else from_block
+        to_block = head if to_block is None else min(to_block, head)
+
+        addresses = log_filter.get('address')
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {_key(address) for address in addresses} if addresses else None
+        topics = [[topic] if isinstance(topic, str) else topic for topic in log_filter.get('topics') or []]
+
+        matched = []
+        for log in self._logs:
+            number = int(log['blockNumber'], 16)
+            if number < from_block or number > to_block:
+                continue
+            if addresses is not None and _key(log['address']) not in addresses:
+                continue
+            if any(wanted and (position >= len(log['topics']) or
+                               log['topics'][position] not in [topic.lower() for topic in wanted])
+                   for position, wanted in enumerate(topics)):
+                continue
+            matched.append(log)
+        return matched
+
+    def _block_number(self, block) -> Optional[int]:
+        if isinstance(block, int):
+            return block
+        if block in ('latest', 'pending', 'safe', 'finalized'):
+            return len(self.blocks) - 1
+        if block == 'earliest':
+            return 0
+        return int(block, 16)
+
+    # --- блокове ---
+
+    def _mine_due(self):
+        """Произвежда блоковете, чието време е дошло (блоковете са мързеливи)"""
+        if not self.block_time:
+            return
+        due = int((time.monotonic() - self._started) / self.block_time)
+        while len(self.blocks) - 1 < due:
+            self._mine_block(self._ready_transactions())
+
+    def _ready_transactions(self) -> List[str]:
+        """Чакащите транзакции с пореден nonce, в реда на пристигане, до газ лимита на блока"""
+        ready = []
+        gas = 0
+        next_nonce = {}
+        remaining = list(self._arrivals.items())
+        # Транзакция с по-голям nonce, пристигнала преди предходната си, влиза на следващо минаване
+        while remaining:
+            waiting = []
+            for tx_hash, (sender, nonce, tx_gas) in remaining:
+                if nonce != next_nonce.get(sender, self._nonces.get(sender, 0)):
+                    waiting.append((tx_hash, (sender, nonce, tx_gas)))
+                    continue
+                if ready and gas + tx_gas > self.block_gas_limit:
+                    return ready
+                ready.append(tx_hash)
+                gas += tx_gas
+                next_nonce[sender] = nonce + 1
+            if len(waiting) == len(remaining):
+                break
+            remaining = waiting
+        return ready
+
+    def _mine_block(self, tx_hashes: List[str]):
+        number = len(self.blocks)
+        parent = self.blocks[-1]['hash'] if self.blocks else '0x' + '00' * 32
+        block_hash = Web3.to_hex(Web3.keccak(text=f"{parent}:{number}:{','.join(tx_hashes)}"))
+
+        gas_used = 0
+        log_index = 0
+        included = []
+        for index, tx_hash in enumerate(tx_hashes):
+            tx = self._transactions[tx_hash]
+            sender, nonce, _ = self._arrivals.pop(tx_hash)
+            del self._mempool[sender][nonce]
+            self._nonces[sender] = nonce + 1
+
+            status, used, logs = self._apply_transaction(tx)
+            gas_used += used
+            for log in logs:
+                log.update(blockNumber=_hex(number), blockHash=block_hash, transactionHash=tx_hash,
+                           transactionIndex=_hex(index), logIndex=_hex(log_index), removed=False)
+                log_index += 1
+            self._logs.extend(logs)
+
+            tx.update(blockHash=block_hash, blockNumber=_hex(number), transactionIndex=_hex(index))
+            effective_price = min(int(tx['maxFeePerGas'], 16),
+                                  (self.base_fee or 0) + int(tx['maxPriorityFeePerGas'], 16))
+            self._receipts[tx_hash] = {
+                'transactionHash': tx_hash,
+                'transactionIndex': _hex(index),
+                'blockHash': block_hash,
+                'blockNumber': _hex(number),
+                'from': tx['from'],
+                'to': tx['to'],
+                'cumulativeGasUsed': _hex(gas_used),
+                'gasUsed': _hex(used),
+                'effectiveGasPrice': _hex(effective_price),
+                'contractAddress': None,
+                'logs': logs,
+                'logsBloom': '0x' + '00' * 256,
+                'status': _hex(status),
+                'type': tx['type']
+            }
+            included.append(tx_hash)
+
+        header = {
+            'number': _hex(number),
+            'hash': block_hash,
+            'parentHash': parent,
+            'timestamp': _hex(GENESIS_TIMESTAMP + int(number * (self.block_time or 1))),
+            'gasLimit': _hex(self.block_gas_limit),
+            'gasUsed': _hex(gas_used),
+            'miner': ZERO_ADDRESS,
+            'transactions': included
+        }
+        if self.base_fee is not None:
+            header['baseFeePerGas'] = _hex(self.base_fee)
+        self.blocks.append(header)
+
+    def _apply_transaction(self, tx: Dict) -> Tuple[int, int, List[Dict]]:
+        """Изпълнява включена транзакция; връща (status, изразходван газ, логове)"""
+        call = {'from': tx['from'], 'to': tx['to'], 'data': tx['input']}
+        gas_limit = int(tx['gas'], 16)
+        try:
+            context, gas = self._prepare(call, commit=False)
+        except _RPCError:
+            self.reverted += 1
+            return 0, min(gas_limit, TX_BASE_GAS), []
+        if gas > gas_limit:
+            # Out of gas - целият лимит е изразходван, без промени
+            self.reverted += 1
+            return 0, gas_limit, []
+
+        context, _ = self._prepare(call, commit=True)
+        return 1, gas, [self._encode_log(*entry) for entry in context.logs]
+
+    # --- изпълнение ---
+
+    def _execute(self, call: Dict, commit: bool) -> Tuple[str, int]:
+        """Изпълнява извикване; връща (ABI-кодиран резултат, газ)"""
+        context, gas = self._prepare(call, commit)
+        return context.result, gas
+
+    def _prepare(self, call: Dict, commit: bool) -> Tuple[_Context, int]:
+        contract = self.contracts.get(_key(call.get('to') or ''))
+        data = Web3.to_bytes(hexstr=call.get('data') or call.get('input') or '0x')
+        if contract is None:
+            raise _RPCError('execution reverted: no contract at address', RPC_EXECUTION_REVERTED)
+        function = contract.functions.get(data[:4])
+        if function is None:
+            raise _RPCError('execution reverted: unknown function selector', RPC_EXECUTION_REVERTED)
+
+        name, input_types, output_types, view = function
+        args = self._codec.decode(input_types, data[4:])
+        sender = _key(call.get('from') or ZERO_ADDRESS)
+        context = _Context(sender, contract, commit and not view)
+        try:
+            result = getattr(self, '_fn_' + name)(context, *args)
+        except _Revert as e:
+            raise _RPCError(f'execution reverted: {e}', RPC_EXECUTION_REVERTED)
+
+        if output_types:
+            values = result if len(output_types) > 1 else [result]
+            context.result = Web3.to_hex(self._codec.encode(output_types, values))
+        else:
+            context.result = '0x'
+
+        calldata_gas = sum(CALLDATA_NONZERO_GAS if byte else CALLDATA_ZERO_GAS for byte in data)
+        gas = (TX_BASE_GAS + calldata_gas + FUNCTION_GAS.get(name, 0)
+               + FUNCTION_UNIT_GAS.get(name, 0) * context.units)
+        return context, gas
+
+    def _encode_log(self, contract: _Deployed, event: str, args: List) -> Dict:
+        topic, inputs = contract.events[event]
+        topics = [Web3.to_hex(topic)]
+        data_types, data_values = [], []
+        for (indexed, arg_type), value in zip(inputs, args):
+            if indexed:
+                topics.append(Web3.to_hex(self._codec.encode([arg_type], [value])))
+            else:
+                data_types.append(arg_type)
+                data_values.append(value)
+        return {
+            'address': contract.address,
+            'topics': topics,
+            'data': Web3.to_hex(self._codec.encode(data_types, data_values))
+        }
+
+    def _mint(self, context: _Context, to: str, kind: str, **fields) -> int:
+        """Нов ERC1155 token за to (ID-то се запазва само при commit)"""
+        token_id = self._next_token_id
+        if context.commit:
+            self._next_token_id += 1
+            self.tokens[token_id] = dict(fields, kind=kind)
+            self.balances[(token_id, _key(to))] = 1
+        context.emit('TransferSingle', context.sender, ZERO_ADDRESS, to, token_id, 1)
+        return token_id
+
+    # --- основен contract (ERC1155) ---
+
+    def _fn_mintOctaviaPlot(self, context, to, plot_number, zone):
+        if plot_number in self.plot_tokens:
+            raise _Revert('plot already minted')
+        token_id = self._mint(context, to, 'LAND_PLOT', plot_number=plot_number, zone=zone)
+        if context.commit:
+            self.plot_tokens[plot_number] = token_id
+        return token_id
+
+    def _fn_spawnNPC(self, context, planet_id, npc_name, initial_owner):
+        return self._mint(context, initial_owner, 'NPC', planet_id=planet_id, name=npc_name)
+
+    def _fn_createFaction(self, context, name, leader):
+        return self._mint(context, leader, 'FACTION', name=name)
+
+    def _fn_buildStructure(self, context, plot_token_id, structure_type):
+        token = self.tokens.get(plot_token_id)
+        if token is None or token['kind'] != 'LAND_PLOT':
+            raise _Revert('plot token does not exist')
+        if self.balances.get((plot_token_id, context.sender), 0) == 0:
+            raise _Revert('caller does not own the plot')
+        if context.commit:
+            token['structure_type'] = structure_type
+
+    def _fn_updateNPCLoyalty(self, context, npc_token_id, player, change, is_increase):
+        token = self.tokens.get(npc_token_id)
+        if token is None or token['kind'] != 'NPC':
+            raise _Revert('NPC token does not exist')
+        key = (npc_token_id, _key(player))
+        loyalty = self.loyalty.get(key, 0) + (change if is_increase else -change)
+        if context.commit:
+            self.loyalty[key] = max(0, loyalty)
+
+    def _fn_extractPlanetaryResource(self, context, planet_id, resource_type, amount, extractor):
+        if context.commit:
+            key = (planet_id, resource_type)
+            self.resources[key] = self.resources.get(key, 0) + amount
+
+    def _fn_balanceOf(self, context, account, token_id):
+        return self.balances.get((token_id, _key(account)), 0)
+
+    def _fn_balanceOfBatch(self, context, accounts, ids):
+        if len(accounts) != len(ids):
+            raise _Revert('accounts and ids length mismatch')
+        return [self.balances.get((token_id, _key(account)), 0) for account, token_id in zip(accounts, ids)]
+
+    # --- LandRegistry ---
+
+    def _fn_mintPlots(self, context, start_id, count, area_m2, to):
+        # Проверките на contract-а в същия ред (onlyOwner, count0, exceed total, already minted)
+        if context.sender != self.registry_owner:
+            raise _Revert(f'OwnableUnauthorizedAccount({Web3.to_checksum_address(context.sender)})')
+        if count == 0:
+            raise _Revert('count0')
+        if self.plots_minted + count > self.total_plots:
+            raise _Revert('exceed total')
+        context.units = count
+        for plot_id in range(start_id, start_id + count):
+            # Празният запис има id 0 - парцел 0 може да се минтне повторно, както в contract-а
+            if self.registry_plots.get(plot_id, {}).get('id', 0) != 0:
+                raise _Revert('already minted')
+            context.emit('PlotMinted', plot_id, area_m2, to)
+        if context.commit:
+            for plot_id in range(start_id, start_id + count):
+                self.registry_plots[plot_id] = {
+                    'id': plot_id, 'area_m2': area_m2, 'owner': Web3.to_checksum_address(to),
+                    'net_value': 0, 'activated': True, 'for_sale': False, 'sale_price': 0, 'lien': False
+                }
+            self.plots_minted += count
+
+    def _fn_getPlot(self, context, plot_id):
+        plot = self.registry_plots.get(plot_id)
+        if plot is None:
+            return [0, 0, ZERO_ADDRESS, 0, False, False, 0, False]
+        return [plot['id'], plot['area_m2'], plot['owner'], plot['net_value'], plot['activated'],
+                plot['for_sale'], plot['sale_price'], plot['lien']]
+
+    def _fn_owner(self, context):
+        return Web3.to_checksum_address(self.registry_owner)
+
+    def _fn_totalPlots(self, context):
+        return self.total_plots
+
+    def _fn_plotsMinted(self, context):
+        return self.plots_minted
+
+    # --- статистика ---
+
+    def stats(self) -> Dict:
+        """Блокове, транзакции, revert-и и брой RPC заявки по метод"""
+        with self._lock:
+            return {
+                'blocks': len(self.blocks),
+                'transactions': len(self._receipts),
+                'pending': len(self._arrivals),
+                'reverted': self.reverted,
+                'requests': dict(self.requests)
+            }
+
+
+# ============================================
+# WEB3 PROVIDER-И
+# ============================================
+
+class FakeChainProvider(BaseProvider):
+    """Web3 provider към FakeChain - заявките се забавят с latency на веригата"""
+
+    def __init__(self, chain: FakeChain):
+        super().__init__()
+        self.chain = chain
+
+    def make_request(self, method, params):
+        delay = self.chain.delay()
+        if delay:
+            time.sleep(delay)
+        return self.chain.request(method, params)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+
+class AsyncFakeChainProvider(AsyncBaseProvider):
+    """AsyncWeb3 provider към FakeChain - забавянето не блокира event loop-а"""
+
+    def __init__(self, chain: FakeChain):
+        super().__init__()
+        self.chain = chain
+
+    async def make_request(self, method, params):
+        delay = self.chain.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self.chain.request(method, params)
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    async def disconnect(self):
+        pass
+
+
+_chains_lock = threading.Lock()
+_chains: Dict[str, FakeChain] = {}
+
+
+def get_fake_chain(rpc_url: str) -> FakeChain:
+    """Споделената за процеса верига за fake:// URL (създава се при първо извикване)"""
+    with _chains_lock:
+        chain = _chains.get(rpc_url)
+        if chain is None:
+            chain = _chains[rpc_url] = FakeChain.from_url(rpc_url)
+        return chain
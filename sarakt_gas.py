@@ -0,0 +1,243 @@
+"""
+SARAKT GAS ORACLE - Python
+Газ лимити, научени от receipt-ите, и такси (EIP-1559), кеширани за блок
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+def _envelope(samples: List[Tuple[int, int]], units: int) -> int:
+    """
+    Горна граница на газа за units единици (напр. парцели в mintPlots) по
+    наблюдения (units, газ): линия по най-малки квадрати, вдигната до
+    най-голямото отклонение нагоре; при еднакъв брой единици - пропорционално
+    нагоре, а за по-малко единици - наблюдаваният газ (фиксираната част не
+    намалява с единиците).
+    """
+    xs = [x for x, _ in samples]
+    ys = [y for _, y in samples]
+    if len(set(xs)) == 1:
+        return max(y * units // x if units > x else y for x, y in samples)
+
+    n = len(samples)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in samples) / \
+        sum((x - mean_x) ** 2 for x in xs)
+    slope = max(slope, 0.0)
+    intercept = mean_y - slope * mean_x
+    residual = max(y - (intercept + slope * x) for x, y in samples)
+    return int(intercept + slope * units + max(residual, 0.0))
+
+
+class GasOracle:
+    """
+    Газ лимит и такси за транзакции без твърдо зададени стойности.
+
+    Лимитът на функция се изчислява от последните window receipt-а за нея
+    (газ спрямо брой единици) плюс margin. Докато receipt-ите са по-малко
+    от min_samples, се ползват и кеширани estimate_gas резултати; estimate_gas
+    се вика само ако за функцията няма нищо.
+
+    Таксите се четат веднъж на блок: при baseFeePerGas в блока - EIP-1559
+    (maxFeePerGas = base_fee_multiplier * base fee + priority fee), иначе gasPrice.
+    """
+
+    def __init__(self, w3, sender: Optional[str] = None, window: int = 50,
+                 min_samples: int = 3, margin: float = 0.2,
+                 fallback_gas: int = 2000000, base_fee_multiplier: int = 2,
+                 block_poll_interval: float = 1.0):
+        self.w3 = w3
+        self.sender = sender
+        self.window = window
+        self.min_samples = min_samples
+        self.margin = margin
+        self.fallback_gas = fallback_gas
+        self.base_fee_multiplier = base_fee_multiplier
+        self.block_poll_interval = block_poll_interval
+
+        self._lock = threading.Lock()
+        # функция -> последни (единици, газ) от receipt-и / от estimate_gas
+        self._used: Dict[str, Deque[Tuple[int, int]]] = {}
+        self._estimated: Dict[str, Deque[Tuple[int, int]]] = {}
+        self._block: Optional[int] = None
+        self._block_checked = 0.0
+        self._fees: Optional[Dict] = None
+        self._fees_block: Optional[int] = None
+
+        self.estimates = 0
+        self.fallbacks = 0
+        self.fee_fetches = 0
+
+    # --- газ лимит ---
+
+    def gas_limit(self, function, units: int = 1) -> int:
+        """Газ лимит за function (contract.functions.x(...)) с units единици"""
+        key = function.fn_name
+        limit = self.predict(key, units)
+        if limit is not None:
+            return limit
+
+        try:
+            params = {'from': self.sender} if self.sender else {}
+            estimate = function.estimate_gas(params)
+        except Exception as e:
+            # Напр. зависи от още непотвърдена транзакция в същия конвейер
+            print(f"⚠️  estimate_gas за {key} неуспешен ({str(e)}), лимит {self.fallback_gas}")
+            self.fallbacks += 1
+            return self.fallback_gas
+        return self._remember_estimate(key, units, estimate)
+
+    def predict(self, key: str, units: int = 1) -> Optional[int]:
+        """Лимит от натрупаната статистика; None ако за функцията няма данни"""
+        with self._lock:
+            samples = list(self._used.get(key, ()))
+            if len(samples) < self.min_samples:
+                samples += self._estimated.get(key, ())
+        if not samples:
+            return None
+        return self._with_margin(_envelope(samples, units))
+
+    def record(self, key: str, receipt, units: int = 1):
+        """Учи от receipt на успешна транзакция (газът при revert не е показателен)"""
+        if receipt['status'] != 1:
+            return
+        with self._lock:
+            self._used.setdefault(key, deque(maxlen=self.window)).append((units, receipt['gasUsed']))
+
+    def _remember_estimate(self, key: str, units: int, estimate: int) -> int:
+        with self._lock:
+            self.estimates += 1
+            self._estimated.setdefault(key, deque(maxlen=self.window)).append((units, estimate))
+        return self._with_margin(estimate)
+
+    def _with_margin(self, gas: int) -> int:
+        return int(math.ceil(gas * (1 + self.margin)))
+
+    # --- такси ---
+
+    def fees(self) -> Dict:
+        """Параметри за таксата на транзакция (maxFeePerGas/... или gasPrice)"""
+        block = self._current_block()
+        fees = self._cached_fees(block)
+        if fees is not None:
+            return fees
+
+        base_fee = self.w3.eth.get_block(block).get('baseFeePerGas')
+        if base_fee is None:
+            return self._store_fees(block, {'gasPrice': self.w3.eth.gas_price})
+        try:
+            priority_fee = self.w3.eth.max_priority_fee
+        except Exception:
+            # Node без eth_maxPriorityFeePerGas
+            priority_fee = max(self.w3.eth.gas_price - base_fee, 0)
+        return self._store_fees(block, self._eip1559_fees(base_fee, priority_fee))
+
+    def _cached_fees(self, block: int) -> Optional[Dict]:
+        with self._lock:
+            if self._fees is not None and self._fees_block == block:
+                return dict(self._fees)
+        return None
+
+    def _store_fees(self, block: int, fees: Dict) -> Dict:
+        with self._lock:
+            self.fee_fetches += 1
+            self._fees = fees
+            self._fees_block = block
+        return dict(fees)
+
+    def _eip1559_fees(self, base_fee: int, priority_fee: int) -> Dict:
+        return {
+            'maxFeePerGas': base_fee * self.base_fee_multiplier + priority_fee,
+            'maxPriorityFeePerGas': priority_fee
+        }
+
+    def note_block(self, block_number: int):
+        """Съобщава за видян блок (напр. от receipt tracker-а)"""
+        with self._lock:
+            self._block_checked = time.monotonic()
+            if self._block is None or block_number > self._block:
+                self._block = block_number
+
+    def _current_block(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._block is not None and now - self._block_checked < self.block_poll_interval:
+                return self._block
+        block = self.w3.eth.block_number
+        with self._lock:
+            self._block_checked = now
+            if self._block is None or block > self._block:
+                self._block = block
+            return self._block
+
+    def stats(self) -> Dict:
+        """Статистика по функции и броячи на RPC заявките"""
+        with self._lock:
+            functions = {}
+            for key in set(self._used) | set(self._estimated):
+                used = [gas / units for units, gas in self._used.get(key, ())]
+                functions[key] = {
+                    'samples': len(used),
+                    'mean_per_unit': sum(used) / len(used) if used else None,
+                    'max_per_unit': max(used) if used else None,
+                    'estimates': len(self._estimated.get(key, ()))
+                }
+            return {
+                'functions': functions,
+                'estimates': self.estimates,
+                'fallbacks': self.fallbacks,
+                'fee_fetches': self.fee_fetches,
+                'fees': dict(self._fees) if self._fees else None,
+                'block': self._block
+            }
+
+
+class AsyncGasOracle(GasOracle):
+    """GasOracle за AsyncWeb3 - gas_limit() и fees() са корутини"""
+
+    async def gas_limit(self, function, units: int = 1) -> int:
+        key = function.fn_name
+        limit = self.predict(key, units)
+        if limit is not None:
+            return limit
+
+        try:
+            params = {'from': self.sender} if self.sender else {}
+            estimate = await function.estimate_gas(params)
+        except Exception as e:
+            print(f"⚠️  estimate_gas за {key} неуспешен ({str(e)}), лимит {self.fallback_gas}")
+            self.fallbacks += 1
+            return self.fallback_gas
+        return self._remember_estimate(key, units, estimate)
+
+    async def fees(self) -> Dict:
+        block = await self._current_block()
+        fees = self._cached_fees(block)
+        if fees is not None:
+            return fees
+
+        base_fee = (await self.w3.eth.get_block(block)).get('baseFeePerGas')
+        if base_fee is None:
+            return self._store_fees(block, {'gasPrice': await self.w3.eth.gas_price})
+        try:
+            priority_fee = await self.w3.eth.max_priority_fee
+        except Exception:
+            priority_fee = max(await self.w3.eth.gas_price - base_fee, 0)
+        return self._store_fees(block, self._eip1559_fees(base_fee, priority_fee))
+
+    async def _current_block(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._block is not None and now - self._block_checked < self.block_poll_interval:
+                return self._block
+        block = await self.w3.eth.block_number
+        with self._lock:
+            self._block_checked = now
+            if self._block is None or block > self._block:
+                self._block = block
+            return self._block
@@ -0,0 +1,381 @@
+"""
+SARAKT EVENT INDEXER - Python
+Инкрементален индексатор на събитията от LandRegistry и Mortgage в локална SQLite база
+"""
+
+import json
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from web3 import Web3
+
+
+# ============================================
+# СЪБИТИЯ
+# ============================================
+
+def _event(name: str, inputs: List[Tuple[str, str, bool]]) -> Dict:
+    return {
+        "anonymous": False,
+        "inputs": [{"indexed": indexed, "name": arg, "type": arg_type}
+                   for arg, arg_type, indexed in inputs],
+        "name": name,
+        "type": "event"
+    }
+
+
+LAND_REGISTRY_EVENTS = [
+    _event('PlotMinted', [('plotId', 'uint256', True), ('areaM2', 'uint256', False), ('to', 'address', True)]),
+    _event('PrimarySold', [('plotId', 'uint256', True), ('buyer', 'address', True), ('paid', 'uint256', False)]),
+    _event('SecondaryListed', [('plotId', 'uint256', True), ('price', 'uint256', False)]),
+    _event('SecondarySold', [('plotId', 'uint256', True), ('buyer', 'address', True), ('price', 'uint256', False)]),
+    _event('LienPlaced', [('plotId', 'uint256', True)]),
+    _event('LienReleased', [('plotId', 'uint256', True)])
+]
+
+MORTGAGE_EVENTS = [
+    _event('MortgageCreated', [('loanId', 'uint256', True), ('plotId', 'uint256', False),
+                               ('borrower', 'address', False), ('principal', 'uint256', False)]),
+    _event('MortgagePayment', [('loanId', 'uint256', True), ('amount', 'uint256', False),
+                               ('remaining', 'uint256', False)]),
+    _event('MortgageClosed', [('loanId', 'uint256', True)])
+]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS block_hashes (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    name TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_entity ON events (entity, entity_id);
+CREATE TABLE IF NOT EXISTS plots (
+    plot_id TEXT PRIMARY KEY,
+    area_m2 TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    net_value TEXT NOT NULL,
+    lien INTEGER NOT NULL DEFAULT 0,
+    minted_block INTEGER NOT NULL,
+    updated_block INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plots_owner ON plots (owner);
+CREATE TABLE IF NOT EXISTS listings (
+    plot_id TEXT PRIMARY KEY,
+    price TEXT NOT NULL,
+    listed_block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS loans (
+    loan_id TEXT PRIMARY KEY,
+    plot_id TEXT NOT NULL,
+    borrower TEXT NOT NULL,
+    principal TEXT NOT NULL,
+    original_principal TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    created_block INTEGER NOT NULL,
+    closed_block INTEGER
+);
+CREATE INDEX IF NOT EXISTS loans_plot ON loans (plot_id);
+"""
+
+
+# ============================================
+# ИНДЕКСАТОР
+# ============================================
+
+class EventIndexer:
+    """
+    Изтегля логовете на порции от chunk_size блока, прилага ги към таблиците
+    plots/listings/loans и записва напредъка след всяка порция. При reorg
+    (сменен hash на индексиран блок) връща назад до последния общ блок и
+    преизчислява само засегнатите парцели и заеми от останалите събития.
+
+    uint256 стойностите се пазят като текст - SQLite INTEGER е само 64 бита.
+    """
+
+    def __init__(self, w3: Web3, db_path: str, land_registry_address: str,
+                 mortgage_address: Optional[str] = None, start_block: int = 0,
+                 chunk_size: int = 2000, confirmations: int = 0, reorg_depth: int = 64):
+        self.w3 = w3
+        self.chunk_size = chunk_size
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.start_block = start_block
+        # Брой връщания назад (reorg или ръчни) - по него потребителите на
+        # updated_block разбират, че материализираните таблици са преизчислени
+        self.rollbacks = 0
+
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+        # topic0 -> contract event за декодиране
+        self.addresses = []
+        self._decoders = {}
+        contracts = [(land_registry_address, LAND_REGISTRY_EVENTS)]
+        if mortgage_address:
+            contracts.append((mortgage_address, MORTGAGE_EVENTS))
+        for address, abi in contracts:
+            address = Web3.to_checksum_address(address)
+            contract = w3.eth.contract(address=address, abi=abi)
+            self.addresses.append(address)
+            for event_abi in abi:
+                signature = f"{event_abi['name']}({','.join(arg['type'] for arg in event_abi['inputs'])})"
+                topic = Web3.keccak(text=signature)
+                self._decoders[bytes(topic)] = getattr(contract.events, event_abi['name'])()
+
+    # --- напредък ---
+
+    @property
+    def last_block(self) -> Optional[int]:
+        """Последният индексиран блок (None - нищо не е индексирано)"""
+        row = self.db.execute('SELECT block_number FROM checkpoint WHERE id = 0').fetchone()
+        return row['block_number'] if row else None
+
+    def _save_checkpoint(self, block_number: int, block_hash: str):
+        self.db.execute('INSERT OR REPLACE INTO checkpoint (id, block_number) VALUES (0, ?)', (block_number,))
+        self.db.execute('INSERT OR REPLACE INTO block_hashes VALUES (?, ?)', (block_number, block_hash))
+        self.db.execute(
+            'DELETE FROM block_hashes WHERE block_number NOT IN '
+            '(SELECT block_number FROM block_hashes ORDER BY block_number DESC LIMIT ?)',
+            (self.reorg_depth,)
+        )
+
+    def _block_hash(self, block_number: int) -> str:
+        return Web3.to_hex(self.w3.eth.get_block(block_number)['hash'])
+
+    # --- синхронизация ---
+
+    def sync(self, max_chunks: Optional[int] = None) -> int:
+        """Индексира до текущия блок (минус confirmations); връща броя нови събития"""
+        self._handle_reorg()
+
+        head = self.w3.eth.block_number - self.confirmations
+        last = self.last_block
+        next_block = self.start_block if last is None else last + 1
+        indexed = 0
+        chunks = 0
+
+        while next_block <= head and (max_chunks is None or chunks < max_chunks):
+            to_block = min(next_block + self.chunk_size - 1, head)
+            logs = self.w3.eth.get_logs({
+                'fromBlock': next_block,
+                'toBlock': to_block,
+                'address': self.addresses
+            })
+
+            with self.db:
+                for log in sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex'])):
+                    indexed += self._index_log(log)
+                self._save_checkpoint(to_block, self._block_hash(to_block))
+
+            next_block = to_block + 1
+            chunks += 1
+
+        return indexed
+
+    def _index_log(self, log) -> int:
+        decoder = self._decoders.get(bytes(log['topics'][0])) if log['topics'] else None
+        if decoder is None:
+            return 0
+        event = decoder.process_log(log)
+        name, args = event['event'], dict(event['args'])
+        entity, entity_id = ('loan', args['loanId']) if 'loanId' in args else ('plot', args['plotId'])
+        cursor = self.db.execute(
+            'INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (log['blockNumber'], log['logIndex'], Web3.to_hex(log['transactionHash']), name,
+             entity, str(entity_id), json.dumps({key: str(value) for key, value in args.items()}))
+        )
+        if cursor.rowcount == 0:
+            return 0
+        self._apply(name, args, log['blockNumber'])
+        return 1
+
+    def _apply(self, name: str, args: Dict, block_number: int):
+        """Прилага едно събитие към материализираните таблици"""
+        db = self.db
+        if 'plotId' in args:
+            plot_id = str(args['plotId'])
+
+        if name == 'PlotMinted':
+            db.execute('INSERT OR REPLACE INTO plots VALUES (?, ?, ?, ?, 0, ?, ?)',
+                       (plot_id, str(args['areaM2']), args['to'], '0', block_number, block_number))
+        elif name in ('PrimarySold', 'SecondarySold'):
+            price = args['paid'] if name == 'PrimarySold' else args['price']
+            db.execute('UPDATE plots SET owner = ?, net_value = ?, updated_block = ? WHERE plot_id = ?',
+                       (args['buyer'], str(price), block_number, plot_id))
+            if name == 'SecondarySold':
+                db.execute('DELETE FROM listings WHERE plot_id = ?', (plot_id,))
+        elif name == 'SecondaryListed':
+            db.execute('INSERT OR REPLACE INTO listings VALUES (?, ?, ?)',
+                       (plot_id, str(args['price']), block_number))
+        elif name in ('LienPlaced', 'LienReleased'):
+            db.execute('UPDATE plots SET lien = ?, updated_block = ? WHERE plot_id = ?',
+                       (1 if name == 'LienPlaced' else 0, block_number, plot_id))
+        elif name == 'MortgageCreated':
+            db.execute('INSERT OR REPLACE INTO loans VALUES (?, ?, ?, ?, ?, 1, ?, NULL)',
+                       (str(args['loanId']), plot_id, args['borrower'], str(args['principal']),
+                        str(args['principal']), block_number))
+        elif name == 'MortgagePayment':
+            db.execute('UPDATE loans SET principal = ? WHERE loan_id = ?',
+                       (str(args['remaining']), str(args['loanId'])))
+        elif name == 'MortgageClosed':
+            db.execute('UPDATE loans SET active = 0, closed_block = ? WHERE loan_id = ?',
+                       (block_number, str(args['loanId'])))
+
+    # --- reorg ---
+
+    def _handle_reorg(self):
+        """Намира последния индексиран блок, чийто hash още съвпада, и връща назад до него"""
+        stored = self.db.execute(
+            'SELECT block_number, block_hash FROM block_hashes ORDER BY block_number DESC'
+        ).fetchall()
+        if not stored or self._block_hash(stored[0]['block_number']) == stored[0]['block_hash']:
+            return
+
+        fork_block = self.start_block - 1
+        for row in stored[1:]:
+            if self._block_hash(row['block_number']) == row['block_hash']:
+                fork_block = row['block_number']
+                break
+        print(f"⚠️  Reorg - връщане до блок {fork_block}")
+        self.rollback(fork_block)
+
+    def rollback(self, block_number: int):
+        """Премахва събитията след block_number и преизчислява засегнатите обекти"""
+        with self.db:
+            affected = self.db.execute(
+                'SELECT DISTINCT entity, entity_id FROM events WHERE block_number > ?', (block_number,)
+            ).fetchall()
+            self.db.execute('DELETE FROM events WHERE block_number > ?', (block_number,))
+            self.db.execute('DELETE FROM block_hashes WHERE block_number > ?', (block_number,))
+            if block_number < self.start_block:
+                self.db.execute('DELETE FROM checkpoint')
+            else:
+                self.db.execute('UPDATE checkpoint SET block_number = ? WHERE id = 0', (block_number,))
+
+            for entity, entity_id in affected:
+                self._rebuild(entity, entity_id)
+        self.rollbacks += 1
+
+    def _rebuild(self, entity: str, entity_id: str):
+        """Възстановява парцел или заем от запазените събития"""
+        if entity == 'plot':
+            self.db.execute('DELETE FROM plots WHERE plot_id = ?', (entity_id,))
+            self.db.execute('DELETE FROM listings WHERE plot_id = ?', (entity_id,))
+        else:
+            self.db.execute('DELETE FROM loans WHERE loan_id = ?', (entity_id,))
+
+        events = self.db.execute(
+            'SELECT name, args, block_number FROM events WHERE entity = ? AND entity_id = ? '
+            'ORDER BY block_number, log_index', (entity, entity_id)
+        ).fetchall()
+        for row in events:
+            self._apply(row['name'], json.loads(row['args']), row['block_number'])
+
+    # --- заявки ---
+
+    def get_plot(self, plot_id: int) -> Optional[Dict]:
+        """Парцел с активната обява (ако има)"""
+        row = self.db.execute(
+            'SELECT plots.*, listings.price AS sale_price FROM plots '
+            'LEFT JOIN listings USING (plot_id) WHERE plot_id = ?', (str(plot_id),)
+        ).fetchone()
+        return self._plot_dict(row) if row else None
+
+    def get_plots_by_owner(self, owner: str) -> List[Dict]:
+        rows = self.db.execute(
+            'SELECT plots.*, listings.price AS sale_price FROM plots '
+            'LEFT JOIN listings USING (plot_id) WHERE owner = ?', (Web3.to_checksum_address(owner),)
+        ).fetchall()
+        return sorted((self._plot_dict(row) for row in rows), key=lambda plot: plot['plot_id'])
+
+    def get_plot_owners(self, plot_ids: Optional[List[int]] = None,
+                        updated_after: Optional[int] = None) -> Dict[int, str]:
+        """
+        Plot ID -> собственик за индексираните парцели: само за plot_ids
+        и/или само променените след блок updated_after (иначе всички)
+        """
+        query, params = 'SELECT plot_id, owner FROM plots WHERE 1 = 1', []
+        if updated_after is not None:
+            query += ' AND updated_block > ?'
+            params.append(updated_after)
+        if plot_ids is None:
+            return {int(row['plot_id']): row['owner'] for row in self.db.execute(query, params)}
+
+        owners = {}
+        plot_ids = [str(plot_id) for plot_id in plot_ids]
+        # Порции под лимита на SQLite за параметри в една заявка
+        for i in range(0, len(plot_ids), 500):
+            chunk = plot_ids[i:i + 500]
+            rows = self.db.execute(
+                f"{query} AND plot_id IN ({', '.join('?' * len(chunk))})", params + chunk
+            )
+            owners.update((int(row['plot_id']), row['owner']) for row in rows)
+        return owners
+
+    def get_listings(self) -> List[Dict]:
+        """Парцелите, обявени за продажба"""
+        rows = self.db.execute(
+            'SELECT listings.plot_id, listings.price, listings.listed_block, plots.owner, plots.lien '
+            'FROM listings LEFT JOIN plots USING (plot_id)'
+        ).fetchall()
+        return sorted(({
+            'plot_id': int(row['plot_id']),
+            'price': int(row['price']),
+            'seller': row['owner'],
+            'lien': bool(row['lien']),
+            'listed_block': row['listed_block']
+        } for row in rows), key=lambda listing: listing['plot_id'])
+
+    def get_loans(self, active_only: bool = True, plot_id: Optional[int] = None) -> List[Dict]:
+        query, params = 'SELECT * FROM loans WHERE 1 = 1', []
+        if active_only:
+            query += ' AND active = 1'
+        if plot_id is not None:
+            query += ' AND plot_id = ?'
+            params.append(str(plot_id))
+        return sorted((self._loan_dict(row) for row in self.db.execute(query, params)),
+                      key=lambda loan: loan['loan_id'])
+
+    @staticmethod
+    def _plot_dict(row) -> Dict:
+        return {
+            'plot_id': int(row['plot_id']),
+            'area_m2': int(row['area_m2']),
+            'owner': row['owner'],
+            'net_value': int(row['net_value']),
+            'lien': bool(row['lien']),
+            'for_sale': row['sale_price'] is not None,
+            'sale_price': int(row['sale_price']) if row['sale_price'] is not None else 0,
+            'minted_block': row['minted_block'],
+            'updated_block': row['updated_block']
+        }
+
+    @staticmethod
+    def _loan_dict(row) -> Dict:
+        return {
+            'loan_id': int(row['loan_id']),
+            'plot_id': int(row['plot_id']),
+            'borrower': row['borrower'],
+            'principal': int(row['principal']),
+            'original_principal': int(row['original_principal']),
+            'active': bool(row['active']),
+            'created_block': row['created_block'],
+            'closed_block': row['closed_block']
+        }
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,198 @@
+"""
+SARAKT TRANSACTION JOURNAL - Python
+Append-only журнал на намеренията, изпратените и потвърдените транзакции на моста
+
+Всеки ред е JSON запис:
+    {"op": "intent", "id", "kind", "args"}       - намерение (напр. claim_plot)
+    {"op": "broadcast", "id", "tx_hash", "nonce", "raw"} - подписана транзакция
+    {"op": "confirm", "id", "result"}            - потвърдена, с резултата
+    {"op": "fail", "id", "error"}                - окончателно неуспешна
+
+Записите се буферират и записват с общ fsync (group commit) от фонова нишка;
+broadcast записите се чакат да станат трайни ПРЕДИ изпращането към node-а,
+така че след срив всяка изпратена транзакция е в журнала със своя nonce и raw байтове.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+
+# Състояния на намерение след прочитане на журнала
+INTENT = 'intent'
+BROADCAST = 'broadcast'
+CONFIRMED = 'confirmed'
+FAILED = 'failed'
+
+
+class TxJournal:
+    """
+    Журнал с групово fsync-ване: записите от всички нишки, натрупани за
+    flush_interval секунди, се записват и fsync-ват наведнъж.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.005):
+        self.path = path
+        self.flush_interval = flush_interval
+
+        # id -> {'kind', 'args', 'status', 'tx_hash', 'nonce', 'raw', 'result', 'error'}
+        self.entries: Dict[str, Dict] = {}
+        self._replay()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+        self._cond = threading.Condition()
+        # Сериализира писането във файла (фоновата нишка и compact)
+        self._io_lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._written = 0
+        self._durable = 0
+        self._closed = False
+        self.fsyncs = 0
+        self._thread = threading.Thread(target=self._run, name='tx-journal', daemon=True)
+        self._thread.start()
+
+    # --- записи ---
+
+    def intent(self, kind: str, **args) -> str:
+        """Записва намерение; връща неговото ID"""
+        intent_id = uuid.uuid4().hex
+        self._append({'op': 'intent', 'id': intent_id, 'kind': kind, 'args': args})
+        return intent_id
+
+    def broadcast(self, intent_id: str, tx_hash: str, nonce: int, raw: bytes):
+        """Записва подписана транзакция и чака записът да е траен (преди изпращане)"""
+        self._append({'op': 'broadcast', 'id': intent_id, 'tx_hash': tx_hash,
+                      'nonce': nonce, 'raw': '0x' + bytes(raw).hex()}, durable=True)
+
+    def confirm(self, intent_id: str, result: Dict):
+        self._append({'op': 'confirm', 'id': intent_id, 'result': result})
+
+    def fail(self, intent_id: str, error: str):
+        self._append({'op': 'fail', 'id': intent_id, 'error': error})
+
+    def pending(self) -> Dict[str, Dict]:
+        """Намерения без окончателен резултат"""
+        with self._cond:
+            return {intent_id: dict(entry) for intent_id, entry in self.entries.items()
+                    if entry['status'] in (INTENT, BROADCAST)}
+
+    def sync(self):
+        """Чака всички записани досега редове да станат трайни"""
+        with self._cond:
+            target = self._written
+            self._cond.notify_all()
+            while self._durable < target:
+                self._cond.wait()
+
+    def close(self):
+        self.sync()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.close()
+
+    def compact(self):
+        """
+        Пренаписва журнала атомарно с по един запис на намерение (текущото
+        му състояние); неуспешните намерения се изпускат.
+        """
+        self.sync()
+        tmp_path = self.path + '.tmp'
+        with self._io_lock, self._cond:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for intent_id, entry in self.entries.items():
+                    if entry['status'] != FAILED:
+                        f.write(json.dumps({'op': 'state', 'id': intent_id, **entry}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self.entries = {intent_id: entry for intent_id, entry in self.entries.items()
+                            if entry['status'] != FAILED}
+
+    # --- вътрешни ---
+
+    def _append(self, record: Dict, durable: bool = False):
+        line = json.dumps(record) + '\n'
+        with self._cond:
+            if self._closed:
+                raise ValueError('Журналът е затворен')
+            self._apply(record)
+            self._buffer.append(line)
+            self._written += 1
+            target = self._written
+            self._cond.notify_all()
+            if durable:
+                while self._durable < target:
+                    self._cond.wait()
+
+    def _apply(self, record: Dict):
+        op = record['op']
+        if op == 'state':
+            self.entries[record['id']] = {key: value for key, value in record.items()
+                                          if key not in ('op', 'id')}
+            return
+        if op == 'intent':
+            self.entries[record['id']] = {
+                'kind': record['kind'], 'args': record['args'], 'status': INTENT,
+                'tx_hash': None, 'nonce': None, 'raw': None, 'result': None, 'error': None
+            }
+            return
+
+        entry = self.entries.get(record['id'])
+        if entry is None:
+            return
+        if op == 'broadcast':
+            entry.update(status=BROADCAST, tx_hash=record['tx_hash'],
+                         nonce=record['nonce'], raw=record['raw'])
+        elif op == 'confirm':
+            entry.update(status=CONFIRMED, result=record['result'], raw=None)
+        elif op == 'fail':
+            entry.update(status=FAILED, error=record['error'], raw=None)
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r+', encoding='utf-8') as f:
+            valid_end = 0
+            for line in iter(f.readline, ''):
+                # Недописан последен ред от срив - отрязва се
+                if not line.endswith('\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record)
+                valid_end = f.tell()
+            f.truncate(valid_end)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer and self._closed:
+                    return
+            # Кратко изчакване - записите от други нишки влизат в същия fsync
+            if self.flush_interval:
+                time.sleep(self.flush_interval)
+            with self._io_lock:
+                with self._cond:
+                    lines, self._buffer = self._buffer, []
+                    target = self._written
+                self._file.write(''.join(lines))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            with self._cond:
+                self.fsyncs += 1
+                self._durable = target
+                self._cond.notify_all()
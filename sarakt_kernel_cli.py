@@ -14,6 +14,9 @@ from colorama import init, Fore, Style
 # Импорт на модулите
 from sarakt_universe_engine import SaraktUniverse, StructureType, NPCState
 from sarakt_blockchain_integration import BlockchainConnector, SaraktBridge, get_config
+from sarakt_journal import TxJournal
+from sarakt_reconcile import Reconciler
+from sarakt_indexer import EventIndexer
 
 # Инициализира colorama за цветен текст
 init(autoreset=True)
@@ -39,6 +42,8 @@ class SaraktKernel(cmd.Cmd):
         self.universe: Optional[SaraktUniverse] = None
         self.blockchain: Optional[BlockchainConnector] = None
         self.bridge: Optional[SaraktBridge] = None
+        self.indexer: Optional[EventIndexer] = None
+        self.reconciler: Optional[Reconciler] = None
         self.history = []
     
     # ============================================
@@ -51,6 +56,37 @@ class SaraktKernel(cmd.Cmd):
         self.universe = SaraktUniverse()
         print(f"{Fore.GREEN}✅ Вселена инициализирана успешно{Style.RESET_ALL}\n")
     
+    def do_save(self, arg):
+        """Записва snapshot на вселената: save <path>"""
+        if not arg:
+            print('Употреба: save <path>')
+            return
+        
+        from sarakt_snapshot import save_snapshot
+        
+        try:
+            size = save_snapshot(self.universe, arg.strip())
+            print(f"{Fore.GREEN}✅ Snapshot записан ({size:,} байта){Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}❌ Записът неуспешен: {e}{Style.RESET_ALL}")
+    
+    def do_load(self, arg):
+        """Зарежда вселена от snapshot: load <path> [mmap]"""
+        args = arg.split()
+        if not args:
+            print('Употреба: load <path> [mmap]')
+            return
+        
+        from sarakt_snapshot import load_snapshot
+        
+        try:
+            self.universe = load_snapshot(args[0], mmap=len(args) > 1 and args[1] == 'mmap')
+            if self.bridge:
+                self.bridge.universe = self.universe
+            print(f"{Fore.GREEN}✅ Вселена заредена (цикъл {self.universe.current_cycle}){Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}❌ Зареждането неуспешно: {e}{Style.RESET_ALL}")
+    
     def do_config(self, arg):
         """Конфигурира blockchain връзка: config <rpc_url> [contract_address]"""
         args = arg.split()
@@ -66,11 +102,33 @@ class SaraktKernel(cmd.Cmd):
         try:
             print(f"{Fore.CYAN}⚙️  Конфигуриране на blockchain връзка...{Style.RESET_ALL}")
             self.blockchain = BlockchainConnector(config)
-            self.bridge = SaraktBridge(self.universe, self.blockchain)
+            journal = TxJournal(config['journal_path']) if config.get('journal_path') else None
+            self.bridge = SaraktBridge(self.universe, self.blockchain, journal)
+            # Индексаторът на LandRegistry дава собствениците за сверката
+            self.indexer = None
+            if config.get('indexer_db_path') and config.get('land_registry_address'):
+                self.indexer = EventIndexer(self.blockchain.w3, config['indexer_db_path'],
+                                            config['land_registry_address'])
             print(f"{Fore.GREEN}✅ Blockchain конфигуриран успешно{Style.RESET_ALL}")
+            
+            # Минтвания от предишно изпълнение, прекъснати преди потвърждение
+            if journal and journal.entries:
+                self.bridge.recover()
         except Exception as e:
             print(f"{Fore.RED}❌ Конфигурацията неуспешна: {e}{Style.RESET_ALL}")
     
+    def do_tx_pending(self, arg):
+        """Показва изпратените, но непотвърдени транзакции"""
+        if not self.blockchain:
+            print(f"{Fore.RED}❌ Blockchain не е конфигуриран. Използвайте 'config' първо.{Style.RESET_ALL}")
+            return
+        
+        pending = self.blockchain.get_transaction_status()['pending']
+        print(f"\n{Fore.CYAN}Чакащи транзакции: {len(pending)}{Style.RESET_ALL}")
+        for tx_hash, waiting in pending.items():
+            print(f"  {tx_hash}  ({waiting:.1f}s)")
+        print()
+    
     def do_status(self, arg):
         """Показва статус на системата"""
         if not self.universe:
@@ -98,7 +156,10 @@ class SaraktKernel(cmd.Cmd):
             print(f"  NPCs: {sync_status['npcs']}")
             print(f"  Структури: {sync_status['structures']}")
             print(f"  Ресурси: {sync_status['resources']}")
+            print(f"  На опашка: {sync_status['queued']}")
             print(f"  Авто-синх: {'✓' if sync_status['auto_sync'] else '✗'}")
+            cache = self.blockchain.view_cache.stats()
+            print(f"  View кеш: {cache['hits']} попадения / {cache['misses']} пропуска")
         print()
     
     def do_clear(self, arg):
@@ -106,8 +167,53 @@ class SaraktKernel(cmd.Cmd):
         os.system('cls' if os.name == 'nt' else 'clear')
         print(self.intro)
     
+    def do_sync_flush(self, arg):
+        """Изпраща натрупаните промени към blockchain веднага"""
+        if not self.bridge:
+            print(f"{Fore.RED}❌ Blockchain bridge не е конфигуриран. Използвайте 'config' първо.{Style.RESET_ALL}")
+            return
+        
+        try:
+            tx_hashes = self.bridge.flush_sync_queue(wait=True)
+            print(f"{Fore.GREEN}✅ Синхронизирани с {len(tx_hashes)} транзакции{Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}❌ Синхронизацията неуспешна: {e}{Style.RESET_ALL}")
+    
+    def do_reconcile(self, arg):
+        """Сверява вселената с веригата (само промените от последната сверка): reconcile [full]"""
+        if not self.universe or not self.blockchain:
+            print(f"{Fore.RED}❌ Нужни са 'init' и 'config' първо.{Style.RESET_ALL}")
+            return
+        
+        # Нова контролна точка при друга вселена или връзка (напр. след load)
+        if (self.reconciler is None or self.reconciler.universe is not self.universe
+                or self.reconciler.blockchain is not self.blockchain
+                or self.reconciler.indexer is not self.indexer):
+            self.reconciler = Reconciler(self.universe, self.blockchain, self.indexer)
+        
+        try:
+            report = self.reconciler.run(full=arg.strip() == 'full')
+        except Exception as e:
+            print(f"{Fore.RED}❌ Сверката неуспешна: {e}{Style.RESET_ALL}")
+            return
+        
+        checked = report['checked']
+        print(f"\n{Fore.CYAN}Сверка до блок {report['block']} ({'пълна' if report['full'] else 'инкрементална'}, "
+              f"{report['elapsed']}s): {checked['plot_tokens']} парцела, {checked['npc_tokens']} NPCs, "
+              f"{checked['owners']} собственика{Style.RESET_ALL}")
+        for divergence in report['new']:
+            print(f"  {Fore.RED}≠ {divergence['asset']} #{divergence['id']} {divergence['field']}: "
+                  f"вселена {divergence['universe']} / верига {divergence['chain']}{Style.RESET_ALL}")
+        if report['resolved']:
+            print(f"  {Fore.GREEN}✓ Отстранени: {len(report['resolved'])}{Style.RESET_ALL}")
+        print(f"  Открити разлики: {report['open']}\n")
+    
     def do_exit(self, arg):
         """Излиза от Sarakt Kernel"""
+        if self.bridge and len(self.bridge.sync_queue):
+            self.do_sync_flush('')
+        if self.bridge and self.bridge.journal:
+            self.bridge.journal.close()
         print(f"\n{Fore.YELLOW}👋 Изключване на Sarakt Kernel...{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}Dynasty Dulo Protocol прекратен.{Style.RESET_ALL}\n")
         return True
@@ -216,8 +322,8 @@ class SaraktKernel(cmd.Cmd):
                 result = self.bridge.extract_resources(
                     planet_id, resource, amount, self.blockchain.address
                 )
-                print(f"{Fore.GREEN}✅ Извлечени {amount} {resource} от планета {planet_id}{Style.RESET_ALL}")
-                print(f"TX Hash: {result['receipt']['tx_hash']}")
+                print(f"{Fore.GREEN}✅ Извлечени {result['extracted']} {resource} от планета {planet_id}{Style.RESET_ALL}")
+                print(f"На опашка за синхронизация: {result['queued']}")
             else:
                 planet = self.universe.get_planet(planet_id)
                 planet.extract_resource(resource, amount)
@@ -254,9 +360,11 @@ class SaraktKernel(cmd.Cmd):
             return
         
         try:
-            city_id = int(arg)
-            city = self.universe.cities[city_id - 1]
-        except (ValueError, IndexError):
+            city = self.universe.get_city(int(arg))
+        except ValueError:
+            city = None
+        
+        if not city:
             print(f"{Fore.RED}❌ Град не е намерен{Style.RESET_ALL}")
             return
         
@@ -290,10 +398,37 @@ class SaraktKernel(cmd.Cmd):
             player_address = args[2]
             
             if self.bridge:
-                result = self.bridge.claim_plot(player_address, plot_number)
+                # Не блокира - token ID-то се свързва след потвърждение (вж. tx_pending)
+                result = self.bridge.claim_plot(player_address, plot_number, wait=False)
                 print(f"{Fore.GREEN}✅ Парцел {plot_number} претендиран от {player_address}{Style.RESET_ALL}")
-                print(f"Token ID: {result['nft']['token_id']}")
-                print(f"TX Hash: {result['nft']['tx_hash']}")
+                print(f"TX Hash: {result['nft']['tx_hash']} (очаква потвърждение)")
+            else:
+                print(f"{Fore.RED}❌ Blockchain bridge не е конфигуриран. Използвайте 'config' първо.{Style.RESET_ALL}")
+        
+        except Exception as e:
+            print(f"{Fore.RED}❌ Претендирането неуспешно: {e}{Style.RESET_ALL}")
+    
+    def do_city_claim_range(self, arg):
+        """Претендира поредица парцели: city_claim_range <cityId> <firstPlot> <count> <areaM2> <playerAddress>"""
+        args = arg.split()
+        if len(args) < 5:
+            print('Употреба: city_claim_range <cityId> <firstPlot> <count> <areaM2> <playerAddress>')
+            return
+        
+        try:
+            first_plot = int(args[1])
+            count = int(args[2])
+            area_m2 = int(args[3])
+            player_address = args[4]
+            
+            if self.bridge:
+                claims = [(player_address, plot_number) for plot_number in range(first_plot, first_plot + count)]
+                result = self.bridge.claim_plots(claims, area_m2)
+                print(f"{Fore.GREEN}✅ {len(result['plots'])} парцела претендирани с {result['transactions']} транзакции{Style.RESET_ALL}")
+                if result['failed']:
+                    print(f"{Fore.YELLOW}⚠️  Неминтнати: {result['failed']}{Style.RESET_ALL}")
+                if result['pending']:
+                    print(f"{Fore.YELLOW}⏳ Чакат потвърждение: {result['pending']}{Style.RESET_ALL}")
             else:
                 print(f"{Fore.RED}❌ Blockchain bridge не е конфигуриран. Използвайте 'config' първо.{Style.RESET_ALL}")
         
@@ -316,7 +451,7 @@ class SaraktKernel(cmd.Cmd):
             if self.bridge:
                 # Взима собственика на парцела
                 city = self.universe.get_city('Octavia Capital City')
-                plot = next((p for p in city.plots if p.id == plot_number), None)
+                plot = city.get_plot(plot_number)
                 
                 if not plot or not plot.owner:
                     print(f"{Fore.RED}❌ Парцел не е намерен или не е притежаван{Style.RESET_ALL}")
@@ -324,7 +459,8 @@ class SaraktKernel(cmd.Cmd):
                 
                 result = self.bridge.build_on_plot(plot.owner, plot_number, structure_type)
                 print(f"{Fore.GREEN}✅ {structure_name} построен на парцел {plot_number}{Style.RESET_ALL}")
-                print(f"TX Hash: {result['receipt']['tx_hash']}")
+                if result['receipt']:
+                    print(f"TX Hash: {result['receipt']['tx_hash']}")
             else:
                 print(f"{Fore.RED}❌ Blockchain bridge не е конфигуриран.{Style.RESET_ALL}")
         
@@ -427,15 +563,15 @@ class SaraktKernel(cmd.Cmd):
             player_address = args[1]
             
             if self.bridge:
-                result = self.bridge.spawn_and_mint_npc(planet_id, player_address)
+                result = self.bridge.spawn_and_mint_npc(planet_id, player_address, wait=False)
                 print(f"{Fore.GREEN}✅ NPC създаден: {result['npc'].get_name()}{Style.RESET_ALL}")
-                print(f"Token ID: {result['nft']['token_id']}")
-                print(f"TX Hash: {result['nft']['tx_hash']}")
+                print(f"TX Hash: {result['nft']['tx_hash']} (очаква потвърждение)")
             else:
                 from sarakt_universe_engine import NPC
                 npc_id = len(self.universe.npcs) + 1
-                npc = NPC(npc_id, planet_id, 50000 + npc_id)
-                self.universe.npcs.append(npc)
+                npc = self.universe.add_npc(
+                    NPC(npc_id, planet_id, 50000 + npc_id, self.universe.generator_version)
+                )
                 print(f"{Fore.GREEN}✅ NPC създаден: {npc.get_name()} (само off-chain){Style.RESET_ALL}")
         
         except Exception as e:
@@ -0,0 +1,173 @@
+"""
+SARAKT WEB3 PROVIDER - Python
+Споделени Web3 връзки с keep-alive HTTP сесии и кеш на ABI-та и contract-и за целия процес
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+
+# Брой keep-alive връзки към един node и таймаути (секунди) по подразбиране
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+# rpc_url с тази схема се обслужва от in-process верига (sarakt_fake_chain)
+FAKE_CHAIN_SCHEME = 'fake://'
+
+_lock = threading.Lock()
+_providers: Dict[str, Web3] = {}
+_sessions: Dict[str, requests.Session] = {}
+_abis: Dict[str, List] = {}
+_contracts: Dict[Tuple[int, str, str], object] = {}
+
+
+# ============================================
+# HTTP СЕСИИ И WEB3
+# ============================================
+
+def make_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    requests сесия с pool от pool_size keep-alive връзки - паралелните
+    заявки (напр. от ThreadPoolExecutor) не отварят нова TCP/TLS връзка всеки път.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_web3(rpc_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+             connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+             read_timeout: float = DEFAULT_READ_TIMEOUT,
+             middleware: Optional[List] = None) -> Web3:
+    """
+    Споделена Web3 инстанция за rpc_url. Първото извикване създава
+    provider-а със сесията и middleware-ите (инжектирани на слой 0);
+    следващите връщат същата инстанция, а параметрите им се игнорират.
+    """
+    with _lock:
+        w3 = _providers.get(rpc_url)
+        if w3 is None and rpc_url.startswith(FAKE_CHAIN_SCHEME):
+            # In-process верига (бенчмаркове, офлайн проверки) - без HTTP сесия
+            from sarakt_fake_chain import FakeChainProvider, get_fake_chain
+            w3 = Web3(FakeChainProvider(get_fake_chain(rpc_url)))
+            for item in middleware or []:
+                w3.middleware_onion.inject(item, layer=0)
+            _providers[rpc_url] = w3
+        elif w3 is None:
+            session = make_session(pool_size)
+            provider = Web3.HTTPProvider(
+                rpc_url,
+                request_kwargs={'timeout': (connect_timeout, read_timeout)},
+                session=session
+            )
+            w3 = Web3(provider)
+            for item in middleware or []:
+                w3.middleware_onion.inject(item, layer=0)
+            _providers[rpc_url] = w3
+            _sessions[rpc_url] = session
+        return w3
+
+
+def close_all():
+    """Затваря сесиите на всички споделени provider-и"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _providers.clear()
+        _contracts.clear()
+
+
+# ============================================
+# ABI И CONTRACT КЕШ
+# ============================================
+
+def load_abi(path: str) -> List:
+    """ABI от компилиран артефакт ({"abi": [...]}) или чист ABI файл; чете се веднъж"""
+    key = os.path.abspath(path)
+    with _lock:
+        abi = _abis.get(key)
+    if abi is not None:
+        return abi
+
+    with open(key, 'r') as f:
+        data = json.load(f)
+    abi = data.get('abi', data) if isinstance(data, dict) else data
+
+    with _lock:
+        return _abis.setdefault(key, abi)
+
+
+def get_contract(w3: Web3, address: str, abi_path: Union[str, List]):
+    """
+    Contract handle за (w3, адрес, ABI файл), създаден веднъж за процеса.
+    abi_path може да е и готов ABI списък - тогава handle-ът не се кешира.
+    """
+    address = Web3.to_checksum_address(address) if hasattr(Web3, 'to_checksum_address') \
+        else Web3.toChecksumAddress(address)
+    if not isinstance(abi_path, str):
+        return w3.eth.contract(address=address, abi=abi_path)
+
+    key = (id(w3), address, os.path.abspath(abi_path))
+    with _lock:
+        contract = _contracts.get(key)
+    if contract is None:
+        contract = w3.eth.contract(address=address, abi=load_abi(abi_path))
+        with _lock:
+            contract = _contracts.setdefault(key, contract)
+    return contract
+
+
+def cache_info() -> Dict:
+    """Брой споделени provider-и, ABI-та и contract handle-и"""
+    with _lock:
+        return {
+            'providers': len(_providers),
+            'abis': len(_abis),
+            'contracts': len(_contracts)
+        }
+
+
+# ============================================
+# ASYNC WEB3
+# ============================================
+
+async def get_async_web3(rpc_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                         connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                         read_timeout: float = DEFAULT_READ_TIMEOUT):
+    """
+    AsyncWeb3 с aiohttp сесия, ограничена до pool_size keep-alive връзки.
+    Сесията е обвързана с текущия event loop, затова не се кешира за
+    процеса - затваря се с close_async_web3().
+    """
+    from web3 import AsyncWeb3
+
+    if rpc_url.startswith(FAKE_CHAIN_SCHEME):
+        from sarakt_fake_chain import AsyncFakeChainProvider, get_fake_chain
+        return AsyncWeb3(AsyncFakeChainProvider(get_fake_chain(rpc_url)))
+
+    import aiohttp
+
+    provider = AsyncWeb3.AsyncHTTPProvider(rpc_url, request_kwargs={
+        'timeout': aiohttp.ClientTimeout(total=connect_timeout + read_timeout,
+                                         sock_connect=connect_timeout,
+                                         sock_read=read_timeout)
+    })
+    await provider.cache_async_session(aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=pool_size)
+    ))
+    return AsyncWeb3(provider)
+
+
+async def close_async_web3(w3):
+    """Затваря aiohttp сесията на AsyncWeb3 от get_async_web3()"""
+    await w3.provider.disconnect()
@@ -0,0 +1,330 @@
+"""
+SARAKT RECONCILIATION - Python
+Сверка на вселената в паметта с веригата: собственици и token ID-та на парцели и NPCs
+
+Източници от страна на веригата:
+    - EventIndexer (по избор) - собствениците в LandRegistry от индексираните събития
+    - balanceOfBatch - дали собственикът във вселената държи token ID-то (ERC1155)
+
+Парцелите от LandRegistry.mintPlots нямат ERC1155 token ID - за тях важи
+само сверката на собствениците през индексатора.
+
+Всяка сверка след първата е инкрементална: проверяват се само активите,
+променени във вселената от предишната сверка, парцелите с нови събития в
+индексатора и token ID-тата с TransferSingle/TransferBatch след последния
+проверен блок. Резултатът е компактен отчет с новите и отстранените разлики.
+"""
+
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from web3 import Web3
+
+from sarakt_universe_engine import SaraktUniverse, NPCPopulation
+from sarakt_blockchain_integration import _EventLayout
+
+
+# Събития за прехвърляне на ERC1155 token-и в основния contract
+TRANSFER_EVENTS = {'TransferSingle': 'id', 'TransferBatch': 'ids'}
+
+# Ключ на разлика: (актив, ID, поле)
+DivergenceKey = Tuple[str, int, str]
+
+
+def _same_address(a: Optional[str], b: Optional[str]) -> bool:
+    return (a or '').lower() == (b or '').lower()
+
+
+# ============================================
+# СЪСТОЯНИЕ НА ВСЕЛЕНАТА
+# ============================================
+
+class _PlotState:
+    """
+    Собственици и token ID-та на парцелите на град към момента на сверката.
+    В компактен режим се пазят копия на колоните и разликата е векторизирана.
+    """
+
+    def __init__(self, city):
+        self.city = city
+        self.compact = city.compact
+        if self.compact:
+            table = city.plots
+            self.table = table
+            self.owner = np.array(table.owner)
+            self.token_id = np.array(table.token_id)
+            self.big_token_ids = dict(table._big_token_ids)
+        else:
+            self.plots = [(plot.owner, plot.token_id) for plot in city.plots]
+
+    def changed_since(self, previous: Optional['_PlotState']) -> Optional[Set[int]]:
+        """ID-та на парцелите с друг собственик или token ID; None - несравнимо (пълна сверка)"""
+        if previous is None or previous.city is not self.city or previous.compact != self.compact:
+            return None
+        if self.compact:
+            if previous.table is not self.table or len(previous.owner) != len(self.owner):
+                return None
+            rows = np.flatnonzero((self.owner != previous.owner) | (self.token_id != previous.token_id))
+            changed = set((rows + 1).tolist())
+            for row in set(self.big_token_ids) | set(previous.big_token_ids):
+                if self.big_token_ids.get(row) != previous.big_token_ids.get(row):
+                    changed.add(row + 1)
+            return changed
+        if len(previous.plots) != len(self.plots):
+            return None
+        return {index + 1 for index, (current, old) in enumerate(zip(self.plots, previous.plots))
+                if current != old}
+
+    def tokens(self, plot_ids: Optional[Set[int]] = None) -> Dict[int, int]:
+        """Plot ID -> token ID на минтнатите парцели (по избор само сред plot_ids)"""
+        if not self.compact:
+            ids = range(1, len(self.plots) + 1) if plot_ids is None else plot_ids
+            return {plot_id: self.plots[plot_id - 1][1] for plot_id in ids
+                    if self.plots[plot_id - 1][1] is not None}
+
+        if plot_ids is None:
+            rows = np.flatnonzero(self.token_id >= 0).tolist()
+        else:
+            rows = [plot_id - 1 for plot_id in plot_ids if self.token_id[plot_id - 1] >= 0]
+        tokens = {row + 1: int(self.token_id[row]) for row in rows}
+        tokens.update((row + 1, token_id) for row, token_id in self.big_token_ids.items()
+                      if plot_ids is None or row + 1 in plot_ids)
+        return tokens
+
+    def __len__(self) -> int:
+        return len(self.owner) if self.compact else len(self.plots)
+
+    def owner_of(self, plot_id: int) -> Optional[str]:
+        if self.compact:
+            return self.table.owner_names[self.owner[plot_id - 1]]
+        return self.plots[plot_id - 1][0]
+
+
+def _npc_tokens(universe: SaraktUniverse) -> Dict[int, int]:
+    """NPC ID -> token ID на минтнатите NPCs"""
+    npcs = universe.npcs
+    if isinstance(npcs, NPCPopulation):
+        # token_id е сред редките полета - обхождат се само редовете с такива
+        ids = npcs.ids
+        return {int(ids[row]): extras['token_id'] for row, extras in npcs._extra.items()
+                if extras.get('token_id') is not None}
+    return {npc.id: npc.token_id for npc in npcs if npc.token_id is not None}
+
+
+# ============================================
+# СВЕРКА
+# ============================================
+
+class Reconciler:
+    """
+    Сверява парцелите на един град и NPCs на вселената с веригата.
+
+    blockchain (BlockchainConnector) дава проверката на token ID-тата с
+    balanceOfBatch; indexer (EventIndexer) - сверката на собствениците в
+    LandRegistry. Открити разлики остават в self.divergences, докато
+    повторна проверка на актива не покаже съвпадение.
+    """
+
+    # Блокове в една eth_getLogs заявка за прехвърлянията
+    LOG_CHUNK_SIZE = 2000
+
+    def __init__(self, universe: SaraktUniverse, blockchain=None, indexer=None,
+                 city_name: str = 'Octavia Capital City'):
+        self.universe = universe
+        self.blockchain = blockchain
+        self.indexer = indexer
+        self.city_name = city_name
+
+        self.divergences: Dict[DivergenceKey, Dict] = {}
+
+        # Контролна точка от предишната сверка
+        self._plots: Optional[_PlotState] = None
+        self._npcs: Dict[int, int] = {}
+        self._block: Optional[int] = None
+        self._indexed_block: Optional[int] = None
+        self._indexer_rollbacks = 0
+        # token ID -> активите с него (за прехвърлянията от веригата)
+        self._token_assets: Dict[int, Set[Tuple[str, int]]] = {}
+
+    def run(self, full: bool = False) -> Dict:
+        """
+        Сверява променените от предишната сверка активи (или всички при
+        full=True / първа сверка) и връща отчет:
+        {'block', 'full', 'checked', 'new', 'resolved', 'open', 'elapsed'}
+        """
+        started = time.perf_counter()
+        city = self.universe.get_city(self.city_name)
+        if city is None:
+            raise ValueError(f'Град {self.city_name} не е намерен')
+
+        head = self.blockchain.w3.eth.block_number if self.blockchain else None
+
+        # 1. Промени във вселената
+        plots = _PlotState(city)
+        changed_plots = None if full else plots.changed_since(self._plots)
+        full = changed_plots is None
+        npcs = _npc_tokens(self.universe)
+        if full:
+            changed_npcs = set(npcs) | set(self._npcs)
+            self._token_assets = {}
+        else:
+            changed_npcs = {npc_id for npc_id in set(npcs) | set(self._npcs)
+                            if npcs.get(npc_id) != self._npcs.get(npc_id)}
+        self._index_tokens(plots, npcs, changed_plots, changed_npcs)
+
+        # 2. Промени по веригата - прехвърлени token-и след последната сверка
+        if not full and self.blockchain and self._block is not None and head > self._block:
+            for asset, asset_id in self._transferred_assets(self._block + 1, head):
+                (changed_plots if asset == 'plot' else changed_npcs).add(asset_id)
+
+        checked = {'owners': 0, 'plot_tokens': 0, 'npc_tokens': 0}
+        found: Dict[DivergenceKey, Dict] = {}
+        cleared: Set[DivergenceKey] = set()
+
+        # 3. Собственици в LandRegistry
+        if self.indexer is not None:
+            checked['owners'] = self._check_registry(plots, changed_plots, full, found, cleared)
+
+        # 4. Token ID-тата - държи ли ги собственикът във вселената
+        if self.blockchain is not None:
+            plot_tokens = plots.tokens(changed_plots)
+            npc_tokens = {npc_id: npcs[npc_id] for npc_id in changed_npcs if npc_id in npcs}
+            self._check_tokens(plots, plot_tokens, npc_tokens, found, cleared)
+            checked['plot_tokens'] = len(plot_tokens)
+            checked['npc_tokens'] = len(npc_tokens)
+
+        # Активи, които вече нямат token, нямат и разлика по него
+        for plot_id in (changed_plots if changed_plots is not None else ()):
+            cleared.add(('plot', plot_id, 'token_id'))
+        for npc_id in changed_npcs:
+            cleared.add(('npc', npc_id, 'token_id'))
+        if full:
+            cleared.update(self.divergences)
+
+        report = self._update(found, cleared)
+        report.update(block=head, full=full, checked=checked,
+                      elapsed=round(time.perf_counter() - started, 3))
+
+        self._plots = plots
+        self._npcs = npcs
+        self._block = head
+        return report
+
+    # --- източници ---
+
+    def _index_tokens(self, plots: _PlotState, npcs: Dict[int, int],
+                      changed_plots: Optional[Set[int]], changed_npcs: Set[int]):
+        """Обновява token ID -> активи за променените активи"""
+        def relink(asset: str, asset_id: int, old: Optional[int], new: Optional[int]):
+            if old is not None:
+                self._token_assets.get(old, set()).discard((asset, asset_id))
+            if new is not None:
+                self._token_assets.setdefault(new, set()).add((asset, asset_id))
+
+        previous = self._plots
+        if changed_plots is None:
+            for plot_id, token_id in plots.tokens().items():
+                relink('plot', plot_id, None, token_id)
+        else:
+            old_tokens = previous.tokens(changed_plots)
+            new_tokens = plots.tokens(changed_plots)
+            for plot_id in changed_plots:
+                relink('plot', plot_id, old_tokens.get(plot_id), new_tokens.get(plot_id))
+        for npc_id in changed_npcs:
+            relink('npc', npc_id, None if changed_plots is None else self._npcs.get(npc_id),
+                   npcs.get(npc_id))
+
+    def _transferred_assets(self, from_block: int, to_block: int) -> Set[Tuple[str, int]]:
+        """Активите, чиито token-и са прехвърлени в блоковете [from_block, to_block]"""
+        blockchain = self.blockchain
+        topics = [Web3.to_hex(_EventLayout(entry).topic) for entry in blockchain.contract.abi
+                  if entry.get('type') == 'event' and entry['name'] in TRANSFER_EVENTS]
+
+        assets = set()
+        for start in range(from_block, to_block + 1, self.LOG_CHUNK_SIZE):
+            logs = blockchain.w3.eth.get_logs({
+                'fromBlock': start,
+                'toBlock': min(start + self.LOG_CHUNK_SIZE - 1, to_block),
+                'address': blockchain.contract.address,
+                'topics': [topics]
+            })
+            for log in logs:
+                event = blockchain.events.decode_log(log)
+                if event is None or event['event'] not in TRANSFER_EVENTS:
+                    continue
+                token_ids = event['args'][TRANSFER_EVENTS[event['event']]]
+                for token_id in token_ids if isinstance(token_ids, (list, tuple)) else [token_ids]:
+                    assets.update(self._token_assets.get(token_id, ()))
+        return assets
+
+    # --- проверки ---
+
+    def _check_registry(self, plots: _PlotState, changed_plots: Optional[Set[int]], full: bool,
+                        found: Dict, cleared: Set) -> int:
+        """Сравнява собствениците с индексираните от LandRegistry; връща броя проверени"""
+        indexer = self.indexer
+        indexer.sync()
+
+        # Reorg в индексатора преизчислява парцели без да мести updated_block напред
+        if full or self._indexed_block is None or indexer.rollbacks != self._indexer_rollbacks:
+            owners = indexer.get_plot_owners()
+            check = set(owners)
+            cleared.update(key for key in self.divergences if key[2] == 'owner')
+        else:
+            owners = indexer.get_plot_owners(updated_after=self._indexed_block)
+            owners.update(indexer.get_plot_owners(plot_ids=sorted(changed_plots)))
+            check = set(owners) | changed_plots
+
+        for plot_id in check:
+            key = ('plot', plot_id, 'owner')
+            chain_owner = owners.get(plot_id)
+            universe_owner = plots.owner_of(plot_id) if 1 <= plot_id <= len(plots) else None
+            if chain_owner is None or _same_address(universe_owner, chain_owner):
+                cleared.add(key)
+            else:
+                found[key] = {'asset': 'plot', 'id': plot_id, 'field': 'owner',
+                              'universe': universe_owner, 'chain': chain_owner}
+
+        self._indexed_block = indexer.last_block
+        self._indexer_rollbacks = indexer.rollbacks
+        return len(check)
+
+    def _check_tokens(self, plots: _PlotState, plot_tokens: Dict[int, int], npc_tokens: Dict[int, int],
+                      found: Dict, cleared: Set):
+        """Проверява с balanceOfBatch, че собственикът държи token-а"""
+        minted = self.blockchain.minted_assets
+        holders = {}
+        for plot_id, token_id in plot_tokens.items():
+            holders[('plot', plot_id)] = (plots.owner_of(plot_id), token_id)
+        for npc_id, token_id in npc_tokens.items():
+            # NPC няма собственик във вселената - държателят е от минтването
+            holders[('npc', npc_id)] = (minted.get(f'npc_{npc_id}', {}).get('owner'), token_id)
+
+        if not holders:
+            return
+        balances = self.blockchain.get_balances(
+            [holder for holder in holders.values() if holder[0] is not None]
+        )
+        for (asset, asset_id), (owner, token_id) in holders.items():
+            key = (asset, asset_id, 'token_id')
+            if owner is not None and balances.get((owner, token_id), 0) > 0:
+                cleared.add(key)
+            elif owner is None and asset == 'npc':
+                # Непознат държател - не може да се провери
+                cleared.add(key)
+            else:
+                found[key] = {'asset': asset, 'id': asset_id, 'field': 'token_id',
+                              'universe': owner, 'chain': None, 'token_id': token_id}
+
+    def _update(self, found: Dict, cleared: Set) -> Dict:
+        new = [divergence for key, divergence in found.items() if self.divergences.get(key) != divergence]
+        resolved = [key for key in cleared if key in self.divergences and key not in found]
+        for key in resolved:
+            del self.divergences[key]
+        self.divergences.update(found)
+        return {'new': new, 'resolved': resolved, 'open': len(self.divergences)}
+
+    def report(self) -> List[Dict]:
+        """Всички открити и неотстранени разлики"""
+        return sorted(self.divergences.values(), key=lambda d: (d['asset'], d['id'], d['field']))
@@ -0,0 +1,302 @@
+"""
+SARAKT UNIVERSE SNAPSHOT - Python
+Запазване и зареждане на състоянието на вселената в компактен бинарен формат
+
+Формат на файла:
+    MAGIC (8 байта) | версия (uint32) | дължина на header (uint64) | header (msgpack)
+    | колони (NumPy масиви, всяка подравнена на 64 байта)
+
+Header-ът описва вселената, планетите, градовете и NPC популацията, както и
+offset/dtype/shape на всяка колона. Колоните се записват поточно една по една.
+
+Snapshot може да се отвори и memory-mapped (load_snapshot(path, mmap=True)):
+колоните са read-only изгледи към файла без копиране, така че много процеси
+споделят едно и също копие в page cache-а.
+"""
+
+import mmap as _mmap
+import struct
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import msgpack
+import numpy as np
+
+from sarakt_universe_engine import (
+    SaraktUniverse, Planet, PlanetType, City, NPCPopulation, PlotTable, ProceduralGenerator
+)
+
+
+SNAPSHOT_MAGIC = b'SRKTSNAP'
+# v2 добавя колоната npcs.id_order; v1 snapshot-ите се четат и без нея
+SNAPSHOT_VERSION = 2
+_READABLE_VERSIONS = (1, 2)
+_PREFIX = struct.Struct('<8sIQ')
+_ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+# ============================================
+# СЕРИАЛИЗАЦИЯ НА СЪСТОЯНИЕТО
+# ============================================
+
+def _generator_state(gen: ProceduralGenerator) -> Tuple[List[int], Optional[float]]:
+    version, state, gauss_next = gen.rng.getstate()
+    return list(state), gauss_next
+
+
+def _restore_generator(seed: int, state: List[int], gauss_next: Optional[float]) -> ProceduralGenerator:
+    gen = ProceduralGenerator(seed)
+    gen.rng.setstate((3, tuple(state), gauss_next))
+    return gen
+
+
+def _encode_extras(extras: Dict) -> Dict:
+    encoded = dict(extras)
+    # Token ID-тата от веригата са uint256 - msgpack поддържа до 64 бита
+    if encoded.get('token_id') is not None:
+        encoded['token_id'] = str(encoded['token_id'])
+    return encoded
+
+
+def _decode_extras(encoded: Dict) -> Dict:
+    extras = dict(encoded)
+    if extras.get('token_id') is not None:
+        extras['token_id'] = int(extras['token_id'])
+    return extras
+
+
+class _ColumnWriter:
+    """Събира колоните и им присвоява подравнени offset-и преди запис"""
+
+    def __init__(self):
+        self.columns: List[Tuple[Dict, np.ndarray]] = []
+        self.size = 0
+
+    def add(self, name: str, array: np.ndarray) -> str:
+        array = np.ascontiguousarray(array)
+        offset = _align(self.size)
+        self.columns.append(({
+            'name': name,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+            'nbytes': array.nbytes
+        }, array))
+        self.size = offset + array.nbytes
+        return name
+
+
+def _describe_universe(universe: SaraktUniverse, writer: _ColumnWriter) -> Dict:
+    """Header без колоните; масивите се регистрират в writer"""
+    planets = []
+    for planet in universe.planets:
+        entry = {
+            'id': planet.id,
+            'name': planet.name,
+            'seed': planet.seed,
+            'type': planet.type.value,
+            'is_habitable': planet.is_habitable,
+            'generator_version': planet.generator_version
+        }
+        # Останалите секции се извеждат от seed-а; ресурсите се променят при извличане
+        if planet.is_generated('resources'):
+            entry['resources'] = planet.resources
+        planets.append(entry)
+
+    cities = []
+    for index, city in enumerate(universe.cities):
+        table = city.plot_table()
+        prefix = f'city.{index}.'
+        cities.append({
+            'id': city.id,
+            'name': city.name,
+            'planet_id': city.planet_id,
+            'compact': city.compact,
+            'population': city.population,
+            'infrastructure': city.infrastructure,
+            'economy': city.economy,
+            'zone_names': table.zone_names,
+            'owner_names': table.owner_names,
+            'big_token_ids': {row: str(token_id) for row, token_id in table._big_token_ids.items()},
+            'registry_ids': table._registry_ids,
+            'columns': {name: writer.add(prefix + name, column)
+                        for name, column in table.columns().items()}
+        })
+
+    npcs = universe.npcs
+    if not isinstance(npcs, NPCPopulation):
+        npcs = NPCPopulation.from_npcs(npcs, universe.generator_version)
+
+    pinned_rows = sorted(npcs._generators)
+    states = [_generator_state(npcs._generators[row]) for row in pinned_rows]
+    population = {
+        'generator_version': npcs.generator_version,
+        'columns': {name: writer.add('npcs.' + name, column)
+                    for name, column in npcs.columns().items()},
+        # Стабилен argsort на ID-тата - търсене по ID без индекс в паметта
+        'id_order': writer.add('npcs.id_order', np.argsort(npcs.ids, kind='stable')),
+        'extras': {row: _encode_extras(extras) for row, extras in npcs._extra.items()},
+        'generators': {
+            'rows': writer.add('npcs.generator_rows', np.array(pinned_rows, dtype=np.int64)),
+            'states': writer.add('npcs.generator_states',
+                                 np.array([state for state, _ in states], dtype=np.uint32)
+                                 .reshape(len(states), 625)),
+            'gauss_next': [gauss for _, gauss in states]
+        }
+    }
+
+    return {
+        'universe': {
+            'current_cycle': universe.current_cycle,
+            'generator_version': universe.generator_version,
+            'vectorized_npcs': isinstance(universe.npcs, NPCPopulation),
+            'compact_plots': universe.compact_plots,
+            'factions': universe.factions
+        },
+        'planets': planets,
+        'cities': cities,
+        'npcs': population
+    }
+
+
+# ============================================
+# ЗАПИС И ЧЕТЕНЕ
+# ============================================
+
+def save_snapshot(universe: SaraktUniverse, path: str) -> int:
+    """Записва snapshot на вселената поточно; връща размера на файла в байтове"""
+    writer = _ColumnWriter()
+    header = _describe_universe(universe, writer)
+    header['columns'] = [meta for meta, _ in writer.columns]
+    packed = msgpack.packb(header, use_bin_type=True)
+    data_start = _align(_PREFIX.size + len(packed))
+
+    with open(path, 'wb') as f:
+        f.write(_PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(packed)))
+        f.write(packed)
+        for meta, array in writer.columns:
+            f.write(b'\0' * (data_start + meta['offset'] - f.tell()))
+            if array.nbytes:
+                f.write(memoryview(array.reshape(-1)).cast('B'))
+        return f.tell()
+
+
+def read_header(f: BinaryIO) -> Tuple[Dict, int]:
+    """Чете header-а; връща го заедно с offset-а на първата колона"""
+    magic, version, header_size = _PREFIX.unpack(f.read(_PREFIX.size))
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError('Not a Sarakt snapshot')
+    if version not in _READABLE_VERSIONS:
+        raise ValueError(f'Unsupported snapshot version {version}')
+    header = msgpack.unpackb(f.read(header_size), raw=False, strict_map_key=False)
+    return header, _align(_PREFIX.size + header_size)
+
+
+def _read_columns(f: BinaryIO, header: Dict, data_start: int) -> Dict[str, np.ndarray]:
+    columns = {}
+    for meta in header['columns']:
+        dtype = np.dtype(meta['dtype'])
+        f.seek(data_start + meta['offset'])
+        array = np.fromfile(f, dtype=dtype, count=meta['nbytes'] // dtype.itemsize)
+        columns[meta['name']] = array.reshape(meta['shape'])
+    return columns
+
+
+def _map_columns(f: BinaryIO, header: Dict, data_start: int) -> Dict[str, np.ndarray]:
+    """Read-only изгледи към колоните в mmap-нат файл (без копиране)"""
+    buffer = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+    columns = {}
+    for meta in header['columns']:
+        dtype = np.dtype(meta['dtype'])
+        # Масивите държат референция към mmap-а - той живее колкото тях
+        array = np.frombuffer(buffer, dtype=dtype, count=meta['nbytes'] // dtype.itemsize,
+                              offset=data_start + meta['offset'])
+        columns[meta['name']] = array.reshape(meta['shape'])
+    return columns
+
+
+def restore_universe(header: Dict, columns: Dict[str, np.ndarray],
+                     columnar: bool = False) -> SaraktUniverse:
+    """
+    Сглобява SaraktUniverse от header и колони (прочетени или mmap-нати).
+    columnar=True запазва NPCs и парцелите в колоните, независимо от режима
+    при запис - нужно за mmap, където обектите биха копирали данните.
+    """
+    meta = header['universe']
+    vectorized_npcs = meta['vectorized_npcs'] or columnar
+    universe = SaraktUniverse(
+        vectorized_npcs=vectorized_npcs,
+        compact_plots=meta['compact_plots'] or columnar,
+        generator_version=meta['generator_version'],
+        initialize=False
+    )
+    universe.current_cycle = meta['current_cycle']
+    universe.factions = meta['factions']
+
+    for entry in header['planets']:
+        planet = Planet(entry['id'], entry['name'], entry['seed'], PlanetType(entry['type']),
+                        entry['is_habitable'], entry['generator_version'])
+        if 'resources' in entry:
+            planet.resources = entry['resources']
+        universe.add_planet(planet)
+
+    for entry in header['cities']:
+        table = PlotTable.from_columns(
+            {name: columns[column] for name, column in entry['columns'].items()},
+            entry['zone_names'],
+            entry['owner_names'],
+            {row: int(token_id) for row, token_id in entry['big_token_ids'].items()},
+            # По-старите snapshot-и нямат registry_ids
+            entry.get('registry_ids', {})
+        )
+        city = City(entry['id'], entry['name'], entry['planet_id'], len(table),
+                    compact=entry['compact'] or columnar, plot_table=table)
+        city.infrastructure = entry['infrastructure']
+        city.economy = entry['economy']
+        city.population = entry['population']
+        universe.add_city(city)
+
+    npcs = header['npcs']
+    generator_rows = columns[npcs['generators']['rows']]
+    generator_states = columns[npcs['generators']['states']]
+    seeds = columns[npcs['columns']['seeds']]
+    generators = {
+        int(row): _restore_generator(int(seeds[row]), state.tolist(), gauss_next)
+        for row, state, gauss_next in zip(generator_rows, generator_states,
+                                           npcs['generators']['gauss_next'])
+    }
+    population = NPCPopulation.from_columns(
+        {name: columns[column] for name, column in npcs['columns'].items()},
+        npcs['generator_version'],
+        generators,
+        {int(row): _decode_extras(extras) for row, extras in npcs['extras'].items()},
+        # v1 snapshot-ите нямат id_order - индексират се при първо търсене
+        columns[npcs['id_order']] if 'id_order' in npcs else None
+    )
+
+    if vectorized_npcs:
+        universe.npcs = population
+    else:
+        for row in range(len(population)):
+            universe.add_npc(population.to_npc(row))
+
+    return universe
+
+
+def load_snapshot(path: str, mmap: bool = False) -> SaraktUniverse:
+    """
+    Зарежда вселена от snapshot файл.
+
+    При mmap=True колоните на NPCs и парцелите остават във файла (read-only,
+    zero-copy); четенията (get_npc, get_plot, get_city_stats) работят директно
+    върху тях, а опит за промяна на колона хвърля ValueError.
+    """
+    with open(path, 'rb') as f:
+        header, data_start = read_header(f)
+        if mmap:
+            return restore_universe(header, _map_columns(f, header, data_start), columnar=True)
+        columns = _read_columns(f, header, data_start)
+    return restore_universe(header, columns)
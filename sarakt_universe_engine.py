@@ -6,10 +6,17 @@ SARAKT STAR SYSTEM - UNIVERSE ENGINE (Python)
 import random
 import hashlib
 import json
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from datetime import datetime
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # numpy е нужен само за векторизираната NPC популация
+    np = None
 
 
 # ============================================
@@ -61,10 +68,31 @@ class Rarity(Enum):
     LEGENDARY = 4
 
 
+NPC_SKILLS = (
+    'woodcutting', 'hunting', 'farming', 'water_gathering',
+    'mining', 'crafting', 'combat', 'trading', 'construction',
+    'engineering', 'biotech', 'leadership', 'stealth'
+)
+
+NPC_ATTRIBUTES = ('strength', 'intelligence', 'charisma', 'endurance', 'agility')
+
+PERSONALITY_TRAITS = (
+    'openness', 'conscientiousness', 'extraversion', 'agreeableness', 'neuroticism',
+    'rebelliousness', 'adaptability', 'loyalty_tendency'
+)
+
+
 # ============================================
 # ПРОЦЕДУРЕН ГЕНЕРАТОР
 # ============================================
 
+# Версии на генерацията:
+#   V1 - един последователен поток за обект (съвместимост със съществуващи светове)
+#   V2 - независими ключови под-потоци за всяка секция, регион, POI и NPC етап
+GENERATOR_V1 = 1
+GENERATOR_V2 = 2
+
+
 class ProceduralGenerator:
     """Генератор на случайни числа със seed за детерминистична генерация"""
     
@@ -84,6 +112,22 @@ class ProceduralGenerator:
         """Избира случаен елемент от списък"""
         return self.rng.choice(items)
     
+    @staticmethod
+    def derive_seed(seed: int, *key) -> int:
+        """Детерминистичен seed за под-поток (seed, *key) - не зависи от реда на теглене"""
+        digest = hashlib.blake2b(repr((seed,) + key).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+    
+    def copy(self) -> 'ProceduralGenerator':
+        """Независимо копие с текущото състояние на потока"""
+        gen = ProceduralGenerator(self.seed)
+        gen.rng.setstate(self.rng.getstate())
+        return gen
+    
+    def substream(self, *key) -> 'ProceduralGenerator':
+        """Независим под-поток, напр. substream('regions', 3)"""
+        return ProceduralGenerator(self.derive_seed(self.seed, *key))
+    
     def weighted_choice(self, options: List[Tuple[any, float]]):
         """Избира елемент въз основа на тежести"""
         total = sum(weight for _, weight in options)
@@ -124,27 +168,79 @@ class RegionData:
     points_of_interest: List[Dict]
 
 
+def _planet_section(name: str):
+    """Property за секция на планета, генерирана при първи достъп"""
+    def getter(self):
+        return self._section(name)
+
+    def setter(self, value):
+        self._section(name)  # потокът трябва да е минал през секцията
+        self._sections[name] = value
+
+    return property(getter, setter)
+
+
 class Planet:
     """Клас за планета в системата Sarakt"""
     
     def __init__(self, planet_id: int, name: str, seed: int, 
-                 planet_type: PlanetType, is_habitable: bool):
+                 planet_type: PlanetType, is_habitable: bool,
+                 generator_version: int = GENERATOR_V1):
         self.id = planet_id
         self.name = name
         self.seed = seed
         self.type = planet_type
         self.is_habitable = is_habitable
-        self.generator = ProceduralGenerator(seed)
+        self.generator_version = generator_version
         
-        self.properties = self._generate_properties()
-        self.biomes = self._generate_biomes()
-        self.resources = self._generate_resources()
-        self.regions = self._generate_regions()
-        self.danger_zones = self._generate_danger_zones()
+        # Секциите се генерират при първи достъп. При V1 RNG потокът е последователен,
+        # затова секция се генерира след всички предходни в каноничния ред.
+        self._generator: Optional[ProceduralGenerator] = None
+        self._sections: Dict[str, object] = {}
+    
+    _SECTIONS = ('properties', 'biomes', 'resources', 'regions', 'danger_zones')
+    
+    @property
+    def generator(self) -> ProceduralGenerator:
+        if self._generator is None:
+            self._generator = ProceduralGenerator(self.seed)
+        return self._generator
+    
+    def _stream(self, *key) -> ProceduralGenerator:
+        """RNG поток за част от планетата (при V1 - общият последователен поток)"""
+        if self.generator_version == GENERATOR_V1:
+            return self.generator
+        return self.generator.substream(*key)
+    
+    def _section(self, name: str):
+        """Връща секция, генерирайки я (и предходните при V1) при нужда"""
+        if name not in self._sections:
+            if self.generator_version != GENERATOR_V1:
+                self._sections[name] = getattr(self, f'_generate_{name}')()
+                return self._sections[name]
+            for section in self._SECTIONS[:self._SECTIONS.index(name) + 1]:
+                if section not in self._sections:
+                    self._sections[section] = getattr(self, f'_generate_{section}')()
+        return self._sections[name]
+    
+    properties = _planet_section('properties')
+    biomes = _planet_section('biomes')
+    resources = _planet_section('resources')
+    regions = _planet_section('regions')
+    danger_zones = _planet_section('danger_zones')
+    
+    def is_generated(self, section: str) -> bool:
+        """Дали секцията вече е генерирана"""
+        return section in self._sections
+    
+    def materialize(self) -> 'Planet':
+        """Генерира всички секции наведнъж"""
+        self._section(self._SECTIONS[-1])
+        return self
     
     def _generate_properties(self) -> Dict:
         """Генерира физични свойства на планетата"""
-        gen = self.generator
+        gen = self._stream('properties')
         
         return {
             'radius': gen.randint(3000, 12000),  # km
@@ -168,7 +264,7 @@ class Planet:
     
     def _generate_biomes(self) -> List[BiomeData]:
         """Генерира биоми на планетата"""
-        gen = self.generator
+        gen = self._stream('biomes')
         biome_count = gen.randint(3, 8)
         biomes = []
         
@@ -193,7 +289,7 @@ class Planet:
     
     def _generate_resources(self) -> Dict[str, int]:
         """Генерира ресурси на планетата"""
-        gen = self.generator
+        gen = self._stream('resources')
         resources = {}
         
         resource_types = {
@@ -237,53 +333,71 @@ class Planet:
     
     def _generate_regions(self) -> List[RegionData]:
         """Генерира региони на планетата"""
-        gen = self.generator
+        gen = self._stream('regions')
         region_count = 5 + int(gen.random() * 10)
-        regions = []
         
-        for i in range(region_count):
-            biome = gen.choice(self.biomes)
-            
-            regions.append(RegionData(
-                id=i,
-                name=self._generate_region_name(i),
-                biome_type=biome.type,
-                coordinates={'lat': gen.random(-90, 90), 'lon': gen.random(-180, 180)},
-                size=gen.randint(100, 10000),
-                population=gen.randint(0, 50000) if self.is_habitable else 0,
-                development=gen.random(0, 1) if self.is_habitable else 0,
-                points_of_interest=self._generate_pois(gen.randint(1, 5))
-            ))
-        
-        return regions
+        if self.generator_version != GENERATOR_V1:
+            return [self.generate_region(i) for i in range(region_count)]
+        return [self._build_region(i, gen) for i in range(region_count)]
     
-    def _generate_region_name(self, region_id: int) -> str:
+    def _build_region(self, region_id: int, gen: ProceduralGenerator) -> RegionData:
+        """Генерира един регион от даден поток"""
+        biome = gen.choice(self.biomes)
+        
+        return RegionData(
+            id=region_id,
+            name=self._generate_region_name(region_id, gen),
+            biome_type=biome.type,
+            coordinates={'lat': gen.random(-90, 90), 'lon': gen.random(-180, 180)},
+            size=gen.randint(100, 10000),
+            population=gen.randint(0, 50000) if self.is_habitable else 0,
+            development=gen.random(0, 1) if self.is_habitable else 0,
+            points_of_interest=self._generate_pois(gen.randint(1, 5), gen, region_id)
+        )
+    
+    def generate_region(self, region_id: int) -> RegionData:
+        """Генерира регион независимо от останалите (само при V2)"""
+        self._require_keyed_streams()
+        return self._build_region(region_id, self._stream('regions', region_id))
+    
+    def generate_poi(self, region_id: int, poi_index: int) -> Dict:
+        """Генерира точка от интерес независимо от останалите (само при V2)"""
+        self._require_keyed_streams()
+        return self._build_poi(poi_index, self._stream('regions', region_id, 'poi', poi_index))
+    
+    def _require_keyed_streams(self):
+        if self.generator_version == GENERATOR_V1:
+            raise ValueError('Independent generation requires generator_version=GENERATOR_V2')
+    
+    def _generate_region_name(self, region_id: int, gen: ProceduralGenerator) -> str:
         """Генерира име на регион"""
         prefixes = ['North', 'South', 'East', 'West', 'Central', 'Upper', 'Lower', 'New']
         suffixes = ['Highlands', 'Valley', 'Plains', 'Reach', 'Territory', 'Expanse', 'Zone']
         
-        if self.generator.random() > 0.5:
-            return f"{self.generator.choice(prefixes)} {self.generator.choice(suffixes)}"
+        if gen.random() > 0.5:
+            return f"{gen.choice(prefixes)} {gen.choice(suffixes)}"
         return f"Region {region_id + 1}"
     
-    def _generate_pois(self, count: int) -> List[Dict]:
-        """Генерира точки от интерес"""
-        pois = []
+    def _generate_pois(self, count: int, gen: ProceduralGenerator, region_id: int) -> List[Dict]:
+        """Генерира точки от интерес (при V2 всяка от собствен под-поток)"""
+        if self.generator_version != GENERATOR_V1:
+            return [self.generate_poi(region_id, i) for i in range(count)]
+        return [self._build_poi(i, gen) for i in range(count)]
+    
+    def _build_poi(self, index: int, gen: ProceduralGenerator) -> Dict:
+        """Генерира една точка от интерес"""
         types = ['cave', 'ruins', 'crash_site', 'resource_deposit', 'anomaly', 'outpost']
         
-        for i in range(count):
-            pois.append({
-                'type': self.generator.choice(types),
-                'name': f"POI-{self.id}-{i}",
-                'discovered': False,
-                'danger_level': self.generator.randint(1, 10)
-            })
-        
-        return pois
+        return {
+            'type': gen.choice(types),
+            'name': f"POI-{self.id}-{index}",
+            'discovered': False,
+            'danger_level': gen.randint(1, 10)
+        }
     
     def _generate_danger_zones(self) -> List[Dict]:
         """Генерира опасни зони"""
-        gen = self.generator
+        gen = self._stream('danger_zones')
         zone_count = gen.randint(2, 8)
         zones = []
         
@@ -328,15 +442,17 @@ class Planet:
 class NPC:
     """NPC с Dynasty Dulo наследство и развиваща се личност"""
     
-    def __init__(self, npc_id: int, planet_id: int, seed: int):
+    def __init__(self, npc_id: int, planet_id: int, seed: int,
+                 generator_version: int = GENERATOR_V1):
         self.id = npc_id
         self.planet_id = planet_id
         self.seed = seed
+        self.generator_version = generator_version
         self.generator = ProceduralGenerator(seed)
         
         # Dynasty Dulo наследство
         self.heritage = 'Dynasty_Dulo'
-        self.generation = self.generator.randint(1, 10)
+        self.generation = self._stream('generation').randint(1, 10)
         
         # Стартиране като дете без личност
         self.age = 0
@@ -352,9 +468,15 @@ class NPC:
         self.token_id = None
         self._previous_loyalty = {}
     
+    def _stream(self, *key) -> ProceduralGenerator:
+        """RNG поток за етап от живота на NPC (при V1 - общият последователен поток)"""
+        if self.generator_version == GENERATOR_V1:
+            return self.generator
+        return ProceduralGenerator(ProceduralGenerator.derive_seed(self.seed, *key))
+    
     def _generate_attributes(self) -> Dict[str, int]:
         """Генерира физически атрибути"""
-        gen = self.generator
+        gen = self._stream('attributes')
         return {
             'strength': gen.randint(1, 10),
             'intelligence': gen.randint(1, 10),
@@ -382,7 +504,7 @@ class NPC:
     
     def _develop_personality(self):
         """Развива личност (Big Five + Sarakt специфични черти)"""
-        gen = self.generator
+        gen = self._stream('personality')
         
         self.personality = {
             'openness': gen.random(0, 1),
@@ -399,20 +521,15 @@ class NPC:
     
     def _refine_personality(self):
         """Изчиства личността с възрастта"""
+        gen = self._stream('refine')
         for trait in self.personality:
-            variance = self.generator.random(-0.1, 0.1)
+            variance = gen.random(-0.1, 0.1)
             self.personality[trait] = max(0, min(1, self.personality[trait] + variance))
     
     def _develop_skills(self):
         """Развива умения"""
-        available_skills = [
-            'woodcutting', 'hunting', 'farming', 'water_gathering',
-            'mining', 'crafting', 'combat', 'trading', 'construction',
-            'engineering', 'biotech', 'leadership', 'stealth'
-        ]
-        
         if self.age >= 5:
-            for skill in available_skills:
+            for skill in NPC_SKILLS:
                 if skill not in self.skills:
                     self.skills[skill] = 0
                 
@@ -488,8 +605,9 @@ class NPC:
                       'Ivan', 'Katerina', 'Leonid', 'Marina', 'Nikolai', 'Olga']
         last_names = ['Dulov', 'Petrov', 'Ivanov', 'Volkov', 'Sokolov', 'Kozlov']
         
-        first = self.generator.choice(first_names)
-        last = self.generator.choice(last_names)
+        gen = self._stream('name')
+        first = gen.choice(first_names)
+        last = gen.choice(last_names)
         
         return f"{first} {last}"
     
@@ -516,6 +634,557 @@ class NPC:
         return [(skill, f"{level:.1f}") for skill, level in top]
 
 
+# ============================================
+# NPC ПОПУЛАЦИЯ (STRUCT-OF-ARRAYS)
+# ============================================
+
+_NPC_STATES = list(NPCState)
+_STATE_CODES = {state: code for code, state in enumerate(_NPC_STATES)}
+
+# RNG етапи на NPC: 0 = атрибути, 1 = личност развита, 2 = личност изчистена
+_RNG_STAGE_ATTRIBUTES = 0
+_RNG_STAGE_PERSONALITY = 1
+_RNG_STAGE_REFINED = 2
+
+
+class _RowMapping(MutableMapping):
+    """Dict-подобен изглед към един ред от колона (записите отиват в масива)"""
+
+    def __init__(self, column, row: int, keys: Tuple[str, ...], cast, present=None, on_write=None):
+        self._column = column
+        self._row = row
+        self._keys = keys
+        self._index = {key: i for i, key in enumerate(keys)}
+        self._cast = cast
+        self._present = present
+        self._on_write = on_write
+
+    def _visible(self) -> bool:
+        return self._present is None or self._present()
+
+    def __getitem__(self, key):
+        if key not in self._index or not self._visible():
+            raise KeyError(key)
+        return self._cast(self._column[self._row, self._index[key]])
+
+    def __setitem__(self, key, value):
+        if key not in self._index:
+            raise KeyError(key)
+        self._column[self._row, self._index[key]] = value
+        if self._on_write:
+            self._on_write()
+
+    def __delitem__(self, key):
+        raise TypeError('NPC columns do not support deletion')
+
+    def __iter__(self):
+        return iter(self._keys if self._visible() else ())
+
+    def __len__(self) -> int:
+        return len(self._keys) if self._visible() else 0
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class NPCView(NPC):
+    """Тънък изглед към ред от NPCPopulation - поведението идва от NPC"""
+
+    def __init__(self, population: 'NPCPopulation', row: int):
+        self._population = population
+        self._row = row
+        self.heritage = 'Dynasty_Dulo'
+
+    @property
+    def id(self) -> int:
+        return int(self._population.ids[self._row])
+
+    @property
+    def planet_id(self) -> int:
+        return int(self._population.planet_ids[self._row])
+
+    @property
+    def seed(self) -> int:
+        return int(self._population.seeds[self._row])
+
+    @property
+    def generation(self) -> int:
+        return int(self._population.generation[self._row])
+
+    @property
+    def generator_version(self) -> int:
+        return self._population.generator_version
+
+    @property
+    def generator(self) -> ProceduralGenerator:
+        return self._population._generator(self._row, pin=True)
+
+    @property
+    def age(self) -> int:
+        return int(self._population.age[self._row])
+
+    @age.setter
+    def age(self, value: int):
+        self._population.age[self._row] = value
+
+    @property
+    def state(self) -> NPCState:
+        return _NPC_STATES[self._population.state[self._row]]
+
+    @state.setter
+    def state(self, value: NPCState):
+        self._population.state[self._row] = _STATE_CODES[value]
+
+    @property
+    def attributes(self) -> Dict[str, int]:
+        return _RowMapping(self._population.attributes, self._row, NPC_ATTRIBUTES, int)
+
+    @property
+    def personality(self) -> Optional[Dict[str, float]]:
+        if np.isnan(self._population.personality[self._row, 0]):
+            return None
+        return _RowMapping(self._population.personality, self._row, PERSONALITY_TRAITS, float)
+
+    @personality.setter
+    def personality(self, value: Optional[Dict[str, float]]):
+        column = self._population.personality
+        if value is None:
+            column[self._row] = np.nan
+        else:
+            column[self._row] = [value[trait] for trait in PERSONALITY_TRAITS]
+
+    @property
+    def skills(self) -> Dict[str, float]:
+        population, row = self._population, self._row
+
+        def mark_present():
+            population.has_skills[row] = True
+
+        return _RowMapping(population.skills, row, NPC_SKILLS, float,
+                           present=lambda: bool(population.has_skills[row]),
+                           on_write=mark_present)
+
+    @property
+    def loyalty(self) -> Dict[str, float]:
+        return self._population._extras(self._row)['loyalty']
+
+    @property
+    def relationships(self) -> Dict:
+        return self._population._extras(self._row)['relationships']
+
+    @property
+    def memories(self) -> List[Dict]:
+        return self._population._extras(self._row)['memories']
+
+    @property
+    def _previous_loyalty(self) -> Dict[str, float]:
+        return self._population._extras(self._row)['previous_loyalty']
+
+    @property
+    def token_id(self) -> Optional[int]:
+        return self._population._extra.get(self._row, {}).get('token_id')
+
+    @token_id.setter
+    def token_id(self, value: Optional[int]):
+        self._population._extras(self._row)['token_id'] = value
+
+    def get_status(self) -> Dict:
+        """Връща статус на NPC (с истински dict-ове вместо изгледи)"""
+        status = super().get_status()
+        status['attributes'] = dict(status['attributes'])
+        if status['personality'] is not None:
+            status['personality'] = dict(status['personality'])
+        return status
+
+
+class NPCPopulation:
+    """
+    Struct-of-arrays хранилище за NPCs - един векторизиран age_cycle
+    за цялата популация, с резултати идентични на NPC.age_cycle()
+    """
+
+    def __init__(self, capacity: int = 0, generator_version: int = GENERATOR_V1):
+        if np is None:
+            raise ImportError('NPCPopulation requires numpy (pip install numpy)')
+
+        self.generator_version = generator_version
+
+        capacity = max(capacity, 16)
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._planet_ids = np.zeros(capacity, dtype=np.int64)
+        self._seeds = np.zeros(capacity, dtype=np.int64)
+        self._generation = np.zeros(capacity, dtype=np.int8)
+        self._age = np.zeros(capacity, dtype=np.int32)
+        self._state = np.zeros(capacity, dtype=np.int8)
+        self._rng_stage = np.zeros(capacity, dtype=np.int8)
+        self._attributes = np.zeros((capacity, len(NPC_ATTRIBUTES)), dtype=np.int8)
+        self._personality = np.full((capacity, len(PERSONALITY_TRAITS)), np.nan)
+        # Уменията се пазят по колони (умение x NPC) за непрекъснат достъп при растеж
+        self._skills = np.zeros((len(NPC_SKILLS), capacity))
+        self._has_skills = np.zeros(capacity, dtype=bool)
+        # Предварително изтеглени стойности от потока: 8 за личност + 8 за изчистване
+        self._draws = np.zeros((capacity, 2 * len(PERSONALITY_TRAITS)))
+        self._pinned = np.zeros(capacity, dtype=bool)
+
+        # Генератори, чийто поток се е отклонил (напр. от get_name) - пазят се
+        self._generators: Dict[int, ProceduralGenerator] = {}
+        # Рядко използвани полета (лоялност, памет, token_id) по ред
+        self._extra: Dict[int, Dict] = {}
+        # Индекс NPC ID -> ред (None - строи се при първа нужда, а дотогава
+        # търсенето е двоично по _id_order, ако има такъв)
+        self._row_index: Optional[Dict[int, int]] = {}
+        self._id_order: Optional['np.ndarray'] = None
+
+    # Колони с по един ред на NPC (уменията са транспонирани и се обработват отделно)
+    _ROW_COLUMNS = ('_ids', '_planet_ids', '_seeds', '_generation', '_age', '_state',
+                    '_rng_stage', '_attributes', '_personality', '_has_skills',
+                    '_draws', '_pinned')
+
+    # --- колони (само активните редове) ---
+
+    ids = property(lambda self: self._ids[:self._size])
+    planet_ids = property(lambda self: self._planet_ids[:self._size])
+    seeds = property(lambda self: self._seeds[:self._size])
+    generation = property(lambda self: self._generation[:self._size])
+    age = property(lambda self: self._age[:self._size])
+    state = property(lambda self: self._state[:self._size])
+    attributes = property(lambda self: self._attributes[:self._size])
+    personality = property(lambda self: self._personality[:self._size])
+    skills = property(lambda self: self._skills[:, :self._size].T)
+    has_skills = property(lambda self: self._has_skills[:self._size])
+
+    @classmethod
+    def spawn(cls, start_id: int, planet_id: int, seeds,
+              generator_version: int = GENERATOR_V1) -> 'NPCPopulation':
+        """Създава популация от seed-ове (id-тата започват от start_id)"""
+        seeds = list(seeds)
+        population = cls(len(seeds), generator_version)
+        for i, seed in enumerate(seeds):
+            population._add_row(start_id + i, planet_id, seed)
+        return population
+
+    @classmethod
+    def concatenate(cls, parts: List['NPCPopulation'],
+                    generator_version: int = GENERATOR_V1) -> 'NPCPopulation':
+        """Слепва популации (напр. кохорти от паралелна генерация) в една"""
+        population = cls(sum(len(part) for part in parts), generator_version)
+        for part in parts:
+            if part.generator_version != generator_version:
+                raise ValueError('Cannot concatenate populations with different generator versions')
+            offset, size = population._size, part._size
+            for name in cls._ROW_COLUMNS:
+                getattr(population, name)[offset:offset + size] = getattr(part, name)[:size]
+            population._skills[:, offset:offset + size] = part._skills[:, :size]
+            for row, gen in part._generators.items():
+                population._generators[offset + row] = gen
+            for row, extras in part._extra.items():
+                population._extra[offset + row] = extras
+            for npc_id, row in part._rows.items():
+                population._rows.setdefault(npc_id, offset + row)
+            population._size += size
+        return population
+
+    @classmethod
+    def from_npcs(cls, npcs: List[NPC], generator_version: int = GENERATOR_V1) -> 'NPCPopulation':
+        """Популация с копия на NPC обекти"""
+        population = cls(len(npcs), generator_version)
+        for npc in npcs:
+            population.append(npc)
+        return population
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, 'np.ndarray'], generator_version: int,
+                     generators: Dict[int, ProceduralGenerator],
+                     extras: Dict[int, Dict],
+                     id_order: Optional['np.ndarray'] = None) -> 'NPCPopulation':
+        """
+        Възстановява популация от колони (напр. от snapshot). Колоните не се
+        копират - могат да бъдат и read-only изгледи към mmap-нат файл.
+        id_order (стабилен argsort на ID-тата) позволява търсене без индекс.
+        """
+        population = cls(0, generator_version)
+        for name in cls._ROW_COLUMNS:
+            setattr(population, name, columns[name.lstrip('_')])
+        population._skills = columns['skills']
+        population._size = len(population._ids)
+        population._generators = dict(generators)
+        population._extra = dict(extras)
+        population._row_index = None
+        population._id_order = id_order
+        return population
+
+    def columns(self) -> Dict[str, 'np.ndarray']:
+        """Активните редове на колоните по име (без водеща долна черта)"""
+        columns = {name.lstrip('_'): getattr(self, name)[:self._size] for name in self._ROW_COLUMNS}
+        columns['skills'] = self._skills[:, :self._size]
+        return columns
+
+    def to_npc(self, row: int) -> NPC:
+        """Отделен NPC обект с текущото състояние на реда"""
+        view = self.view(row)
+        npc = object.__new__(NPC)
+        npc.id = view.id
+        npc.planet_id = view.planet_id
+        npc.seed = view.seed
+        npc.generator_version = self.generator_version
+        npc.generator = self._generator(row).copy()
+        npc.heritage = view.heritage
+        npc.generation = view.generation
+        npc.age = view.age
+        npc.state = view.state
+        personality = view.personality
+        npc.personality = dict(personality) if personality is not None else None
+        npc.skills = dict(view.skills)
+        extras = self._extra.get(row, {})
+        npc.loyalty = dict(extras.get('loyalty', {}))
+        npc.relationships = dict(extras.get('relationships', {}))
+        npc.memories = list(extras.get('memories', []))
+        npc.attributes = dict(view.attributes)
+        npc.token_id = extras.get('token_id')
+        npc._previous_loyalty = dict(extras.get('previous_loyalty', {}))
+        return npc
+
+    def _grow(self, capacity: int):
+        """Увеличава капацитета на всички колони"""
+        for name in self._ROW_COLUMNS:
+            old = getattr(self, name)
+            fill = np.nan if name == '_personality' else 0
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+        skills = np.zeros((len(NPC_SKILLS), capacity))
+        skills[:, :self._size] = self._skills[:, :self._size]
+        self._skills = skills
+
+    def _add_row(self, npc_id: int, planet_id: int, seed: int) -> int:
+        """Добавя нов NPC (дете) - същите тегления на RNG като NPC.__init__"""
+        if self._size == len(self._ids):
+            self._grow(max(16, 2 * len(self._ids)))
+
+        row = self._size
+        self._ids[row] = npc_id
+        self._rows.setdefault(npc_id, row)
+        self._planet_ids[row] = planet_id
+        self._seeds[row] = seed
+        self._generation[row], self._attributes[row], self._draws[row] = self._initial_draws(seed)
+        self._size += 1
+        return row
+
+    def _initial_draws(self, seed: int) -> Tuple[int, List[int], List[float]]:
+        """
+        Тегленията на нов NPC: поколение, атрибути и (предварително) стойностите
+        за развитие и изчистване на личността, ако потокът не бъде пипнат
+        """
+        if self.generator_version == GENERATOR_V1:
+            streams = [ProceduralGenerator(seed)] * 4
+        else:
+            streams = [ProceduralGenerator(ProceduralGenerator.derive_seed(seed, key))
+                       for key in ('generation', 'attributes', 'personality', 'refine')]
+        generation = streams[0].randint(1, 10)
+        attributes = [streams[1].randint(1, 10) for _ in NPC_ATTRIBUTES]
+        draws = ([streams[2].random(0, 1) for _ in PERSONALITY_TRAITS] +
+                 [streams[3].random(-0.1, 0.1) for _ in PERSONALITY_TRAITS])
+        return generation, attributes, draws
+
+    def append(self, npc: NPC) -> NPCView:
+        """Копира съществуващ NPC в популацията и връща изгледа към него"""
+        if npc.generator_version != self.generator_version:
+            raise ValueError('NPC generator_version does not match the population')
+        if self._size == len(self._ids):
+            self._grow(max(16, 2 * len(self._ids)))
+
+        row = self._size
+        self._size += 1
+        self._ids[row] = npc.id
+        self._rows.setdefault(npc.id, row)
+        self._planet_ids[row] = npc.planet_id
+        self._seeds[row] = npc.seed
+        self._generation[row] = npc.generation
+        self._attributes[row] = [npc.attributes[attr] for attr in NPC_ATTRIBUTES]
+        # Генераторът на обекта носи реалното състояние на потока - копира се,
+        # за да не се споделя потокът между обекта и реда
+        if self.generator_version == GENERATOR_V1:
+            self._generators[row] = npc.generator.copy()
+            self._pinned[row] = True
+        else:
+            self._draws[row] = self._initial_draws(npc.seed)[2]
+
+        view = NPCView(self, row)
+        view.age = npc.age
+        view.state = npc.state
+        view.personality = npc.personality
+        for skill, level in npc.skills.items():
+            view.skills[skill] = level
+        if npc.loyalty or npc.memories or npc.relationships or npc.token_id is not None:
+            extras = self._extras(row)
+            extras['loyalty'].update(npc.loyalty)
+            extras['relationships'].update(npc.relationships)
+            extras['memories'].extend(npc.memories)
+            extras['previous_loyalty'].update(npc._previous_loyalty)
+            extras['token_id'] = npc.token_id
+        return view
+
+    def _extras(self, row: int) -> Dict:
+        """Връща (и създава) рядко използваните полета на ред"""
+        extras = self._extra.get(row)
+        if extras is None:
+            extras = {
+                'loyalty': {},
+                'relationships': {},
+                'memories': [],
+                'previous_loyalty': {},
+                'token_id': None
+            }
+            self._extra[row] = extras
+        return extras
+
+    def _generator(self, row: int, pin: bool = False) -> ProceduralGenerator:
+        """
+        Връща RNG потока на NPC. Непипнатите потоци се възстановяват от seed-а
+        чрез повторение на вече направените тегления вместо да се пазят в паметта.
+        """
+        gen = self._generators.get(row)
+        if gen is not None:
+            return gen
+
+        gen = ProceduralGenerator(int(self._seeds[row]))
+        for _ in range(1 + len(NPC_ATTRIBUTES)):
+            gen.randint(1, 10)
+        for _ in range(int(self._rng_stage[row]) * len(PERSONALITY_TRAITS)):
+            gen.random(0, 1)
+
+        # При V2 NPC етапите не ползват общия поток - той не се закача
+        if pin and self.generator_version == GENERATOR_V1:
+            self._generators[row] = gen
+            # Read-only колони (mmap-нат snapshot) не се остаряват - флагът не е нужен
+            if self._pinned.flags.writeable:
+                self._pinned[row] = True
+        return gen
+
+    @property
+    def _rows(self) -> Dict[int, int]:
+        """Индексът NPC ID -> ред, построен при първо използване"""
+        if self._row_index is None:
+            self._row_index = {}
+            for row, npc_id in enumerate(self._ids[:self._size].tolist()):
+                self._row_index.setdefault(npc_id, row)
+            self._id_order = None
+        return self._row_index
+
+    def _search_row(self, npc_id: int) -> Optional[int]:
+        """Двоично търсене по _id_order - без да се строи индексът"""
+        ids = self._ids[:self._size]
+        pos = int(np.searchsorted(ids, npc_id, sorter=self._id_order))
+        if pos < self._size:
+            row = int(self._id_order[pos])
+            if ids[row] == npc_id:
+                return row
+        return None
+
+    def find(self, npc_id: int) -> Optional[NPCView]:
+        """Изглед към NPC по ID (O(1) чрез индекса id -> ред)"""
+        if self._row_index is None and self._id_order is not None:
+            row = self._search_row(npc_id)
+        else:
+            row = self._rows.get(npc_id)
+        return None if row is None else NPCView(self, row)
+
+    def view(self, row: int) -> NPCView:
+        """Изглед към NPC по номер на ред"""
+        if not 0 <= row < self._size:
+            raise IndexError('NPC row out of range')
+        return NPCView(self, row)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield NPCView(self, row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [NPCView(self, row) for row in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        return self.view(index)
+
+    def count_state(self, state: NPCState) -> int:
+        """Брой NPCs в дадено състояние"""
+        return int(np.count_nonzero(self.state == _STATE_CODES[state]))
+
+    def age_cycle(self, cycles: int = 1):
+        """Остарява всички NPCs наведнъж (векторизиран NPC.age_cycle)"""
+        age = self.age
+        state = self.state
+        age += cycles
+
+        traits = len(PERSONALITY_TRAITS)
+
+        # Деца стават "развиващи се" на 5 години
+        rows = np.flatnonzero((state == _STATE_CODES[NPCState.CHILD]) & (age >= 5))
+        if len(rows):
+            canned = rows[~self._pinned[rows]]
+            self._personality[canned] = self._draws[canned, :traits]
+            for row in rows[self._pinned[rows]]:
+                gen = self._generators[row]
+                self._personality[row] = [gen.random(0, 1) for _ in PERSONALITY_TRAITS]
+            state[rows] = _STATE_CODES[NPCState.DEVELOPING]
+            self._rng_stage[rows] = _RNG_STAGE_PERSONALITY
+
+        # Развиващите се стават "зрели" на 18 години
+        rows = np.flatnonzero((state == _STATE_CODES[NPCState.DEVELOPING]) & (age >= 18))
+        if len(rows):
+            canned = rows[~self._pinned[rows]]
+            self._personality[canned] = np.clip(
+                self._personality[canned] + self._draws[canned, traits:], 0, 1
+            )
+            for row in rows[self._pinned[rows]]:
+                gen = self._generators[row]
+                variance = [gen.random(-0.1, 0.1) for _ in PERSONALITY_TRAITS]
+                self._personality[row] = np.clip(self._personality[row] + variance, 0, 1)
+            state[rows] = _STATE_CODES[NPCState.MATURE]
+            self._rng_stage[rows] = _RNG_STAGE_REFINED
+
+        # Развитие на умения
+        growing = age >= 5
+        if growing.all():
+            rows = slice(None, self._size)
+        else:
+            rows = np.flatnonzero(growing)
+            if not len(rows):
+                return
+
+        self._has_skills[rows] = True
+        rates = self._skill_growth_rates(rows)
+        for i, skill in enumerate(NPC_SKILLS):
+            column = self._skills[i]
+            column[rows] = np.minimum(100, column[rows] + rates.get(skill, 0.1))
+
+    def _skill_growth_rates(self, rows) -> Dict:
+        """Векторизиран NPC._get_skill_growth_rate - само уменията с модификатор"""
+        base_rate = 0.1
+        openness = self._personality[rows, PERSONALITY_TRAITS.index('openness')]
+        has_personality = ~np.isnan(openness)
+        if not has_personality.any():
+            return {}
+
+        charisma = self._attributes[rows, NPC_ATTRIBUTES.index('charisma')].astype(np.float64)
+        strength = self._attributes[rows, NPC_ATTRIBUTES.index('strength')].astype(np.float64)
+
+        def rate(modifier):
+            return np.where(has_personality, base_rate * modifier, base_rate)
+
+        return {
+            'leadership': rate(1.0 + charisma / 10),
+            'engineering': rate(1.0 + openness),
+            'mining': rate(1.0 + strength / 20),
+            'woodcutting': rate(1.0 + strength / 20)
+        }
+
+
 # ============================================
 # ГРАД (OCTAVIA CAPITAL CITY)
 # ============================================
@@ -529,18 +1198,285 @@ class Plot:
     net_value: int = 0
     developed: bool = False
     token_id: Optional[int] = None
+    # ID в LandRegistry (масово претендиране) - не е ERC1155 token
+    registry_id: Optional[int] = None
+    
+    def __setattr__(self, name, value):
+        # Парцел, регистриран в град, уведомява града за промени в индексираните полета
+        city = self.__dict__.get('_city') if name in _INDEXED_PLOT_FIELDS else None
+        if city is None:
+            object.__setattr__(self, name, value)
+            return
+        
+        old = getattr(self, name)
+        object.__setattr__(self, name, value)
+        if old != value:
+            city._on_plot_changed(self, name, old, value)
+
+
+_INDEXED_PLOT_FIELDS = frozenset(['owner', 'zone', 'structure_type', 'developed', 'net_value'])
+
+HOUSING_STRUCTURES = frozenset([StructureType.HUT, StructureType.WOODEN_HOUSE, StructureType.STONE_HOUSE])
+WORKPLACE_STRUCTURES = frozenset([StructureType.WORKSHOP, StructureType.COMMERCIAL])
+
+
+_STRUCTURE_TYPES = list(StructureType)
+_NO_TOKEN = -1
+
+
+def _plot_column(name: str):
+    """Property, което чете/пише колона от PlotTable"""
+    def getter(self):
+        return self._table._read(self._row, name)
+
+    def setter(self, value):
+        self._table._update(self._row, name, value)
+
+    return property(getter, setter)
+
+
+class PlotView(Plot):
+    """Тънък изглед към ред от PlotTable - създава се при поискване"""
+
+    __setattr__ = object.__setattr__
+
+    def __init__(self, table: 'PlotTable', row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def id(self) -> int:
+        return self._row + 1
+
+    zone = _plot_column('zone')
+    owner = _plot_column('owner')
+    structure_type = _plot_column('structure_type')
+    net_value = _plot_column('net_value')
+    developed = _plot_column('developed')
+    token_id = _plot_column('token_id')
+    registry_id = _plot_column('registry_id')
+
+
+class PlotTable:
+    """
+    Компактно колонно хранилище за парцели (~20 байта на парцел).
+    Парцел с ID i е на ред i - 1; Plot обекти се създават само като изгледи.
+    """
+
+    COLUMNS = ('zone', 'owner', 'structure_type', 'net_value', 'developed', 'token_id')
+
+    def __init__(self, total_plots: int, zone_bounds: List[Tuple[str, int]] = (), on_change=None):
+        if np is None:
+            raise ImportError('PlotTable requires numpy (pip install numpy)')
+
+        self._size = total_plots
+        self._on_change = on_change
+
+        # Зоните и собствениците се пазят като кодове към таблици с низове
+        self.zone_names: List[str] = []
+        self._zone_codes: Dict[str, int] = {}
+        self.owner_names: List[Optional[str]] = [None]
+        self._owner_codes: Dict[str, int] = {}
+
+        self.zone = np.zeros(total_plots, dtype=np.uint8)
+        self.owner = np.zeros(total_plots, dtype=np.int32)
+        self.structure_type = np.zeros(total_plots, dtype=np.uint8)
+        self.net_value = np.zeros(total_plots, dtype=np.int32)
+        self.developed = np.zeros(total_plots, dtype=bool)
+        self.token_id = np.full(total_plots, _NO_TOKEN, dtype=np.int64)
+        # Token ID-та извън int64 (uint256 от веригата)
+        self._big_token_ids: Dict[int, int] = {}
+        # LandRegistry ID-та - само на масово претендираните парцели
+        self._registry_ids: Dict[int, int] = {}
+
+        start = 0
+        for zone, end in zone_bounds:
+            self.zone[start:end] = self._zone_code(zone)
+            start = end
+
+    @classmethod
+    def from_plots(cls, plots: List[Plot]) -> 'PlotTable':
+        """Колонно копие на списък парцели с ID-та 1..N"""
+        table = cls(len(plots))
+        table.zone[:] = [table._zone_code(plot.zone) for plot in plots]
+        table.owner[:] = [table._owner_code(plot.owner) for plot in plots]
+        table.structure_type[:] = [plot.structure_type.value for plot in plots]
+        table.net_value[:] = [plot.net_value for plot in plots]
+        table.developed[:] = [plot.developed for plot in plots]
+        for row, plot in enumerate(plots):
+            if plot.token_id is not None:
+                table._write(row, 'token_id', plot.token_id)
+            if plot.registry_id is not None:
+                table._registry_ids[row] = plot.registry_id
+        return table
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, 'np.ndarray'], zone_names: List[str],
+                     owner_names: List[Optional[str]], big_token_ids: Dict[int, int],
+                     registry_ids: Optional[Dict[int, int]] = None) -> 'PlotTable':
+        """Възстановява таблица от колони (напр. от snapshot)"""
+        table = cls(0)
+        table._size = len(columns['zone'])
+        for name in cls.COLUMNS:
+            setattr(table, name, columns[name])
+        table.zone_names = list(zone_names)
+        table._zone_codes = {zone: code for code, zone in enumerate(table.zone_names)}
+        table.owner_names = list(owner_names)
+        table._owner_codes = {owner: code for code, owner in enumerate(table.owner_names) if code}
+        table._big_token_ids = dict(big_token_ids)
+        table._registry_ids = dict(registry_ids or {})
+        return table
+
+    def columns(self) -> Dict[str, 'np.ndarray']:
+        """Колоните по име"""
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def _zone_code(self, zone: str) -> int:
+        code = self._zone_codes.get(zone)
+        if code is None:
+            code = len(self.zone_names)
+            self.zone_names.append(zone)
+            self._zone_codes[zone] = code
+        return code
+
+    def _owner_code(self, owner: Optional[str]) -> int:
+        if owner is None:
+            return 0
+        code = self._owner_codes.get(owner)
+        if code is None:
+            code = len(self.owner_names)
+            self.owner_names.append(owner)
+            self._owner_codes[owner] = code
+        return code
+
+    def _read(self, row: int, name: str):
+        if name == 'zone':
+            return self.zone_names[self.zone[row]]
+        if name == 'owner':
+            return self.owner_names[self.owner[row]]
+        if name == 'structure_type':
+            return _STRUCTURE_TYPES[self.structure_type[row]]
+        if name == 'net_value':
+            return int(self.net_value[row])
+        if name == 'developed':
+            return bool(self.developed[row])
+        if name == 'token_id':
+            token_id = int(self.token_id[row])
+            if token_id == _NO_TOKEN:
+                return self._big_token_ids.get(row)
+            return token_id
+        if name == 'registry_id':
+            return self._registry_ids.get(row)
+        raise AttributeError(name)
+
+    def _write(self, row: int, name: str, value):
+        if name == 'zone':
+            self.zone[row] = self._zone_code(value)
+        elif name == 'owner':
+            self.owner[row] = self._owner_code(value)
+        elif name == 'structure_type':
+            self.structure_type[row] = value.value
+        elif name == 'net_value':
+            self.net_value[row] = value
+        elif name == 'developed':
+            self.developed[row] = value
+        elif name == 'token_id':
+            self._big_token_ids.pop(row, None)
+            if value is None:
+                self.token_id[row] = _NO_TOKEN
+            elif 0 <= value <= np.iinfo(np.int64).max:
+                self.token_id[row] = value
+            else:
+                self.token_id[row] = _NO_TOKEN
+                self._big_token_ids[row] = value
+        elif name == 'registry_id':
+            if value is None:
+                self._registry_ids.pop(row, None)
+            else:
+                self._registry_ids[row] = value
+        else:
+            raise AttributeError(name)
+
+    def _update(self, row: int, name: str, value):
+        old = self._read(row, name)
+        self._write(row, name, value)
+        if self._on_change and name in _INDEXED_PLOT_FIELDS and old != value:
+            self._on_change(PlotView(self, row), name, old, value)
+
+    def get(self, plot_id: int) -> Optional[PlotView]:
+        """Изглед към парцел по ID"""
+        if 1 <= plot_id <= self._size:
+            return PlotView(self, plot_id - 1)
+        return None
+
+    def find_ids(self, zone: Optional[str] = None,
+                 structure_type: Optional[StructureType] = None,
+                 free: bool = False) -> List[int]:
+        """Векторизирано търсене на ID-та на парцели по зона, структура и свобода"""
+        mask = np.ones(self._size, dtype=bool)
+        if zone is not None:
+            if zone not in self._zone_codes:
+                return []
+            mask &= self.zone == self._zone_codes[zone]
+        if structure_type is not None:
+            mask &= self.structure_type == structure_type.value
+        if free:
+            mask &= self.owner == 0
+        return (np.flatnonzero(mask) + 1).tolist()
+
+    def nbytes(self) -> int:
+        """Памет, заета от колоните"""
+        return sum(column.nbytes for column in (
+            self.zone, self.owner, self.structure_type, self.net_value, self.developed, self.token_id
+        ))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield PlotView(self, row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PlotView(self, row) for row in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('plot index out of range')
+        return PlotView(self, index)
 
 
 class City:
     """Клас за град в системата Sarakt"""
     
-    def __init__(self, city_id: int, name: str, planet_id: int, total_plots: int):
+    def __init__(self, city_id: int, name: str, planet_id: int, total_plots: int,
+                 compact: bool = False, plot_table: Optional[PlotTable] = None):
         self.id = city_id
         self.name = name
         self.planet_id = planet_id
         self.total_plots = total_plots
-        
-        self.plots = self._initialize_plots()
+        self.compact = compact
+        
+        # Индекси на парцелите: по ID и вторични по собственик, зона и структура.
+        # В компактен режим се поддържа само индексът по собственик, а останалите
+        # търсения са векторизирани над колоните на PlotTable.
+        self._plots_by_id: Dict[int, Plot] = {}
+        self._owner_index: Optional[Dict[str, Set[int]]] = {}
+        self._plots_by_zone: Dict[str, Set[int]] = {}
+        self._plots_by_structure: Dict[StructureType, Set[int]] = {}
+        self._free_plots_by_zone: Dict[str, Set[int]] = {}
+        
+        # Текущи броячи - обновяват се с делти при промяна на парцел
+        self._developed_count = 0
+        self._housing_count = 0
+        self._workplace_count = 0
+        self._gdp = 0
+        
+        if plot_table is None:
+            self.plots = self._initialize_plots()
+        else:
+            self.plots = self._load_plots(plot_table)
         self.infrastructure = self._initialize_infrastructure()
         self.economy = self._initialize_economy()
         self.population = 0
@@ -554,6 +1490,17 @@ class City:
         commercial = int(self.total_plots * 0.3)
         industrial = self.total_plots - residential - commercial
         
+        if self.compact:
+            return PlotTable(self.total_plots, [
+                ('residential', residential),
+                ('commercial', residential + commercial),
+                ('industrial', self.total_plots)
+            ], on_change=self._on_plot_changed)
+        
+        # Празен парцел, вече регистриран в града (заобикаля __setattr__ куката при създаване)
+        blank = {f.name: f.default for f in fields(Plot) if f.name not in ('id', 'zone')}
+        blank['_city'] = self
+        
         for i in range(1, self.total_plots + 1):
             if i <= residential:
                 zone = 'residential'
@@ -562,10 +1509,153 @@ class City:
             else:
                 zone = 'industrial'
             
-            plots.append(Plot(id=i, zone=zone))
+            plot = object.__new__(Plot)
+            plot.__dict__.update(blank, id=i, zone=zone)
+            plots.append(plot)
+        
+        # Новите парцели са свободни и празни - индексите се строят директно от зоните
+        zone_ranges = {
+            'residential': range(1, residential + 1),
+            'commercial': range(residential + 1, residential + commercial + 1),
+            'industrial': range(residential + commercial + 1, self.total_plots + 1)
+        }
+        self._plots_by_id = {plot.id: plot for plot in plots}
+        self._plots_by_zone = {zone: set(ids) for zone, ids in zone_ranges.items() if ids}
+        self._free_plots_by_zone = {zone: set(ids) for zone, ids in self._plots_by_zone.items()}
+        if plots:
+            self._plots_by_structure = {StructureType.EMPTY_PLOT: set(self._plots_by_id)}
         
         return plots
     
+    def _load_plots(self, table: PlotTable):
+        """Зарежда съществуващи парцели (напр. от snapshot) и строи индексите"""
+        if not self.compact:
+            plots = [Plot(view.id, view.zone, view.owner, view.structure_type,
+                          view.net_value, view.developed, view.token_id, view.registry_id)
+                     for view in table]
+            for plot in plots:
+                self._index_plot(plot)
+            return plots
+        
+        # Индексът по собственик се строи при първа нужда - броячите по-долу
+        # са векторизирани и работят директно върху колоните (вкл. mmap)
+        table._on_change = self._on_plot_changed
+        self._owner_index = None
+        
+        self._developed_count = int(np.count_nonzero(table.developed))
+        self._gdp = int(table.net_value[table.developed].sum(dtype=np.int64)) * 1000
+        self._housing_count = int(np.count_nonzero(np.isin(
+            table.structure_type, [s.value for s in HOUSING_STRUCTURES])))
+        self._workplace_count = int(np.count_nonzero(np.isin(
+            table.structure_type, [s.value for s in WORKPLACE_STRUCTURES])))
+        return table
+    
+    @property
+    def _plots_by_owner(self) -> Dict[str, Set[int]]:
+        """Индексът собственик -> ID-та на парцели"""
+        if self._owner_index is None:
+            self._owner_index = {}
+            table = self.plots
+            for row in np.flatnonzero(table.owner):
+                owner = table.owner_names[table.owner[row]]
+                self._owner_index.setdefault(owner, set()).add(int(row) + 1)
+        return self._owner_index
+    
+    def plot_table(self) -> PlotTable:
+        """Парцелите като PlotTable (в компактен режим - самото хранилище)"""
+        if self.compact:
+            return self.plots
+        return PlotTable.from_plots(self.plots)
+    
+    def _index_plot(self, plot: Plot):
+        """Регистрира парцел в индексите на града"""
+        self._plots_by_id[plot.id] = plot
+        if plot.owner is not None:
+            self._plots_by_owner.setdefault(plot.owner, set()).add(plot.id)
+        else:
+            self._free_plots_by_zone.setdefault(plot.zone, set()).add(plot.id)
+        self._plots_by_zone.setdefault(plot.zone, set()).add(plot.id)
+        self._plots_by_structure.setdefault(plot.structure_type, set()).add(plot.id)
+        self._count_structure(plot.structure_type, 1)
+        if plot.developed:
+            self._developed_count += 1
+            self._gdp += plot.net_value * 1000
+        object.__setattr__(plot, '_city', self)
+    
+    def _count_structure(self, structure_type: StructureType, delta: int):
+        if structure_type in HOUSING_STRUCTURES:
+            self._housing_count += delta
+        elif structure_type in WORKPLACE_STRUCTURES:
+            self._workplace_count += delta
+    
+    def _on_plot_changed(self, plot: Plot, name: str, old, new):
+        """Актуализира индексите след промяна на поле на парцел"""
+        if name == 'owner':
+            if self._owner_index is None:
+                # Индексът още не е построен - ще отрази новия собственик от колоните
+                return
+            if old is not None:
+                self._plots_by_owner[old].discard(plot.id)
+            elif not self.compact:
+                self._free_plots_by_zone[plot.zone].discard(plot.id)
+            if new is not None:
+                self._plots_by_owner.setdefault(new, set()).add(plot.id)
+            elif not self.compact:
+                self._free_plots_by_zone.setdefault(plot.zone, set()).add(plot.id)
+        elif name == 'zone':
+            if self.compact:
+                return
+            self._plots_by_zone[old].discard(plot.id)
+            self._plots_by_zone.setdefault(new, set()).add(plot.id)
+            if plot.owner is None:
+                self._free_plots_by_zone[old].discard(plot.id)
+                self._free_plots_by_zone.setdefault(new, set()).add(plot.id)
+        elif name == 'structure_type':
+            if not self.compact:
+                self._plots_by_structure[old].discard(plot.id)
+                self._plots_by_structure.setdefault(new, set()).add(plot.id)
+            self._count_structure(old, -1)
+            self._count_structure(new, 1)
+        elif name == 'developed':
+            sign = 1 if new else -1
+            self._developed_count += sign
+            self._gdp += sign * plot.net_value * 1000
+        elif name == 'net_value' and plot.developed:
+            self._gdp += (new - old) * 1000
+    
+    def _plots_from_ids(self, plot_ids) -> List[Plot]:
+        return [self.get_plot(plot_id) for plot_id in sorted(plot_ids)]
+    
+    def get_plot(self, plot_id: int) -> Optional[Plot]:
+        """Взима парцел по ID"""
+        if self.compact:
+            return self.plots.get(plot_id)
+        return self._plots_by_id.get(plot_id)
+    
+    def get_plots_by_owner(self, owner: str) -> List[Plot]:
+        """Парцели на собственик (подредени по ID)"""
+        return self._plots_from_ids(self._plots_by_owner.get(owner, ()))
+    
+    def get_plots_by_zone(self, zone: str) -> List[Plot]:
+        """Парцели в зона (подредени по ID)"""
+        if self.compact:
+            return self._plots_from_ids(self.plots.find_ids(zone=zone))
+        return self._plots_from_ids(self._plots_by_zone.get(zone, ()))
+    
+    def get_plots_by_structure(self, structure_type: StructureType) -> List[Plot]:
+        """Парцели с даден тип структура (подредени по ID)"""
+        if self.compact:
+            return self._plots_from_ids(self.plots.find_ids(structure_type=structure_type))
+        return self._plots_from_ids(self._plots_by_structure.get(structure_type, ()))
+    
+    def get_free_plots(self, zone: Optional[str] = None) -> List[Plot]:
+        """Свободни (без собственик) парцели, по избор само в дадена зона"""
+        if self.compact:
+            return self._plots_from_ids(self.plots.find_ids(zone=zone, free=True))
+        if zone is not None:
+            return self._plots_from_ids(self._free_plots_by_zone.get(zone, ()))
+        return self._plots_from_ids(set().union(*self._free_plots_by_zone.values()))
+    
     def _initialize_infrastructure(self) -> Dict:
         """Инициализира инфраструктура"""
         return {
@@ -600,7 +1690,7 @@ class City:
     
     def develop_plot(self, plot_id: int, structure_type: StructureType, owner: str) -> Plot:
         """Развива парцел"""
-        plot = next((p for p in self.plots if p.id == plot_id), None)
+        plot = self.get_plot(plot_id)
         
         if not plot:
             raise ValueError('Plot not found')
@@ -643,28 +1733,20 @@ class City:
         self._update_city_stats()
     
     def _update_city_stats(self):
-        """Актуализира статистиките на града"""
-        developed = sum(1 for p in self.plots if p.developed)
-        
+        """Актуализира статистиките на града (O(1) - от текущите броячи)"""
         # Актуализира населението
-        housing = [p for p in self.plots if p.structure_type in [
-            StructureType.HUT, StructureType.WOODEN_HOUSE, StructureType.STONE_HOUSE
-        ]]
-        self.population = len(housing) * 4  # Средно 4 души на жилище
+        self.population = self._housing_count * 4  # Средно 4 души на жилище
         
-        # Изчислява GDP
-        self.economy['gdp'] = sum(p.net_value * 1000 for p in self.plots if p.developed)
+        # GDP се поддържа инкрементално
+        self.economy['gdp'] = self._gdp
         
         # Изчислява заетост
-        workplaces = [p for p in self.plots if p.structure_type in [
-            StructureType.WORKSHOP, StructureType.COMMERCIAL
-        ]]
-        self.economy['employment'] = min(self.population * 0.6, len(workplaces) * 10)
+        self.economy['employment'] = min(self.population * 0.6, self._workplace_count * 10)
         self.economy['unemployment'] = max(0, (self.population * 0.6) - self.economy['employment'])
     
     def get_city_stats(self) -> Dict:
         """Връща статистики на града"""
-        developed = sum(1 for p in self.plots if p.developed)
+        developed = self._developed_count
         
         return {
             'name': self.name,
@@ -688,58 +1770,257 @@ class City:
         return summary
 
 
+# ============================================
+# ПАРАЛЕЛНА ГЕНЕРАЦИЯ
+# ============================================
+
+@dataclass(frozen=True)
+class PlanetSpec:
+    planet_id: int
+    name: str
+    seed: int
+    planet_type: PlanetType
+    is_habitable: bool
+    generator_version: int = GENERATOR_V1
+
+    def create(self) -> Planet:
+        return Planet(self.planet_id, self.name, self.seed, self.planet_type,
+                      self.is_habitable, self.generator_version)
+
+
+@dataclass(frozen=True)
+class NPCCohortSpec:
+    """Кохорта NPCs с последователни ID-та и seed-ове"""
+    start_id: int
+    planet_id: int
+    seed_start: int
+    count: int
+    generator_version: int = GENERATOR_V1
+    vectorized: bool = False
+
+    def create(self):
+        seeds = range(self.seed_start, self.seed_start + self.count)
+        if self.vectorized:
+            return NPCPopulation.spawn(self.start_id, self.planet_id, seeds, self.generator_version)
+        return [NPC(self.start_id + i, self.planet_id, seed, self.generator_version)
+                for i, seed in enumerate(seeds)]
+
+    def split(self, size: int) -> List['NPCCohortSpec']:
+        """Разделя кохортата на части от най-много size NPCs"""
+        return [
+            NPCCohortSpec(self.start_id + offset, self.planet_id, self.seed_start + offset,
+                          min(size, self.count - offset), self.generator_version, self.vectorized)
+            for offset in range(0, self.count, size)
+        ]
+
+
+def _generate_planet(spec: PlanetSpec) -> Planet:
+    """Worker: генерира всички секции на планета"""
+    return spec.create().materialize()
+
+
+def _generate_npc_cohort(spec: NPCCohortSpec):
+    """Worker: създава кохорта NPCs"""
+    return spec.create()
+
+
+class UniverseBuilder:
+    """
+    Генерира планети и NPC кохорти в ProcessPoolExecutor.
+    Всичко се извежда от seed-ове, така че резултатите (в детерминистичен ред)
+    са идентични на серийната генерация.
+    """
+
+    NPC_CHUNK_SIZE = 50000
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+
+    def build_planets(self, specs: List[PlanetSpec]) -> List[Planet]:
+        """Генерира планетите паралелно, в реда на specs"""
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(_generate_planet, specs))
+
+    def build_npc_cohort(self, spec: NPCCohortSpec):
+        """Генерира кохорта паралелно на части и ги слепва в реда на ID-тата"""
+        parts = spec.split(self.NPC_CHUNK_SIZE)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(_generate_npc_cohort, parts))
+
+        if spec.vectorized:
+            return NPCPopulation.concatenate(results, spec.generator_version)
+        return [npc for part in results for npc in part]
+
+
 # ============================================
 # ВСЕЛЕНА SARAKT
 # ============================================
 
+def _mutation(name: str):
+    """Метод на list, който отбелязва промяна преди да я изпълни"""
+    method = getattr(list, name)
+
+    def mutate(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+    mutate.__name__ = name
+    return mutate
+
+
+class _TrackedList(list):
+    """
+    list, който брои промените си (добавяне, подмяна, изтриване, пренареждане).
+    Индексите на вселената сравняват версията, за да хванат и промени, при
+    които дължината остава същата.
+    """
+
+    version = 0
+
+    __setitem__ = _mutation('__setitem__')
+    __delitem__ = _mutation('__delitem__')
+    __iadd__ = _mutation('__iadd__')
+    __imul__ = _mutation('__imul__')
+    append = _mutation('append')
+    extend = _mutation('extend')
+    insert = _mutation('insert')
+    pop = _mutation('pop')
+    remove = _mutation('remove')
+    clear = _mutation('clear')
+    sort = _mutation('sort')
+    reverse = _mutation('reverse')
+
+
+def _tracked(items) -> _TrackedList:
+    """Списъкът като _TrackedList (копира се само ако е обикновен list)"""
+    return items if isinstance(items, _TrackedList) else _TrackedList(items)
+
+
+def _is_current(stamp: Optional[Tuple[_TrackedList, int]], items: _TrackedList) -> bool:
+    """Дали индекс, построен при stamp = (списък, версия), е актуален за items"""
+    return stamp is not None and stamp[0] is items and stamp[1] == items.version
+
+
 class SaraktUniverse:
     """Главен клас за управление на вселената Sarakt"""
     
-    def __init__(self):
-        self.planets: List[Planet] = []
-        self.cities: List[City] = []
-        self.npcs: List[NPC] = []
+    def __init__(self, vectorized_npcs: bool = False, compact_plots: bool = False,
+                 generator_version: int = GENERATOR_V1, workers: Optional[int] = None,
+                 initialize: bool = True):
+        self.planets = []
+        self.cities = []
+        self.npcs = []
         self.factions: List[Dict] = []
         self.current_cycle = 0
-        
-        self._initialize()
+        self.vectorized_npcs = vectorized_npcs
+        self.compact_plots = compact_plots
+        self.generator_version = generator_version
+        # Брой процеси за паралелна генерация (None - серийна, мързелива генерация)
+        self.workers = workers
+        
+        # Индекси за O(1) търсене по ID и име; _indexed_* е (списък, версия) при индексиране
+        self._planets_by_id: Dict[int, Planet] = {}
+        self._planets_by_name: Dict[str, Planet] = {}
+        self._indexed_planets: Optional[Tuple[_TrackedList, int]] = None
+        self._cities_by_id: Dict[int, City] = {}
+        self._cities_by_name: Dict[str, City] = {}
+        self._indexed_cities: Optional[Tuple[_TrackedList, int]] = None
+        self._npcs_by_id: Dict[int, NPC] = {}
+        self._indexed_npcs: Optional[Tuple[_TrackedList, int]] = None
+        
+        # initialize=False дава празна вселена (напр. за зареждане от snapshot)
+        if initialize:
+            self._initialize()
+    
+    # Списъците са публични - пазят се като _TrackedList, за да може индексите
+    # да забележат и подмяна на списъка или на елемент при същата дължина
+    
+    @property
+    def planets(self) -> List[Planet]:
+        return self._planets
+    
+    @planets.setter
+    def planets(self, planets: List[Planet]):
+        self._planets = _tracked(planets)
+    
+    @property
+    def cities(self) -> List[City]:
+        return self._cities
+    
+    @cities.setter
+    def cities(self, cities: List[City]):
+        self._cities = _tracked(cities)
+    
+    @property
+    def npcs(self):
+        """Списък от NPC обекти или NPCPopulation (векторизиран режим)"""
+        return self._npcs
+    
+    @npcs.setter
+    def npcs(self, npcs):
+        self._npcs = npcs if isinstance(npcs, NPCPopulation) else _tracked(npcs)
+    
+    def _planet_specs(self) -> List[PlanetSpec]:
+        """Sarakt, Zythera и 20 минни планети"""
+        version = self.generator_version
+        specs = [
+            PlanetSpec(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, version),
+            PlanetSpec(2, 'Zythera', 67890, PlanetType.HABITABLE_BIOTECH, True, version)
+        ]
+        for i in range(1, 21):
+            specs.append(PlanetSpec(
+                i + 2,
+                f'Mining Planet {i}',
+                100000 + i,
+                PlanetType.MINING_STANDARD,
+                False,
+                version
+            ))
+        return specs
     
     def _initialize(self):
         """Инициализира системата Sarakt"""
         print('🌌 Инициализиране на системата Sarakt...\n')
         
+        specs = self._planet_specs()
+        builder = UniverseBuilder(self.workers) if self.workers else None
+        if builder:
+            planets = builder.build_planets(specs)
+        else:
+            planets = [spec.create() for spec in specs]
+        
         # Създава Sarakt (главна обитаема планета)
-        sarakt = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True)
-        self.planets.append(sarakt)
+        sarakt = planets[0]
+        self.add_planet(sarakt)
         print('✅ Планета създадена: Sarakt (Главна обитаема)')
         
         # Създава Octavia Capital City на Sarakt
-        octavia = City(1, 'Octavia Capital City', 1, 10000)
-        self.cities.append(octavia)
+        octavia = City(1, 'Octavia Capital City', 1, 10000, compact=self.compact_plots)
+        self.add_city(octavia)
         print('🏛️  Град основан: Octavia Capital City (10,000 парцела)')
         
         # Създава Zythera (биотех хаос)
-        zythera = Planet(2, 'Zythera', 67890, PlanetType.HABITABLE_BIOTECH, True)
-        self.planets.append(zythera)
+        zythera = planets[1]
+        self.add_planet(zythera)
         print('✅ Планета създадена: Zythera (Биотех хаос)')
         
         # Създава 20 минни планети
-        for i in range(1, 21):
-            planet = Planet(
-                i + 2,
-                f'Mining Planet {i}',
-                100000 + i,
-                PlanetType.MINING_STANDARD,
-                False
-            )
-            self.planets.append(planet)
+        for planet in planets[2:]:
+            self.add_planet(planet)
         print('⛏️  Създадени 20 минни планети')
         
         # Създава начални NPCs с Dynasty Dulo наследство
         print('\n👥 Създаване на Dynasty Dulo потомци...')
-        for i in range(100):
-            npc = NPC(i + 1, 1, 50000 + i)  # Повечето на Sarakt
-            self.npcs.append(npc)
+        # Повечето на Sarakt
+        cohort = NPCCohortSpec(1, 1, 50000, 100, self.generator_version, self.vectorized_npcs)
+        if builder:
+            npcs = builder.build_npc_cohort(cohort)
+        else:
+            npcs = cohort.create()
+        if self.vectorized_npcs:
+            self.npcs = npcs
+        else:
+            for npc in npcs:
+                self.add_npc(npc)
         print(f'✅ Създадени {len(self.npcs)} NPCs')
         
         print('\n✨ Система Sarakt инициализирана!\n')
@@ -749,8 +2030,11 @@ class SaraktUniverse:
         self.current_cycle += 1
         
         # Остарява всички NPCs
-        for npc in self.npcs:
-            npc.age_cycle()
+        if isinstance(self.npcs, NPCPopulation):
+            self.npcs.age_cycle()
+        else:
+            for npc in self.npcs:
+                npc.age_cycle()
         
         # Актуализира икономика на градовете
         for city in self.cities:
@@ -763,32 +2047,100 @@ class SaraktUniverse:
             self.simulate_cycle()
         print('✅ Симулация завършена\n')
     
+    def add_planet(self, planet: Planet) -> Planet:
+        """Добавя планета и я индексира"""
+        if not _is_current(self._indexed_planets, self.planets):
+            self._reindex_planets()
+        self.planets.append(planet)
+        self._planets_by_id.setdefault(planet.id, planet)
+        self._planets_by_name.setdefault(planet.name, planet)
+        self._indexed_planets = (self.planets, self.planets.version)
+        return planet
+    
+    def add_city(self, city: City) -> City:
+        """Добавя град и го индексира"""
+        if not _is_current(self._indexed_cities, self.cities):
+            self._reindex_cities()
+        self.cities.append(city)
+        self._cities_by_id.setdefault(city.id, city)
+        self._cities_by_name.setdefault(city.name, city)
+        self._indexed_cities = (self.cities, self.cities.version)
+        return city
+    
     def get_planet(self, identifier) -> Optional[Planet]:
         """Взима планета по име или ID"""
+        if not _is_current(self._indexed_planets, self.planets):
+            self._reindex_planets()
         if isinstance(identifier, str):
-            return next((p for p in self.planets if p.name == identifier), None)
-        return next((p for p in self.planets if p.id == identifier), None)
+            return self._planets_by_name.get(identifier)
+        return self._planets_by_id.get(identifier)
     
     def get_city(self, identifier) -> Optional[City]:
         """Взима град по име или ID"""
+        if not _is_current(self._indexed_cities, self.cities):
+            self._reindex_cities()
         if isinstance(identifier, str):
-            return next((c for c in self.cities if c.name == identifier), None)
-        return next((c for c in self.cities if c.id == identifier), None)
+            return self._cities_by_name.get(identifier)
+        return self._cities_by_id.get(identifier)
     
     def get_npc(self, npc_id: int) -> Optional[NPC]:
         """Взима NPC по ID"""
-        return next((npc for npc in self.npcs if npc.id == npc_id), None)
+        if isinstance(self.npcs, NPCPopulation):
+            return self.npcs.find(npc_id)
+        if not _is_current(self._indexed_npcs, self.npcs):
+            self._reindex_npcs()
+        return self._npcs_by_id.get(npc_id)
+    
+    def add_npc(self, npc: NPC) -> NPC:
+        """Добавя NPC във вселената и връща съхранения обект (изглед при популация)"""
+        if isinstance(self.npcs, NPCPopulation):
+            return self.npcs.append(npc)
+        if not _is_current(self._indexed_npcs, self.npcs):
+            self._reindex_npcs()
+        self.npcs.append(npc)
+        self._npcs_by_id.setdefault(npc.id, npc)
+        self._indexed_npcs = (self.npcs, self.npcs.version)
+        return npc
+    
+    # При всяка директна промяна на списъците индексите се построяват наново
+    
+    def _reindex_planets(self):
+        self._planets_by_id, self._planets_by_name = {}, {}
+        for planet in self.planets:
+            self._planets_by_id.setdefault(planet.id, planet)
+            self._planets_by_name.setdefault(planet.name, planet)
+        self._indexed_planets = (self.planets, self.planets.version)
+    
+    def _reindex_cities(self):
+        self._cities_by_id, self._cities_by_name = {}, {}
+        for city in self.cities:
+            self._cities_by_id.setdefault(city.id, city)
+            self._cities_by_name.setdefault(city.name, city)
+        self._indexed_cities = (self.cities, self.cities.version)
+    
+    def _reindex_npcs(self):
+        self._npcs_by_id = {}
+        for npc in self.npcs:
+            self._npcs_by_id.setdefault(npc.id, npc)
+        self._indexed_npcs = (self.npcs, self.npcs.version)
     
     def get_universe_status(self) -> Dict:
         """Връща статус на вселената"""
+        if isinstance(self.npcs, NPCPopulation):
+            mature = self.npcs.count_state(NPCState.MATURE)
+            loyal = self.npcs.count_state(NPCState.LOYAL)
+        else:
+            mature = sum(1 for npc in self.npcs if npc.state == NPCState.MATURE)
+            loyal = sum(1 for npc in self.npcs if npc.state == NPCState.LOYAL)
+        
         return {
             'cycle': self.current_cycle,
             'total_planets': len(self.planets),
             'habitable_planets': sum(1 for p in self.planets if p.is_habitable),
             'total_cities': len(self.cities),
             'total_npcs': len(self.npcs),
-            'mature_npcs': sum(1 for npc in self.npcs if npc.state == NPCState.MATURE),
-            'loyal_npcs': sum(1 for npc in self.npcs if npc.state == NPCState.LOYAL)
+            'mature_npcs': mature,
+            'loyal_npcs': loyal
         }
 
 
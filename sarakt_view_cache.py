@@ -0,0 +1,119 @@
+"""
+SARAKT VIEW CALL CACHE - Python
+Кеш за on-chain view извиквания, валиден в рамките на един блок
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def _freeze(value):
+    """Превръща аргументите в hashable ключ (списъци -> tuple)"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+class ViewCallCache:
+    """
+    Read-through кеш за view извиквания с ключ (contract, функция, аргументи, блок).
+
+    Номерът на блока се проверява най-много веднъж на block_poll_interval
+    секунди; при нов блок кешът се изчиства. Записите изтичат и след ttl
+    секунди, а при над max_entries най-старият по използване се изхвърля (LRU).
+    """
+
+    def __init__(self, w3, max_entries: int = 4096, ttl: float = 30.0,
+                 block_poll_interval: float = 1.0):
+        self.w3 = w3
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.block_poll_interval = block_poll_interval
+
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._block: Optional[int] = None
+        self._block_checked = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def call(self, function):
+        """
+        Изпълнява function.call() (напр. contract.functions.balances()) през
+        кеша. Резултатът се чете към последния видян блок за консистентност.
+        """
+        block = self._current_block()
+        key = (function.address, function.fn_name, _freeze(function.args), block)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = function.call(block_identifier=block)
+
+        with self._lock:
+            # Блокът може да се е сменил докато чакаме - не кешираме остарял резултат
+            if block == self._block:
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def note_block(self, block_number: int):
+        """Съобщава за видян блок (напр. от receipt tracker-а) - инвалидира при нов"""
+        with self._lock:
+            self._block_checked = time.monotonic()
+            if self._block is None or block_number > self._block:
+                self._set_block(block_number)
+
+    def invalidate(self):
+        """Изчиства кеша (напр. след собствена транзакция)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        """Броячи за попадения и пропуски"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'block': self._block
+            }
+
+    def _current_block(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._block is not None and now - self._block_checked < self.block_poll_interval:
+                return self._block
+        block = self.w3.eth.block_number
+        with self._lock:
+            self._block_checked = now
+            if self._block is None or block > self._block:
+                self._set_block(block)
+            return self._block
+
+    def _set_block(self, block_number: int):
+        if self._entries:
+            self._entries.clear()
+            self.invalidations += 1
+        self._block = block_number
@@ -0,0 +1,307 @@
+"""
+Мостът срещу fake:// веригата - claim_plot, claim_plots, spawn и flush
+без node (block_time=0 - всяка транзакция се включва веднага)
+"""
+
+import time
+import uuid
+
+import pytest
+
+from sarakt_blockchain_integration import BlockchainConnector, SaraktBridge, SyncQueue
+from sarakt_fake_chain import CORE_ADDRESS, LAND_REGISTRY_ADDRESS, DEV_PRIVATE_KEY, get_fake_chain
+from sarakt_indexer import EventIndexer
+from sarakt_journal import TxJournal, BROADCAST, CONFIRMED, FAILED
+from sarakt_reconcile import Reconciler
+from sarakt_universe_engine import SaraktUniverse, StructureType
+
+
+PLAYER = '0x' + '11' * 20
+OTHER_PLAYER = '0x' + '22' * 20
+
+
+@pytest.fixture
+def config():
+    # get_fake_chain пази веригите по URL - всеки тест получава своя
+    return {
+        'rpc_url': f'fake://{uuid.uuid4().hex}?block_time=0',
+        'contract_address': CORE_ADDRESS,
+        'land_registry_address': LAND_REGISTRY_ADDRESS,
+        'private_key': DEV_PRIVATE_KEY
+    }
+
+
+@pytest.fixture
+def bridge(config):
+    return SaraktBridge(SaraktUniverse(), BlockchainConnector(config))
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = TxJournal(str(tmp_path / 'tx_journal.jsonl'))
+    yield journal
+    if not journal._closed:
+        journal.close()
+
+
+def _city(bridge):
+    return bridge.universe.get_city('Octavia Capital City')
+
+
+def _failing_sends(connector, after: int):
+    """Кара send_raw_transaction да отказва след първите after изпращания"""
+    send = connector.w3.eth.send_raw_transaction
+    sent = []
+
+    def flaky(raw):
+        if len(sent) >= after:
+            raise ConnectionError('node down')
+        sent.append(raw)
+        return send(raw)
+
+    connector.w3.eth.send_raw_transaction = flaky
+    return send
+
+
+def _wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'условието не е изпълнено навреме'
+        time.sleep(0.01)
+
+
+# ============================================
+# ПАРЦЕЛИ
+# ============================================
+
+def test_claim_plot_links_token(bridge):
+    result = bridge.claim_plot(PLAYER, 5)
+
+    plot = _city(bridge).get_plot(5)
+    assert plot.owner == PLAYER
+    assert plot.token_id == result['nft']['token_id']
+    assert bridge.blockchain.check_ownership(PLAYER, plot.token_id)
+    assert 5 in bridge.synced_assets['plots']
+
+
+def test_claim_plots_mints_batches_through_land_registry(bridge):
+    claims = [(PLAYER, n) for n in range(10, 15)] + [(OTHER_PLAYER, n) for n in range(20, 23)]
+    result = bridge.claim_plots(claims, 100)
+
+    assert result['transactions'] == 2
+    assert result['failed'] == [] and result['pending'] == []
+    assert sorted(plot.id for plot in result['plots']) == sorted(n for _, n in claims)
+
+    for player_id, plot_number in claims:
+        plot = _city(bridge).get_plot(plot_number)
+        assert plot.owner == player_id
+        # ID-то в LandRegistry не е ERC1155 token
+        assert plot.token_id is None
+        assert plot.registry_id == plot_number
+        on_chain = bridge.blockchain.get_plot_on_chain(plot_number)
+        assert on_chain['owner'].lower() == player_id
+        assert on_chain['area_m2'] == 100
+        assert on_chain['activated']
+
+
+def test_build_on_bulk_claimed_plot_checks_land_registry_owner(bridge):
+    bridge.claim_plots([(PLAYER, 30), (OTHER_PLAYER, 31)], 100)
+
+    result = bridge.build_on_plot(PLAYER, 30, StructureType.HUT)
+
+    assert result['receipt'] is None
+    assert _city(bridge).get_plot(30).structure_type == StructureType.HUT
+
+    # Собственикът в играта не съвпада с LandRegistry
+    _city(bridge).get_plot(31).owner = PLAYER
+    with pytest.raises(ValueError, match='собствеността не съвпада'):
+        bridge.build_on_plot(PLAYER, 31, StructureType.HUT)
+    assert _city(bridge).get_plot(31).structure_type == StructureType.EMPTY_PLOT
+
+
+def test_claim_plots_rejects_taken_plot(bridge):
+    bridge.claim_plot(PLAYER, 7)
+
+    with pytest.raises(ValueError):
+        bridge.claim_plots([(OTHER_PLAYER, 6), (OTHER_PLAYER, 7)], 100)
+    assert _city(bridge).get_plot(6).owner is None
+    assert _city(bridge).get_plot(7).owner == PLAYER
+
+
+def test_claim_plots_unclaims_batch_whose_send_failed(bridge):
+    claims = [(PLAYER, n) for n in range(30, 33)] + [(OTHER_PLAYER, n) for n in range(40, 42)]
+    send = _failing_sends(bridge.blockchain, after=1)
+
+    result = bridge.claim_plots(claims, 100)
+
+    # Първата партида е включена, втората е подписана, но node-ът я е отказал
+    assert [plot.id for plot in result['plots']] == [30, 31, 32]
+    assert result['failed'] == [40, 41] and result['pending'] == []
+    assert result['transactions'] == 1
+    assert _city(bridge).get_plot(40).owner is None
+
+    bridge.blockchain.w3.eth.send_raw_transaction = send
+    bridge.claim_plots([(OTHER_PLAYER, 40), (PLAYER, 50)], 100)
+    assert _city(bridge).get_plot(40).owner == OTHER_PLAYER
+    assert _city(bridge).get_plot(50).owner == PLAYER
+
+
+def test_claim_plots_links_sent_batches_in_background(config, monkeypatch):
+    # Блоковете не идват сами - изпратените партиди чакат в mempool-а
+    config['rpc_url'] = f'fake://{uuid.uuid4().hex}?block_time=3600'
+    bridge = SaraktBridge(SaraktUniverse(), BlockchainConnector(config))
+    chain = get_fake_chain(config['rpc_url'])
+
+    def timeout(tx_hashes, timeout=None):
+        raise TimeoutError('receipts')
+
+    monkeypatch.setattr(bridge.blockchain, 'wait_for_receipts', timeout)
+    result = bridge.claim_plots([(PLAYER, 30), (PLAYER, 31), (OTHER_PLAYER, 40)], 100)
+
+    assert result['plots'] == [] and result['failed'] == []
+    assert result['pending'] == [30, 31, 40]
+    assert result['transactions'] == 2
+    assert _city(bridge).get_plot(40).owner == OTHER_PLAYER
+
+    with chain._lock:
+        chain._mine_block(chain._ready_transactions())
+    _wait_until(lambda: {30, 31, 40} <= bridge.synced_assets['plots'])
+    assert _city(bridge).get_plot(30).owner == PLAYER
+
+
+def test_claim_plots_unclaims_unsigned_batches(bridge, monkeypatch):
+    def node_down():
+        raise ConnectionError('node down')
+
+    # Грешка преди подписване - нито една партида не е изпратена
+    monkeypatch.setattr(bridge.blockchain.gas, 'fees', node_down)
+
+    with pytest.raises(ConnectionError):
+        bridge.claim_plots([(PLAYER, n) for n in range(60, 63)], 100)
+    assert all(_city(bridge).get_plot(n).owner is None for n in range(60, 63))
+
+
+def test_reconcile_after_bulk_claim_has_no_divergences(bridge):
+    bridge.claim_plot(PLAYER, 1)
+    bridge.claim_plots([(PLAYER, n) for n in range(10, 20)], 100)
+
+    indexer = EventIndexer(bridge.blockchain.w3, ':memory:', LAND_REGISTRY_ADDRESS)
+    report = Reconciler(bridge.universe, bridge.blockchain, indexer).run()
+
+    assert report['new'] == [] and report['open'] == 0
+    assert report['checked']['owners'] == 10
+    assert report['checked']['plot_tokens'] == 1
+
+
+def test_send_error_before_signing_is_not_masked(bridge, monkeypatch):
+    def sign_transaction(tx):
+        raise ValueError('already known')
+
+    # Грешката е преди подписване - няма подписана транзакция, която да е "вече известна"
+    monkeypatch.setattr(bridge.blockchain.account, 'sign_transaction', sign_transaction)
+
+    with pytest.raises(ValueError, match='already known'):
+        bridge.claim_plot(PLAYER, 9)
+    assert _city(bridge).get_plot(9).owner is None
+
+
+# ============================================
+# NPC И СИНХРОНИЗАЦИЯ
+# ============================================
+
+def test_spawn_and_mint_npc(bridge):
+    result = bridge.spawn_and_mint_npc(1, PLAYER)
+
+    npc = result['npc']
+    assert npc.token_id == result['nft']['token_id']
+    assert bridge.universe.get_npc(npc.id) is npc
+    assert bridge.blockchain.check_ownership(PLAYER, npc.token_id)
+
+
+def test_flush_sync_queue_carries_fractional_loyalty(bridge, config):
+    npc = bridge.spawn_and_mint_npc(1, PLAYER)['npc']
+    chain = get_fake_chain(config['rpc_url'])
+    key = (npc.token_id, PLAYER)
+
+    bridge.sync_queue.add_loyalty(npc.token_id, PLAYER, 1.7)
+    tx_hashes = bridge.flush_sync_queue(wait=True)
+    assert len(tx_hashes) == 1
+    assert bridge.blockchain.w3.eth.get_transaction_receipt(tx_hashes[0])['status'] == 1
+    assert chain.loyalty[key] == 1
+
+    # 0.7 пренесени + 0.5 = 1.2 - изпраща се 1
+    bridge.sync_queue.add_loyalty(npc.token_id, PLAYER, 0.5)
+    assert len(bridge.flush_sync_queue(wait=True)) == 1
+    assert chain.loyalty[key] == 2
+
+    # Остатъкът сам по себе си не е чакаща промяна
+    assert len(bridge.sync_queue) == 0
+    assert bridge.flush_sync_queue(wait=True) == []
+
+
+def test_sync_queue_keeps_remainder_carried_while_pair_is_queued():
+    queue = SyncQueue()
+    key = (1, PLAYER)
+    queue.add_loyalty(*key, 1.7)
+    queue.drain()
+
+    # Нова делта пристига между изпразването и пренасянето на остатъка
+    queue.add_loyalty(*key, 0.5)
+    queue.carry({key: 0.7})
+    queue.add_loyalty(*key, 0.1)
+    assert queue.drain()[0][key] == pytest.approx(0.6)
+
+    queue.add_loyalty(*key, 0.2)
+    assert queue.drain()[0][key] == pytest.approx(0.9)
+
+
+# ============================================
+# ЖУРНАЛ
+# ============================================
+
+def test_recover_restores_journaled_batches(config, journal):
+    bridge = SaraktBridge(SaraktUniverse(), BlockchainConnector(config), journal)
+    bridge.claim_plot(PLAYER, 3)
+    bridge.claim_plots([(PLAYER, n) for n in range(10, 13)] + [(OTHER_PLAYER, 20)], 100)
+    journal.close()
+
+    # Рестарт - нова вселена със същия журнал
+    restarted = SaraktBridge(SaraktUniverse(), BlockchainConnector(config), TxJournal(journal.path))
+    summary = restarted.recover()
+
+    assert summary['confirmed'] == 3
+    city = _city(restarted)
+    assert city.get_plot(3).token_id is not None
+    assert [city.get_plot(n).owner for n in (10, 11, 12, 20)] == [PLAYER] * 3 + [OTHER_PLAYER]
+    assert [city.get_plot(n).registry_id for n in (10, 11, 12, 20)] == [10, 11, 12, 20]
+    assert {3, 10, 11, 12, 20} <= restarted.synced_assets['plots']
+    restarted.journal.close()
+
+
+def test_claim_plots_fails_journaled_batch_whose_send_failed(config, journal):
+    bridge = SaraktBridge(SaraktUniverse(), BlockchainConnector(config), journal)
+    _failing_sends(bridge.blockchain, after=1)
+
+    bridge.claim_plots([(PLAYER, 30), (OTHER_PLAYER, 40)], 100)
+
+    assert [entry['status'] for entry in journal.entries.values()] == [CONFIRMED, FAILED]
+    assert bridge.recover()['rebroadcast'] == 0
+    assert _city(bridge).get_plot(40).owner is None
+
+
+def test_claim_plot_leaves_journaled_broadcast_for_recover(config, journal):
+    bridge = SaraktBridge(SaraktUniverse(), BlockchainConnector(config), journal)
+    send = _failing_sends(bridge.blockchain, after=0)
+
+    with pytest.raises(ConnectionError):
+        bridge.claim_plot(PLAYER, 8)
+
+    # Подписаната транзакция е в журнала - претенцията не се отменя
+    plot = _city(bridge).get_plot(8)
+    assert plot.owner == PLAYER
+    assert [entry['status'] for entry in journal.entries.values()] == [BROADCAST]
+
+    bridge.blockchain.w3.eth.send_raw_transaction = send
+    assert bridge.recover()['rebroadcast'] == 1
+    _wait_until(lambda: plot.token_id is not None)
+    assert bridge.blockchain.check_ownership(PLAYER, plot.token_id)
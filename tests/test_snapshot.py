@@ -0,0 +1,158 @@
+"""
+Snapshot на вселената - запис и зареждане (с и без mmap) във всеки режим
+на NPCs и парцелите, и четене на по-стари версии на формата
+"""
+
+import msgpack
+import pytest
+
+from sarakt_snapshot import (
+    save_snapshot, load_snapshot, read_header, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _PREFIX, _align
+)
+from sarakt_universe_engine import SaraktUniverse, NPCPopulation, GENERATOR_V1, GENERATOR_V2
+
+from test_universe_engine import npc_state, plot_state, play, develop
+
+
+CITY = 'Octavia Capital City'
+
+# (векторизирани NPCs, компактни парцели)
+MODES = [(False, False), (True, False), (False, True), (True, True)]
+
+
+def _universe(vectorized: bool, compact: bool, version: int = GENERATOR_V1) -> SaraktUniverse:
+    universe = SaraktUniverse(vectorized_npcs=vectorized, compact_plots=compact,
+                              generator_version=version)
+    play(universe)
+    develop(universe.get_city(CITY))
+    universe.get_planet('Sarakt').extract_resource('iron', 10)
+    universe.factions.append({'name': 'Dulo', 'leader': 'player-1'})
+    return universe
+
+
+def _state(universe: SaraktUniverse):
+    city = universe.get_city(CITY)
+    return {
+        'status': universe.get_universe_status(),
+        'factions': universe.factions,
+        'planets': [(planet.id, planet.name, planet.seed, planet.resources) for planet in universe.planets],
+        'city': city.get_city_stats(),
+        'infrastructure': city.infrastructure,
+        'plots': [plot_state(plot) for plot in city.plots],
+        'npcs': [npc_state(npc) for npc in universe.npcs]
+    }
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'universe.snap')
+
+
+# ============================================
+# ЗАПИС И ЗАРЕЖДАНЕ
+# ============================================
+
+@pytest.mark.parametrize('version', [GENERATOR_V1, GENERATOR_V2])
+@pytest.mark.parametrize('vectorized, compact', MODES)
+def test_round_trip_keeps_state_and_mode(path, vectorized, compact, version):
+    universe = _universe(vectorized, compact, version)
+    save_snapshot(universe, path)
+
+    loaded = load_snapshot(path)
+
+    assert isinstance(loaded.npcs, NPCPopulation) == vectorized
+    assert loaded.get_city(CITY).compact == compact
+    assert loaded.generator_version == version
+    assert loaded.current_cycle == universe.current_cycle
+    assert _state(loaded) == _state(universe)
+
+
+@pytest.mark.parametrize('vectorized, compact', MODES)
+def test_loaded_universe_keeps_simulating_identically(path, vectorized, compact):
+    universe = _universe(vectorized, compact)
+    save_snapshot(universe, path)
+    loaded = load_snapshot(path)
+
+    # Потоците на RNG продължават от мястото, където са спрели
+    for restored in (universe, loaded):
+        restored.simulate_multiple_cycles(5)
+        restored.get_npc(9).interact_with_player('player-3', 'quest_completion')
+    assert _state(loaded) == _state(universe)
+
+
+@pytest.mark.parametrize('vectorized, compact', MODES)
+def test_mmap_load_is_columnar_and_read_only(path, vectorized, compact):
+    universe = _universe(vectorized, compact)
+    save_snapshot(universe, path)
+
+    loaded = load_snapshot(path, mmap=True)
+
+    assert isinstance(loaded.npcs, NPCPopulation)
+    city = loaded.get_city(CITY)
+    assert city.compact
+    assert city.get_city_stats() == universe.get_city(CITY).get_city_stats()
+    assert [plot_state(plot) for plot in city.plots] == \
+        [plot_state(plot) for plot in universe.get_city(CITY).plots]
+
+    # Търсене по id_order, без индекс в паметта
+    assert loaded.get_npc(101).id == 101
+    assert loaded.npcs._row_index is None
+
+    with pytest.raises(ValueError):
+        city.get_plot(1).owner = 'someone-else'
+
+
+# ============================================
+# ФОРМАТ
+# ============================================
+
+def _rewrite_header(path: str, version: int, edit=None):
+    """Пренаписва header-а (и версията) на snapshot, запазвайки колоните"""
+    with open(path, 'rb') as f:
+        header, data_start = read_header(f)
+        f.seek(data_start)
+        data = f.read()
+    if edit:
+        edit(header)
+    packed = msgpack.packb(header, use_bin_type=True)
+    with open(path, 'wb') as f:
+        f.write(_PREFIX.pack(SNAPSHOT_MAGIC, version, len(packed)))
+        f.write(packed)
+        f.write(b'\0' * (_align(_PREFIX.size + len(packed)) - f.tell()))
+        f.write(data)
+
+
+def test_writes_current_version(path):
+    save_snapshot(_universe(False, False), path)
+    with open(path, 'rb') as f:
+        magic, version, _ = _PREFIX.unpack(f.read(_PREFIX.size))
+    assert magic == SNAPSHOT_MAGIC
+    assert version == SNAPSHOT_VERSION == 2
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+def test_reads_v1_snapshot_without_id_order(path, mmap):
+    universe = _universe(True, True)
+    save_snapshot(universe, path)
+    _rewrite_header(path, 1, lambda header: header['npcs'].pop('id_order'))
+
+    loaded = load_snapshot(path, mmap=mmap)
+
+    assert loaded.get_npc(101).id == 101
+    assert [npc_state(npc) for npc in loaded.npcs] == [npc_state(npc) for npc in universe.npcs]
+
+
+def test_rejects_unknown_version(path):
+    save_snapshot(_universe(False, False), path)
+    _rewrite_header(path, SNAPSHOT_VERSION + 1)
+
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_rejects_foreign_file(path):
+    with open(path, 'wb') as f:
+        f.write(b'NOTSNAP!' + b'\0' * 64)
+
+    with pytest.raises(ValueError):
+        load_snapshot(path)
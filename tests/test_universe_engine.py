@@ -0,0 +1,256 @@
+"""
+Еквивалентност на режимите на вселената: векторизирани срещу обектни NPCs,
+компактни срещу обектни парцели и V1/V2 процедурната генерация
+"""
+
+import pytest
+
+from sarakt_universe_engine import (
+    SaraktUniverse, Planet, PlanetType, City, NPC, NPCPopulation, NPCState, StructureType,
+    GENERATOR_V1, GENERATOR_V2
+)
+
+
+GENERATOR_VERSIONS = [GENERATOR_V1, GENERATOR_V2]
+SECTIONS = ('properties', 'biomes', 'resources', 'regions', 'danger_zones')
+
+
+def npc_state(npc):
+    """Всичко наблюдаемо за един NPC - еднакво за обект и изглед в популация"""
+    return {
+        'id': npc.id,
+        'planet_id': npc.planet_id,
+        'seed': npc.seed,
+        'name': npc.get_name(),
+        'age': npc.age,
+        'state': npc.state,
+        'attributes': dict(npc.attributes),
+        'personality': dict(npc.personality) if npc.personality else None,
+        'skills': dict(npc.skills),
+        'loyalty': dict(npc.loyalty),
+        'token_id': npc.token_id
+    }
+
+
+def plot_state(plot):
+    return (plot.id, plot.zone, plot.owner, plot.structure_type, plot.net_value,
+            plot.developed, plot.token_id, plot.registry_id)
+
+
+def sections(planet):
+    return {name: getattr(planet, name) for name in SECTIONS}
+
+
+def play(universe: SaraktUniverse):
+    """Едни и същи действия върху вселена в който и да е режим"""
+    universe.get_npc(3).interact_with_player('player-1', 'gift')
+    universe.simulate_multiple_cycles(20)
+    universe.get_npc(5).interact_with_player('player-1', 'rescue')
+    universe.get_npc(5).interact_with_player('player-2', 'positive_trade', 0.5)
+    universe.get_npc(7).token_id = 42
+    universe.add_npc(NPC(101, 2, 50101, universe.generator_version))
+    universe.simulate_cycle()
+
+
+def develop(city: City):
+    """Развива, претендира и минтва парцели по еднакъв начин във всеки режим"""
+    structures = [StructureType.HUT, StructureType.STONE_HOUSE, StructureType.WORKSHOP,
+                  StructureType.COMMERCIAL]
+    for index, plot_id in enumerate(range(1, city.total_plots + 1, 37)):
+        city.develop_plot(plot_id, structures[index % len(structures)], f'owner-{index % 5}')
+    city.get_plot(2).owner = 'owner-9'
+    city.get_plot(3).token_id = 7
+    # Извън int64 - пази се отделно в компактния режим
+    city.get_plot(4).token_id = 2 ** 70
+    city.get_plot(6).registry_id = 6
+    city.get_plot(38).owner = None
+    city.build_infrastructure('roads')
+
+
+# ============================================
+# NPCs - ВЕКТОРИЗИРАНИ СРЕЩУ ОБЕКТИ
+# ============================================
+
+@pytest.mark.parametrize('version', GENERATOR_VERSIONS)
+def test_vectorized_npcs_match_objects(version):
+    objects = SaraktUniverse(generator_version=version)
+    vectorized = SaraktUniverse(vectorized_npcs=True, generator_version=version)
+    assert isinstance(vectorized.npcs, NPCPopulation)
+
+    for universe in (objects, vectorized):
+        play(universe)
+
+    assert [npc_state(npc) for npc in vectorized.npcs] == [npc_state(npc) for npc in objects.npcs]
+    assert vectorized.get_universe_status() == objects.get_universe_status()
+    assert npc_state(vectorized.get_npc(101)) == npc_state(objects.get_npc(101))
+    assert vectorized.get_npc(999) is None and objects.get_npc(999) is None
+
+
+def test_population_round_trips_objects():
+    universe = SaraktUniverse()
+    play(universe)
+
+    population = NPCPopulation.from_npcs(universe.npcs, universe.generator_version)
+    assert [npc_state(population.to_npc(row)) for row in range(len(population))] == \
+        [npc_state(npc) for npc in universe.npcs]
+
+
+def test_vectorized_npcs_reach_every_state():
+    universe = SaraktUniverse(vectorized_npcs=True)
+    universe.simulate_multiple_cycles(20)
+    for _ in range(10):
+        universe.get_npc(1).interact_with_player('player-1', 'rescue')
+
+    status = universe.get_universe_status()
+    assert status['mature_npcs'] + status['loyal_npcs'] > 0
+    assert universe.get_npc(1).state == NPCState.LOYAL
+    assert universe.npcs.count_state(NPCState.LOYAL) == status['loyal_npcs']
+
+
+# ============================================
+# ИНДЕКСИ НА ВСЕЛЕНАТА
+# ============================================
+
+def test_lookups_follow_replaced_lists_and_elements():
+    universe = SaraktUniverse()
+    assert universe.get_planet('Sarakt').id == 1
+
+    # Подмяна на списъка при същата дължина
+    renamed = [Planet(p.id, f'{p.name} II', p.seed, p.type, p.is_habitable) for p in universe.planets]
+    universe.planets = renamed
+    assert universe.get_planet('Sarakt') is None
+    assert universe.get_planet(1) is renamed[0]
+
+    # Подмяна на елемент на място
+    capital = City(7, 'New Octavia', 1, 100)
+    universe.cities[0] = capital
+    assert universe.get_city('Octavia Capital City') is None
+    assert universe.get_city('New Octavia') is capital
+
+    replacement = NPC(500, 1, 50500)
+    universe.npcs[0] = replacement
+    assert universe.get_npc(1) is None
+    assert universe.get_npc(500) is replacement
+
+    universe.npcs.reverse()
+    assert universe.get_npc(500) is replacement
+
+
+# ============================================
+# ПАРЦЕЛИ - КОМПАКТНИ СРЕЩУ ОБЕКТИ
+# ============================================
+
+def test_compact_plots_match_objects():
+    objects = City(1, 'Test City', 1, 2000)
+    compact = City(1, 'Test City', 1, 2000, compact=True)
+
+    for city in (objects, compact):
+        develop(city)
+
+    assert [plot_state(plot) for plot in compact.plots] == [plot_state(plot) for plot in objects.plots]
+    assert compact.get_city_stats() == objects.get_city_stats()
+    assert compact.get_plot(4).token_id == 2 ** 70
+    assert compact.get_plot(0) is None and objects.get_plot(0) is None
+
+    for owner in ('owner-0', 'owner-4', 'owner-9', 'nobody'):
+        assert [p.id for p in compact.get_plots_by_owner(owner)] == \
+            [p.id for p in objects.get_plots_by_owner(owner)]
+    for structure_type in StructureType:
+        assert [p.id for p in compact.get_plots_by_structure(structure_type)] == \
+            [p.id for p in objects.get_plots_by_structure(structure_type)]
+    zones = {plot.zone for plot in objects.plots}
+    for zone in zones | {None}:
+        assert [p.id for p in compact.get_free_plots(zone)] == [p.id for p in objects.get_free_plots(zone)]
+        if zone is not None:
+            assert [p.id for p in compact.get_plots_by_zone(zone)] == \
+                [p.id for p in objects.get_plots_by_zone(zone)]
+
+
+def test_plot_table_round_trips_object_city():
+    objects = City(1, 'Test City', 1, 500)
+    develop(objects)
+
+    loaded = City(1, 'Test City', 1, 500, plot_table=objects.plot_table())
+    assert [plot_state(plot) for plot in loaded.plots] == [plot_state(plot) for plot in objects.plots]
+    assert loaded.get_city_stats()['developed_plots'] == objects.get_city_stats()['developed_plots']
+
+
+def test_compact_universe_matches_objects():
+    objects = SaraktUniverse()
+    compact = SaraktUniverse(compact_plots=True)
+
+    for universe in (objects, compact):
+        develop(universe.get_city('Octavia Capital City'))
+
+    city, expected = compact.get_city('Octavia Capital City'), objects.get_city('Octavia Capital City')
+    assert city.compact and not expected.compact
+    assert city.get_city_stats() == expected.get_city_stats()
+
+
+# ============================================
+# ПРОЦЕДУРНА ГЕНЕРАЦИЯ V1/V2
+# ============================================
+
+@pytest.mark.parametrize('version', GENERATOR_VERSIONS)
+def test_planet_generation_is_deterministic(version):
+    first = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, version)
+    second = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, version)
+    assert sections(first.materialize()) == sections(second.materialize())
+
+
+@pytest.mark.parametrize('version', GENERATOR_VERSIONS)
+def test_lazy_sections_match_materialized(version):
+    materialized = Planet(3, 'Mining Planet 1', 100001, PlanetType.MINING_STANDARD, False, version)
+    materialized.materialize()
+
+    # Обратен ред на достъп - при V1 предходните секции се генерират първо
+    lazy = Planet(3, 'Mining Planet 1', 100001, PlanetType.MINING_STANDARD, False, version)
+    assert lazy.danger_zones == materialized.danger_zones
+    assert lazy.is_generated('danger_zones')
+    assert lazy.is_generated('properties') == (version == GENERATOR_V1)
+    assert sections(lazy) == sections(materialized)
+
+
+def test_v2_generates_regions_and_pois_independently():
+    planet = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, GENERATOR_V2)
+    fresh = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, GENERATOR_V2)
+
+    last = len(planet.regions) - 1
+    assert fresh.generate_region(last) == planet.regions[last]
+    assert not fresh.is_generated('regions')
+    pois = planet.regions[0].points_of_interest
+    assert fresh.generate_poi(0, len(pois) - 1) == pois[-1]
+
+
+def test_v1_rejects_independent_generation():
+    planet = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, GENERATOR_V1)
+    with pytest.raises(ValueError):
+        planet.generate_region(0)
+    with pytest.raises(ValueError):
+        planet.generate_poi(0, 0)
+
+
+def test_v1_and_v2_use_different_streams():
+    v1 = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, GENERATOR_V1)
+    v2 = Planet(1, 'Sarakt', 12345, PlanetType.HABITABLE_PRIMARY, True, GENERATOR_V2)
+    # Първата секция е от общия поток при V1 и от под-поток при V2
+    assert v1.properties != v2.properties
+
+
+@pytest.mark.parametrize('version', GENERATOR_VERSIONS)
+def test_parallel_build_matches_serial(version):
+    serial = SaraktUniverse(generator_version=version)
+    parallel = SaraktUniverse(generator_version=version, workers=2)
+
+    assert [sections(planet.materialize()) for planet in parallel.planets] == \
+        [sections(planet.materialize()) for planet in serial.planets]
+    assert [npc_state(npc) for npc in parallel.npcs] == [npc_state(npc) for npc in serial.npcs]
+
+
+def test_parallel_vectorized_cohort_matches_serial():
+    serial = SaraktUniverse(vectorized_npcs=True, generator_version=GENERATOR_V2)
+    parallel = SaraktUniverse(vectorized_npcs=True, generator_version=GENERATOR_V2, workers=2)
+
+    for universe in (serial, parallel):
+        universe.simulate_multiple_cycles(20)
+    assert [npc_state(npc) for npc in parallel.npcs] == [npc_state(npc) for npc in serial.npcs]